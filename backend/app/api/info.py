@@ -2,25 +2,21 @@
 Utility and info routes
 """
 from fastapi import APIRouter
-import json
-import os
+
+from app.services.model_manager import model_manager
 
 router = APIRouter(prefix="/info", tags=["info"])
 
 @router.get("/model")
 def get_model_info():
-    """Get information about the ML model"""
-    model_dir = os.path.join(os.path.dirname(__file__), '../../model')
-    model_info_path = os.path.join(model_dir, 'model_info.json')
-    
-    try:
-        with open(model_info_path, 'r') as f:
-            model_info = json.load(f)
-        return model_info
-    except FileNotFoundError:
+    """Get information about the ML model currently serving predictions"""
+    model_info = model_manager.model_info()
+    if model_info is None:
         return {
-            "message": "Model not trained yet. Run 'python model/train.py' to train the model."
+            "message": "Model not loaded yet. Run 'python model/train.py' to train the model.",
+            "status": model_manager.status
         }
+    return model_info
 
 @router.get("/health")
 def health_check():
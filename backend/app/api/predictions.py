@@ -1,33 +1,71 @@
 """
 Prediction routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-import sys
-import os
-
-# Add model directory to Python path
-model_path = os.path.join(os.path.dirname(__file__), '../../model')
-if model_path not in sys.path:
-    sys.path.insert(0, model_path)
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
 
+from app.config import settings
 from app.database import prisma
 from app.schemas import (
-    PredictionRequest, PredictionResponse, PredictionWithStudentResponse,
-    StudentWithLatestPrediction, ClassAnalytics
+    PredictionRequest, PredictionResponse, PredictionWithStudentResponse, StudentResponse,
+    StudentWithLatestPrediction, ClassAnalytics, BatchPredictionRequest,
+    BatchPredictionResponse, BatchPredictionResult, BatchPredictionError
 )
 from app.services import PredictionService, StudentService
+from app.services.inference import InferenceExecutor, InferenceOverloaded, InferenceTimeout, serving_tier
+from app.services.batching import PredictionBatcher
+from app.services.model_manager import model_manager, ModelNotReady
+from app.services.pagination import NEXT_CURSOR_HEADER
 from app.middleware import get_current_user, get_teacher, get_student
 
-# Import ML prediction engine
-try:
-    from predict import PredictionEngine
-    engine = PredictionEngine()
-    ml_predict = lambda features: engine.predict(features)
-except Exception as e:
-    print(f"Warning: Could not load ML model: {e}")
-    def ml_predict(features):
-        return {'predicted_score': 65, 'pass_fail': 'Pass', 'risk_category': 'Medium', 'confidence': 0.85}
+def _predict_with_lease(features, tier=None, explain=False):
+    with model_manager.lease() as engine:
+        return engine.predict(features, serving_tier(engine, tier), explain)
+
+def _predict_batch_with_lease(rows, tier=None):
+    with model_manager.lease() as engine:
+        return engine.predict_batch(rows, serving_tier(engine, tier))
+
+# Model calls run in a worker pool so they never block the event loop
+inference = InferenceExecutor(
+    mode=settings.INFERENCE_EXECUTOR,
+    max_workers=settings.INFERENCE_WORKERS,
+    max_queue=settings.INFERENCE_MAX_QUEUE,
+    timeout=settings.INFERENCE_TIMEOUT_SECONDS,
+    predict_fn=_predict_with_lease,
+    predict_batch_fn=_predict_batch_with_lease,
+    engine_kwargs={'cache': model_manager.cache_kwargs, **model_manager.engine_kwargs},
+    fallback_tier=settings.INFERENCE_FALLBACK_TIER,
+    fallback_queue_depth=settings.INFERENCE_FALLBACK_QUEUE_DEPTH
+)
+model_manager.on_ready = inference.warm_up
+
+# Concurrent single predictions are coalesced into batched model calls
+batcher = PredictionBatcher(
+    inference,
+    max_batch=settings.PREDICTION_BATCH_MAX_SIZE,
+    max_wait_ms=settings.PREDICTION_BATCH_MAX_WAIT_MS
+)
+
+def _inference_error(e: Exception) -> HTTPException:
+    """Map executor and model-loading failures onto HTTP errors"""
+    if isinstance(e, ModelNotReady):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    if isinstance(e, InferenceOverloaded):
+        return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+
+async def _require_model() -> None:
+    """Hold the request briefly while the model loads, then reject it explicitly"""
+    if not await model_manager.wait_ready(settings.MODEL_LOAD_WAIT_SECONDS):
+        try:
+            model_manager.require_engine()
+        except ModelNotReady as e:
+            raise _inference_error(e)
 
 router = APIRouter(prefix="/predictions", tags=["predictions"])
 
@@ -35,6 +73,7 @@ router = APIRouter(prefix="/predictions", tags=["predictions"])
 @router.post("", response_model=PredictionResponse)
 async def create_prediction(
     prediction_data: PredictionRequest,
+    explain: bool = False,
     current_user = Depends(get_current_user),
 ):
     """
@@ -42,6 +81,9 @@ async def create_prediction(
     
     **For students**: Creates prediction for themselves
     **For teachers**: Can create predictions for their students (provide student_id)
+    
+    With `?explain=true` the response also breaks the score down into
+    per-feature contributions. These are returned only, not stored.
     """
     # Validate permissions
     if current_user.role == "student":
@@ -60,15 +102,22 @@ async def create_prediction(
                     detail="Student not in your class"
                 )
     
+    await _require_model()
+    
     try:
         # Get prediction from ML model
-        ml_result = ml_predict({
+        features = {
             'study_hours': prediction_data.study_hours,
             'attendance': prediction_data.attendance,
             'assignments_score': prediction_data.assignments_score,
             'past_marks': prediction_data.past_marks,
             'engagement_score': prediction_data.engagement_score
-        })
+        }
+        if explain:
+            # Explained rows skip the micro-batcher, whose batches are plain predictions
+            ml_result = await inference.predict(features, explain=True)
+        else:
+            ml_result = await batcher.predict(features)
 
         # Save to database
         prediction = await PredictionService.create_prediction(
@@ -85,12 +134,18 @@ async def create_prediction(
             pass_fail=prediction.passFail,
             risk_category=prediction.riskCategory,
             confidence=prediction.confidence,
+            score_lower=prediction.scoreLower,
+            score_upper=prediction.scoreUpper,
+            score_std=prediction.scoreStd,
             study_hours=prediction.studyHours,
             attendance=prediction.attendance,
             assignments_score=prediction.assignmentsScore,
             past_marks=prediction.pastMarks,
             engagement_score=prediction.engagementScore,
-            created_at=prediction.createdAt
+            created_at=prediction.createdAt,
+            model_version=prediction.modelVersion,
+            feature_contributions=ml_result.get('feature_contributions'),
+            baseline_score=ml_result.get('baseline_score')
         )
     
     except ValueError as e:
@@ -98,14 +153,117 @@ async def create_prediction(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except (InferenceOverloaded, InferenceTimeout, ModelNotReady) as e:
+        raise _inference_error(e)
+
+@router.post("/batch", response_model=BatchPredictionResponse)
+async def create_predictions_batch(
+    batch: BatchPredictionRequest,
+    current_user = Depends(get_current_user),
+):
+    """
+    Score many rows at once and store them with a single insert
+    
+    Rows that fail permission checks or model validation are reported in
+    `errors` by their index; the remaining rows are still scored and saved.
+    """
+    await _require_model()
+    
+    errors = []
+    if current_user.role == "teacher":
+        owned_ids = await StudentService.get_owned_student_ids(
+            prisma, current_user.id,
+            [row.student_id for row in batch.predictions if row.student_id is not None]
+        )
+    
+    accepted = []
+    for index, row in enumerate(batch.predictions):
+        if row.student_id is None:
+            accepted.append(index)
+        elif current_user.role == "student":
+            errors.append(BatchPredictionError(index=index, detail="Students cannot specify student_id"))
+        elif row.student_id not in owned_ids:
+            errors.append(BatchPredictionError(index=index, detail="Student not in your class"))
+        else:
+            accepted.append(index)
+    
+    try:
+        ml_results = await inference.predict_batch([
+            {
+                'study_hours': batch.predictions[i].study_hours,
+                'attendance': batch.predictions[i].attendance,
+                'assignments_score': batch.predictions[i].assignments_score,
+                'past_marks': batch.predictions[i].past_marks,
+                'engagement_score': batch.predictions[i].engagement_score
+            } for i in accepted
+        ]) if accepted else []
+    except (InferenceOverloaded, InferenceTimeout, ModelNotReady) as e:
+        raise _inference_error(e)
+    
+    scored = []
+    results = []
+    for index, ml_result in zip(accepted, ml_results):
+        if 'error' in ml_result:
+            errors.append(BatchPredictionError(index=index, detail=ml_result['error']))
+            continue
+        row = batch.predictions[index]
+        scored.append((row, ml_result))
+        results.append(BatchPredictionResult(
+            index=index,
+            student_id=row.student_id,
+            predicted_score=ml_result['predicted_score'],
+            pass_fail=ml_result['pass_fail'],
+            risk_category=ml_result['risk_category'],
+            confidence=ml_result['confidence'],
+            score_lower=ml_result.get('score_lower'),
+            score_upper=ml_result.get('score_upper'),
+            score_std=ml_result.get('score_std'),
+            model_version=ml_result.get('model_version')
+        ))
+    
+    created = await PredictionService.create_predictions_bulk(prisma, current_user.id, scored)
+    
+    return BatchPredictionResponse(
+        created=created,
+        results=results,
+        errors=sorted(errors, key=lambda e: e.index)
+    )
+
+@router.get("/cache/stats")
+async def get_prediction_cache_stats(
+    current_user = Depends(get_teacher),
+):
+    """Get prediction cache hit/miss counters (teachers only)"""
+    if model_manager.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **model_manager.cache.stats()}
+
+@router.get("/inference/stats")
+async def get_inference_stats(
+    current_user = Depends(get_teacher),
+):
+    """Get executor load, micro-batching, threading and early-exit metrics (teachers only)"""
+    engine = model_manager.engine
+    return {
+        "executor": inference.stats(),
+        "batching": batcher.stats(),
+        "threading": engine.threading_policy.stats() if engine is not None else None,
+        "early_exit": engine.early_exit_stats() if engine is not None else None
+    }
 
 @router.get("/my", response_model=List[PredictionResponse])
 async def get_my_predictions(
-    limit: int = 10,
+    response: Response,
+    limit: int = Query(10, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
     current_user = Depends(get_current_user),
 ):
-    """Get all predictions for the current user"""
-    predictions = await PredictionService.get_user_predictions(prisma, current_user.id, limit)
+    """Get a page of the current user's predictions, newest first"""
+    predictions, next_cursor = await PredictionService.get_user_predictions(
+        prisma, current_user.id, limit, cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         PredictionResponse(
             id=p.id,
@@ -113,12 +271,16 @@ async def get_my_predictions(
             pass_fail=p.passFail,
             risk_category=p.riskCategory,
             confidence=p.confidence,
+            score_lower=p.scoreLower,
+            score_upper=p.scoreUpper,
+            score_std=p.scoreStd,
             study_hours=p.studyHours,
             attendance=p.attendance,
             assignments_score=p.assignmentsScore,
             past_marks=p.pastMarks,
             engagement_score=p.engagementScore,
-            created_at=p.createdAt
+            created_at=p.createdAt,
+            model_version=p.modelVersion
         ) for p in predictions
     ]
 
@@ -141,27 +303,37 @@ async def get_latest_prediction(
         pass_fail=prediction.passFail,
         risk_category=prediction.riskCategory,
         confidence=prediction.confidence,
+        score_lower=prediction.scoreLower,
+        score_upper=prediction.scoreUpper,
+        score_std=prediction.scoreStd,
         study_hours=prediction.studyHours,
         attendance=prediction.attendance,
         assignments_score=prediction.assignmentsScore,
         past_marks=prediction.pastMarks,
         engagement_score=prediction.engagementScore,
-        created_at=prediction.createdAt
+        created_at=prediction.createdAt,
+        model_version=prediction.modelVersion
     )
 
 @router.get("/student/{student_id}", response_model=List[PredictionResponse])
 async def get_student_predictions(
     student_id: int,
-    limit: int = 10,
+    response: Response,
+    limit: int = Query(10, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
     current_user = Depends(get_teacher),
 ):
-    """Get predictions for a student (teachers only)"""
+    """Get a page of a student's predictions, newest first (teachers only)"""
     # Verify student belongs to teacher
     student = await StudentService.get_student(prisma, student_id)
     if not student or student.teacherId != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     
-    predictions = await PredictionService.get_student_predictions(prisma, student_id, limit)
+    predictions, next_cursor = await PredictionService.get_student_predictions(
+        prisma, student_id, limit, cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         PredictionResponse(
             id=p.id,
@@ -169,12 +341,61 @@ async def get_student_predictions(
             pass_fail=p.passFail,
             risk_category=p.riskCategory,
             confidence=p.confidence,
+            score_lower=p.scoreLower,
+            score_upper=p.scoreUpper,
+            score_std=p.scoreStd,
             study_hours=p.studyHours,
             attendance=p.attendance,
             assignments_score=p.assignmentsScore,
             past_marks=p.pastMarks,
             engagement_score=p.engagementScore,
-            created_at=p.createdAt
+            created_at=p.createdAt,
+            model_version=p.modelVersion
+        ) for p in predictions
+    ]
+
+@router.get("/class", response_model=List[PredictionWithStudentResponse])
+async def get_class_predictions(
+    response: Response,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    current_user = Depends(get_teacher),
+):
+    """Get a page of the predictions made for students in class, newest first"""
+    predictions, next_cursor = await PredictionService.get_class_predictions(
+        prisma, current_user.id, limit, cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [
+        PredictionWithStudentResponse(
+            id=p.id,
+            predicted_score=p.predictedScore,
+            pass_fail=p.passFail,
+            risk_category=p.riskCategory,
+            confidence=p.confidence,
+            score_lower=p.scoreLower,
+            score_upper=p.scoreUpper,
+            score_std=p.scoreStd,
+            study_hours=p.studyHours,
+            attendance=p.attendance,
+            assignments_score=p.assignmentsScore,
+            past_marks=p.pastMarks,
+            engagement_score=p.engagementScore,
+            created_at=p.createdAt,
+            model_version=p.modelVersion,
+            student=StudentResponse(
+                id=p.student.id,
+                student_id=p.student.studentId,
+                name=p.student.name,
+                email=p.student.email,
+                class_name=p.student.className,
+                year=p.student.year,
+                section=p.student.section,
+                section_id=p.student.sectionId,
+                created_at=p.student.createdAt,
+                updated_at=p.student.updatedAt
+            )
         ) for p in predictions
     ]
 
@@ -188,15 +409,19 @@ async def get_class_analytics(
 
 @router.get("/class/students-overview", response_model=List[StudentWithLatestPrediction])
 async def get_class_overview(
+    response: Response,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
     current_user = Depends(get_teacher),
 ):
-    """Get all students in class with their latest predictions"""
-    students = await StudentService.get_students_for_teacher(prisma, current_user.id)
-    
-    result = []
-    for student in students:
-        latest_pred = await PredictionService.get_student_predictions(prisma, student.id, limit=1)
-        result.append(StudentWithLatestPrediction(
+    """Get a page of the students in class, oldest first, with their latest predictions"""
+    pairs, next_cursor = await PredictionService.get_students_with_latest_prediction(
+        prisma, current_user.id, limit, cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [
+        StudentWithLatestPrediction(
             id=student.id,
             student_id=student.studentId,
             name=student.name,
@@ -204,19 +429,6 @@ async def get_class_overview(
             class_name=student.className,
             year=student.year,
             section=student.section,
-            latest_prediction=(PredictionResponse(
-                id=latest_pred[0].id,
-                predicted_score=latest_pred[0].predictedScore,
-                pass_fail=latest_pred[0].passFail,
-                risk_category=latest_pred[0].riskCategory,
-                confidence=latest_pred[0].confidence,
-                study_hours=latest_pred[0].studyHours,
-                attendance=latest_pred[0].attendance,
-                assignments_score=latest_pred[0].assignmentsScore,
-                past_marks=latest_pred[0].pastMarks,
-                engagement_score=latest_pred[0].engagementScore,
-                created_at=latest_pred[0].createdAt
-            ) if latest_pred else None)
-        ))
-    
-    return result
+            latest_prediction=PredictionResponse(**prediction) if prediction else None
+        ) for student, prediction in pairs
+    ]
@@ -1,16 +1,70 @@
 """
 Student management routes (for teachers)
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+import csv
+import io
+import json
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import Dict, Iterator, List, Optional
+
+from app.config import settings
 from app.database import prisma
-from app.schemas import StudentCreate, StudentUpdate, StudentResponse
+from app.schemas import StudentCreate, StudentUpdate, StudentResponse, StudentImportResponse
 from app.services import StudentService
+from app.services.pagination import NEXT_CURSOR_HEADER
 from app.middleware import get_teacher
 
 router = APIRouter(prefix="/students", tags=["students"])
 
+ROSTER_COLUMNS = ("student_id", "name", "email", "class_name", "year", "section")
+ROSTER_CONTENT_TYPES = ("text/csv", "application/json")
+
+def _csv_rows(text: str) -> Iterator[Dict[str, str]]:
+    """Roster rows of a CSV with a header line; empty cells are left out"""
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [column for column in ROSTER_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV header is missing columns: {', '.join(missing)}"
+        )
+    for row in reader:
+        yield {
+            column.strip(): value.strip() for column, value in row.items()
+            if column and isinstance(value, str) and value.strip()
+        }
+
+async def _read_roster(request: Request) -> List:
+    """Read a CSV or JSON-array roster body, enforcing the size and row limits"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in ROSTER_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send the roster as text/csv or application/json"
+        )
+    body = bytearray()
+    async for piece in request.stream():
+        body.extend(piece)
+        if len(body) > settings.STUDENT_IMPORT_MAX_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Roster is larger than {settings.STUDENT_IMPORT_MAX_BYTES} bytes"
+            )
+    try:
+        text = body.decode("utf-8-sig")
+        rows = list(_csv_rows(text)) if content_type == "text/csv" else json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unreadable roster: {e}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="JSON roster must be an array")
+    if len(rows) > settings.STUDENT_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Roster has {len(rows)} rows; the limit is {settings.STUDENT_IMPORT_MAX_ROWS}"
+        )
+    return rows
+
 @router.post("", response_model=StudentResponse)
 async def create_student(
     student: StudentCreate,
@@ -31,12 +85,39 @@ async def create_student(
         updated_at=db_student.updatedAt
     )
 
+@router.post("/import", response_model=StudentImportResponse)
+async def import_students(
+    request: Request,
+    current_user = Depends(get_teacher),
+):
+    """
+    Create or update many students from a CSV file or a JSON array
+    
+    Students whose student_id is new are created; the teacher's existing
+    students with that student_id are updated. Rows that fail validation
+    are reported in `errors` by their index; the other rows are still saved.
+    """
+    rows = await _read_roster(request)
+    return await StudentService.import_students(
+        prisma, current_user.id, rows, settings.STUDENT_IMPORT_CHUNK_SIZE
+    )
+
 @router.get("", response_model=List[StudentResponse])
 async def get_students(
+    response: Response,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
     current_user = Depends(get_teacher),
 ):
-    """Get all students for the current teacher"""
-    students = await StudentService.get_students_for_teacher(prisma, current_user.id)
+    """Get a page of the current teacher's students, oldest first
+
+    The next page's cursor, if any, is in the X-Next-Cursor header.
+    """
+    students, next_cursor = await StudentService.get_students_for_teacher(
+        prisma, current_user.id, limit, cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         StudentResponse(
             id=s.id,
@@ -28,6 +28,55 @@ class Settings:
     PROJECT_NAME = "Student Performance Predictor"
     DEBUG = os.getenv("DEBUG", "True") == "True"
     
+    # Cursor pagination of list endpoints: page size when ?limit= is omitted, and its cap
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+    
+    # Bulk roster import (POST /api/students/import): body and row limits, rows written per chunk
+    STUDENT_IMPORT_MAX_BYTES = int(os.getenv("STUDENT_IMPORT_MAX_BYTES", "2000000"))
+    STUDENT_IMPORT_MAX_ROWS = int(os.getenv("STUDENT_IMPORT_MAX_ROWS", "1000"))
+    STUDENT_IMPORT_CHUNK_SIZE = int(os.getenv("STUDENT_IMPORT_CHUNK_SIZE", "100"))
+    
+    # Model registry (defaults to model/registry) and how often to check it for new versions
+    MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "")
+    MODEL_REGISTRY_POLL_SECONDS = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "10"))
+    
+    # Seconds a prediction request may wait for the model to finish loading before a 503
+    MODEL_LOAD_WAIT_SECONDS = float(os.getenv("MODEL_LOAD_WAIT_SECONDS", "0"))
+    
+    # Prediction cache (size 0 disables it)
+    PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+    PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "300"))
+    PREDICTION_CACHE_PRECISION = int(os.getenv("PREDICTION_CACHE_PRECISION", "2"))
+    
+    # Inference executor ("thread" or "process")
+    INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+    INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+    INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "5"))
+    # Threads one worker may use per model call; batches below the row count run sequentially
+    INFERENCE_THREADS_PER_WORKER = int(os.getenv("INFERENCE_THREADS_PER_WORKER", "1"))
+    INFERENCE_PARALLEL_MIN_ROWS = int(os.getenv("INFERENCE_PARALLEL_MIN_ROWS", "1024"))
+    
+    # Tree evaluation backend: fused, compact (float32 thresholds, shared leaf tables), flat or sklearn
+    MODEL_BACKEND = os.getenv("MODEL_BACKEND", "fused")
+    # Batches of at least this many rows use the sklearn forests, faster for large batches (0 disables)
+    MODEL_SKLEARN_MIN_ROWS = int(os.getenv("MODEL_SKLEARN_MIN_ROWS", "512"))
+    # Opt-in early exit for the pass/fail vote: "" (off), "exact" or "bound" (Hoeffding, at this confidence)
+    MODEL_EARLY_EXIT = os.getenv("MODEL_EARLY_EXIT", "")
+    MODEL_EARLY_EXIT_CONFIDENCE = float(os.getenv("MODEL_EARLY_EXIT_CONFIDENCE", "0.95"))
+    # Share of regressor trees inside the reported score interval (0.8 = 10th-90th percentile)
+    PREDICTION_INTERVAL_COVERAGE = float(os.getenv("PREDICTION_INTERVAL_COVERAGE", "0.8"))
+    # Model tier served by default ("full" = the forests, or a distilled tier from model/tiers)
+    MODEL_TIER = os.getenv("MODEL_TIER", "full")
+    # Distilled tier used once this many calls are pending (empty tier disables the fallback)
+    INFERENCE_FALLBACK_TIER = os.getenv("INFERENCE_FALLBACK_TIER", "")
+    INFERENCE_FALLBACK_QUEUE_DEPTH = int(os.getenv("INFERENCE_FALLBACK_QUEUE_DEPTH", "32"))
+    
+    # Micro-batching of concurrent single predictions (max size 1 disables it)
+    PREDICTION_BATCH_MAX_SIZE = int(os.getenv("PREDICTION_BATCH_MAX_SIZE", "32"))
+    PREDICTION_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICTION_BATCH_MAX_WAIT_MS", "2"))
+    
     # CORS
     ALLOWED_ORIGINS = [
         "http://localhost:5173",
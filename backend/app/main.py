@@ -1,20 +1,26 @@
 """
 Main FastAPI application
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from app.config import settings
 from app.database import prisma, init_db
 from app.api import auth, students, predictions, info, sections, vtu_predictions, weekly_tasks
+from app.services.model_manager import model_manager
+from app.services.pagination import InvalidCursor, NEXT_CURSOR_HEADER
 
 # Lifespan context manager for startup/shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: the model loads in the background while the database connects
+    model_manager.start()
     await init_db()
     yield
     # Shutdown
+    await model_manager.stop()
+    predictions.inference.shutdown()
     await prisma.disconnect()
 
 # Create FastAPI app with lifespan
@@ -32,8 +38,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor(request: Request, exc: InvalidCursor):
+    """A tampered or stale ?cursor= is a client error"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(students.router, prefix=settings.API_V1_STR)
@@ -57,6 +69,12 @@ def health():
     """Health check"""
     return {"status": "ok"}
 
+@app.get("/api/ready")
+def ready():
+    """Readiness check: 503 until the ML model is loaded and warmed up"""
+    state = model_manager.stats()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation
 """
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime, date
 
 # ===================== Auth Schemas =====================
@@ -71,6 +71,27 @@ class StudentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class StudentImportRow(StudentCreate):
+    """One roster row of a bulk import"""
+    # Optional; when given it must be the teacher's section matching section and year
+    section_id: Optional[int] = None
+
+class StudentImportError(BaseModel):
+    """Rejected row of a roster import"""
+    index: int
+    student_id: Optional[str] = None
+    detail: str
+
+class StudentImportResponse(BaseModel):
+    """Roster import outcome"""
+    created: int
+    updated: int
+    # New rows whose student_id was created by someone else while importing
+    skipped: int = 0
+    errors: List[StudentImportError]
+    # Rows imported without a matching Section of the teacher (section_id left empty)
+    unlinked: List[int]
+
 # ===================== Section Schemas =====================
 
 class SectionCreate(BaseModel):
@@ -106,6 +127,10 @@ class PredictionRequest(BaseModel):
     engagement_score: float = Field(..., ge=0, le=10)
     student_id: Optional[int] = None  # For teachers creating predictions
 
+class BatchPredictionRequest(BaseModel):
+    """Batch prediction request schema"""
+    predictions: List[PredictionRequest] = Field(..., min_length=1, max_length=1000)
+
 
 class WeeklyTaskEntry(BaseModel):
     day: str
@@ -134,16 +159,47 @@ class PredictionResponse(BaseModel):
     pass_fail: str
     risk_category: str
     confidence: float
+    score_lower: Optional[float] = None
+    score_upper: Optional[float] = None
+    score_std: Optional[float] = None
     study_hours: float
     attendance: float
     assignments_score: float
     past_marks: float
     engagement_score: float
     created_at: datetime
+    model_version: Optional[str] = None
+    # Only on POST /predictions?explain=true: baseline_score + contributions = predicted_score
+    feature_contributions: Optional[Dict[str, float]] = None
+    baseline_score: Optional[float] = None
     
     class Config:
         from_attributes = True
 
+class BatchPredictionResult(BaseModel):
+    """Prediction outcome for one row of a batch"""
+    index: int
+    student_id: Optional[int] = None
+    predicted_score: float
+    pass_fail: str
+    risk_category: str
+    confidence: float
+    score_lower: Optional[float] = None
+    score_upper: Optional[float] = None
+    score_std: Optional[float] = None
+    model_version: Optional[str] = None
+
+class BatchPredictionError(BaseModel):
+    """Rejected row of a batch"""
+    index: int
+    detail: str
+
+class BatchPredictionResponse(BaseModel):
+    """Batch prediction response schema"""
+    created: int
+    results: List[BatchPredictionResult]
+    errors: List[BatchPredictionError]
+
 class PredictionWithStudentResponse(PredictionResponse):
     """Prediction response with student info"""
     student: Optional[StudentResponse] = None
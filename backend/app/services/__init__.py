@@ -1,12 +1,15 @@
 """
 Business logic services using Prisma ORM
 """
-from typing import Optional, List
+from typing import Any, Dict, Iterable, Optional, List, Tuple
+from pydantic import ValidationError
 from app.schemas import (
     UserRegister, StudentCreate, StudentUpdate, PredictionRequest,
+    StudentImportRow, StudentImportError, StudentImportResponse,
     SectionCreate, SectionUpdate, SectionResponse,
     RiskDistribution, ClassAnalytics
 )
+from app.services.pagination import find_page
 from app.services.security import hash_password, verify_password, create_access_token
 from prisma import Prisma
 
@@ -66,17 +69,133 @@ class StudentService:
         return db_student
     
     @staticmethod
-    async def get_students_for_teacher(prisma: Prisma, teacher_id: int) -> List:
-        """Get all students for a teacher"""
-        return await prisma.student.find_many(
-            where={"teacherId": teacher_id}
-        )
+    async def import_students(
+        prisma: Prisma, teacher_id: int, rows: Iterable[Any], chunk_size: int = 100
+    ) -> StudentImportResponse:
+        """Create or update a roster of students
+        
+        Rows are validated as they are read and written chunk_size at a time:
+        unknown student_ids with one create_many, the teacher's existing
+        students with one batched transaction. Sections are matched by
+        (section, year) against the teacher's sections, loaded once. Invalid
+        rows are reported by index and do not stop the others.
+        """
+        sections = await SectionService.get_sections_for_teacher(prisma, teacher_id)
+        section_ids = {(section.name.upper(), section.year): section.id for section in sections}
+        sections_by_id = {section.id: section for section in sections}
+        result = StudentImportResponse(created=0, updated=0, skipped=0, errors=[], unlinked=[])
+        seen = set()
+        chunk = []
+        for index, raw in enumerate(rows):
+            try:
+                row = StudentImportRow.model_validate(raw)
+            except ValidationError as e:
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                result.errors.append(StudentImportError(
+                    index=index,
+                    student_id=raw.get("student_id") if isinstance(raw, dict) else None,
+                    detail=f"{location}: {error['msg']}" if location else error["msg"]
+                ))
+                continue
+            if row.student_id in seen:
+                result.errors.append(StudentImportError(
+                    index=index, student_id=row.student_id, detail="Duplicate student_id in this import"
+                ))
+                continue
+            seen.add(row.student_id)
+            if row.section_id is not None:
+                section = sections_by_id.get(row.section_id)
+                if section is None or (section.name.upper(), section.year) != (row.section.upper(), row.year):
+                    result.errors.append(StudentImportError(
+                        index=index, student_id=row.student_id,
+                        detail=f"section_id {row.section_id} is not your section {row.section.upper()} "
+                               f"for year {row.year}"
+                    ))
+                    continue
+            chunk.append((index, row))
+            if len(chunk) == chunk_size:
+                await StudentService._import_chunk(prisma, teacher_id, chunk, section_ids, result)
+                chunk = []
+        if chunk:
+            await StudentService._import_chunk(prisma, teacher_id, chunk, section_ids, result)
+        result.errors.sort(key=lambda error: error.index)
+        return result
+    
+    @staticmethod
+    async def _import_chunk(
+        prisma: Prisma,
+        teacher_id: int,
+        chunk: List[Tuple[int, StudentImportRow]],
+        section_ids: Dict[Tuple[str, int], int],
+        result: StudentImportResponse
+    ) -> None:
+        """Write one chunk of validated import rows, recording the outcome in result"""
+        existing = {
+            student.studentId: student
+            for student in await prisma.student.find_many(
+                where={"studentId": {"in": [row.student_id for _, row in chunk]}}
+            )
+        }
+        creates, updates = [], []
+        for index, row in chunk:
+            current = existing.get(row.student_id)
+            if current is not None and current.teacherId != teacher_id:
+                result.errors.append(StudentImportError(
+                    index=index, student_id=row.student_id, detail="student_id is already in use"
+                ))
+                continue
+            section_id = section_ids.get((row.section.upper(), row.year))
+            if section_id is None:
+                result.unlinked.append(index)
+            data = {
+                "name": row.name,
+                "email": row.email,
+                "className": row.class_name,
+                "year": row.year,
+                "section": row.section.upper(),
+                "sectionId": section_id
+            }
+            if current is None:
+                creates.append({**data, "studentId": row.student_id, "teacherId": teacher_id})
+            else:
+                updates.append((current.id, data))
+        
+        if creates:
+            # skip_duplicates drops student_ids created concurrently since the lookup above
+            created = await prisma.student.create_many(data=creates, skip_duplicates=True)
+            result.created += created
+            result.skipped += len(creates) - created
+        if updates:
+            async with prisma.batch_() as batcher:
+                for student_id, data in updates:
+                    batcher.student.update(where={"id": student_id}, data=data)
+            result.updated += len(updates)
+    
+    @staticmethod
+    async def get_students_for_teacher(
+        prisma: Prisma, teacher_id: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """Get one page of a teacher's students, oldest first, and the next page's cursor"""
+        return await find_page(prisma.student, {"teacherId": teacher_id}, limit, cursor)
     
     @staticmethod
     async def get_student(prisma: Prisma, student_id: int) -> Optional:
         """Get student by ID"""
         return await prisma.student.find_unique(where={"id": student_id})
     
+    @staticmethod
+    async def get_owned_student_ids(
+        prisma: Prisma, teacher_id: int, student_ids: List[int]
+    ) -> set:
+        """Return the subset of student_ids that belong to the teacher"""
+        if not student_ids:
+            return set()
+        students = await prisma.student.find_many(
+            where={"id": {"in": list(set(student_ids))}, "teacherId": teacher_id}
+        )
+        return {s.id for s in students}
+    
     @staticmethod
     async def update_student(
         prisma: Prisma, student_id: int, teacher_id: int, update: StudentUpdate
@@ -120,6 +239,55 @@ class StudentService:
 
 # ===================== Prediction Service =====================
 
+# Class analytics of one teacher ($1) over each student's latest prediction,
+# read from the students.latest_prediction_id projection
+CLASS_ANALYTICS_SQL = """
+SELECT
+    COUNT(*)::int AS total_students,
+    COUNT(p.id)::int AS total_predictions,
+    COALESCE(AVG(p.predicted_score), 0)::float8 AS average_score,
+    COALESCE(100.0 * COUNT(*) FILTER (WHERE p.pass_fail = 'Pass') / NULLIF(COUNT(p.id), 0), 0)::float8 AS pass_rate,
+    COUNT(*) FILTER (WHERE p.risk_category = 'Low')::int AS low_risk,
+    COUNT(*) FILTER (WHERE p.risk_category = 'Medium')::int AS medium_risk,
+    COUNT(*) FILTER (WHERE p.risk_category = 'High')::int AS high_risk
+FROM students s
+LEFT JOIN predictions p ON p.id = s.latest_prediction_id
+WHERE s.teacher_id = $1
+"""
+
+# Latest prediction of each of the given students ($1), with columns named
+# like the PredictionResponse fields
+LATEST_PREDICTIONS_SQL = """
+SELECT
+    s.id AS student_id, p.id, p.predicted_score, p.pass_fail, p.risk_category, p.confidence,
+    p.score_lower, p.score_upper, p.score_std, p.study_hours, p.attendance,
+    p.assignments_score, p.past_marks, p.engagement_score, p.created_at, p.model_version
+FROM students s
+JOIN predictions p ON p.id = s.latest_prediction_id
+WHERE s.id = ANY($1)
+"""
+
+# Point a student ($2) at a new prediction ($1) unless a newer one is already set.
+# Prediction ids grow with created_at, so the guard keeps concurrent writers in order.
+SET_LATEST_PREDICTION_SQL = """
+UPDATE students SET latest_prediction_id = $1
+WHERE id = $2 AND (latest_prediction_id IS NULL OR latest_prediction_id < $1)
+"""
+
+# Recompute the projection from prediction history, for the students matching {where}
+_REFRESH_LATEST_PREDICTIONS_SQL = """
+UPDATE students s SET latest_prediction_id = latest.id
+FROM (
+    SELECT DISTINCT ON (student_id) student_id, id
+    FROM predictions
+    WHERE {where}
+    ORDER BY student_id, created_at DESC, id DESC
+) latest
+WHERE s.id = latest.student_id AND s.latest_prediction_id IS DISTINCT FROM latest.id
+"""
+REFRESH_LATEST_PREDICTIONS_SQL = _REFRESH_LATEST_PREDICTIONS_SQL.format(where="student_id = ANY($1)")
+BACKFILL_LATEST_PREDICTIONS_SQL = _REFRESH_LATEST_PREDICTIONS_SQL.format(where="student_id IS NOT NULL")
+
 class PredictionService:
     
     @staticmethod
@@ -130,32 +298,84 @@ class PredictionService:
         ml_result: dict,
         student_id: Optional[int] = None
     ):
-        """Create and store a prediction"""
-        prediction = await prisma.prediction.create(
-            data={
-                "userId": user_id,
-                "studentId": student_id,
-                "studyHours": prediction_data.study_hours,
-                "attendance": prediction_data.attendance,
-                "assignmentsScore": prediction_data.assignments_score,
-                "pastMarks": prediction_data.past_marks,
-                "engagementScore": prediction_data.engagement_score,
-                "predictedScore": ml_result['predicted_score'],
-                "passFail": ml_result['pass_fail'],
-                "riskCategory": ml_result['risk_category'],
-                "confidence": ml_result['confidence']
-            }
-        )
+        """Create and store a prediction, updating the student's latest prediction with it"""
+        async with prisma.tx() as transaction:
+            prediction = await transaction.prediction.create(
+                data=PredictionService._prediction_data(
+                    user_id, prediction_data, ml_result, student_id
+                )
+            )
+            if student_id is not None:
+                await transaction.execute_raw(SET_LATEST_PREDICTION_SQL, prediction.id, student_id)
         return prediction
     
     @staticmethod
-    async def get_user_predictions(prisma: Prisma, user_id: int, limit: int = 10) -> List:
-        """Get predictions for a user"""
-        return await prisma.prediction.find_many(
-            where={"userId": user_id},
-            order={"createdAt": "desc"},
-            take=limit
-        )
+    async def create_predictions_bulk(
+        prisma: Prisma,
+        user_id: int,
+        rows: List[Tuple[PredictionRequest, dict]]
+    ) -> int:
+        """Store many (request, ml_result) pairs with a single insert
+
+        The latest-prediction projection of the students involved is refreshed
+        in the same transaction.
+        """
+        if not rows:
+            return 0
+        student_ids = sorted({
+            prediction_data.student_id for prediction_data, _ in rows
+            if prediction_data.student_id is not None
+        })
+        async with prisma.tx() as transaction:
+            created = await transaction.prediction.create_many(
+                data=[
+                    PredictionService._prediction_data(
+                        user_id, prediction_data, ml_result, prediction_data.student_id
+                    )
+                    for prediction_data, ml_result in rows
+                ]
+            )
+            if student_ids:
+                await transaction.execute_raw(REFRESH_LATEST_PREDICTIONS_SQL, student_ids)
+        return created
+    
+    @staticmethod
+    async def backfill_latest_predictions(prisma: Prisma) -> int:
+        """Rebuild every student's latest prediction from history; returns students updated"""
+        return await prisma.execute_raw(BACKFILL_LATEST_PREDICTIONS_SQL)
+    
+    @staticmethod
+    def _prediction_data(
+        user_id: int,
+        prediction_data: PredictionRequest,
+        ml_result: dict,
+        student_id: Optional[int]
+    ) -> dict:
+        """Map a request and its ML result onto Prediction columns"""
+        return {
+            "userId": user_id,
+            "studentId": student_id,
+            "studyHours": prediction_data.study_hours,
+            "attendance": prediction_data.attendance,
+            "assignmentsScore": prediction_data.assignments_score,
+            "pastMarks": prediction_data.past_marks,
+            "engagementScore": prediction_data.engagement_score,
+            "predictedScore": ml_result['predicted_score'],
+            "passFail": ml_result['pass_fail'],
+            "riskCategory": ml_result['risk_category'],
+            "confidence": ml_result['confidence'],
+            "scoreLower": ml_result.get('score_lower'),
+            "scoreUpper": ml_result.get('score_upper'),
+            "scoreStd": ml_result.get('score_std'),
+            "modelVersion": ml_result.get('model_version')
+        }
+    
+    @staticmethod
+    async def get_user_predictions(
+        prisma: Prisma, user_id: int, limit: int = 10, cursor: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """Get one page of a user's predictions, newest first, and the next page's cursor"""
+        return await find_page(prisma.prediction, {"userId": user_id}, limit, cursor, descending=True)
     
     @staticmethod
     async def get_latest_prediction(prisma: Prisma, user_id: int) -> Optional:
@@ -167,89 +387,67 @@ class PredictionService:
     
     @staticmethod
     async def get_student_predictions(
-        prisma: Prisma, student_id: int, limit: int = 10
-    ) -> List:
-        """Get predictions for a student"""
-        return await prisma.prediction.find_many(
-            where={"studentId": student_id},
-            order={"createdAt": "desc"},
-            take=limit
-        )
+        prisma: Prisma, student_id: int, limit: int = 10, cursor: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """Get one page of a student's predictions, newest first, and the next page's cursor"""
+        return await find_page(prisma.prediction, {"studentId": student_id}, limit, cursor, descending=True)
     
     @staticmethod
-    async def get_class_predictions(prisma: Prisma, teacher_id: int) -> List:
-        """Get all predictions for a teacher's class"""
-        # Get all students for this teacher
-        students = await prisma.student.find_many(
-            where={"teacherId": teacher_id},
-            select={"id": True}
+    async def get_students_with_latest_prediction(
+        prisma: Prisma, teacher_id: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Tuple[Any, Optional[dict]]], Optional[str]]:
+        """Get one page of a teacher's students paired with their latest prediction (or None)
+
+        Two queries whatever the page size: the students, then their latest
+        predictions through the latest_prediction_id projection. Prediction
+        rows are dicts keyed by the PredictionResponse field names.
+        """
+        students, next_cursor = await StudentService.get_students_for_teacher(
+            prisma, teacher_id, limit, cursor
         )
-        student_ids = [s.id for s in students]
-        
-        if not student_ids:
-            return []
-        
-        return await prisma.prediction.find_many(
-            where={"studentId": {"in": student_ids}},
-            order={"createdAt": "desc"}
+        if not students:
+            return [], next_cursor
+        rows = await prisma.query_raw(LATEST_PREDICTIONS_SQL, [student.id for student in students])
+        latest = {row.pop("student_id"): row for row in rows}
+        return [(student, latest.get(student.id)) for student in students], next_cursor
+    
+    @staticmethod
+    async def get_class_predictions(
+        prisma: Prisma, teacher_id: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """Get one page of the predictions for a teacher's class, newest first, with their students
+
+        Only the owning teacher can predict for a student, and students never
+        change teacher, so these are the teacher's own predictions that have
+        a student. Filtering on userId walks the (userId, createdAt DESC,
+        id DESC) index instead of joining through students.
+        """
+        return await find_page(
+            prisma.prediction, {"userId": teacher_id, "studentId": {"not": None}},
+            limit, cursor, descending=True, include={"student": True}
         )
     
     @staticmethod
     async def get_class_analytics(prisma: Prisma, teacher_id: int) -> ClassAnalytics:
-        """Get analytics for a teacher's class"""
-        students = await prisma.student.find_many(
-            where={"teacherId": teacher_id}
-        )
-        student_ids = [s.id for s in students]
-        
-        if not student_ids:
-            return ClassAnalytics(
-                total_students=0,
-                total_predictions=0,
-                average_score=0,
-                risk_distribution=RiskDistribution(
-                    low_risk=0, medium_risk=0, high_risk=0
-                ),
-                pass_rate=0
-            )
-        
-        # Get latest prediction for each student
-        predictions = []
-        for student_id in student_ids:
-            pred = await prisma.prediction.find_first(
-                where={"studentId": student_id},
-                order={"createdAt": "desc"}
-            )
-            if pred:
-                predictions.append(pred)
-        
-        total_predictions = len(predictions)
-        
-        # Calculate metrics
-        if predictions:
-            avg_score = sum(p.predictedScore for p in predictions) / len(predictions)
-            pass_count = sum(1 for p in predictions if p.passFail == "Pass")
-            pass_rate = (pass_count / len(predictions)) * 100
-            
-            risk_dist = RiskDistribution(
-                low_risk=sum(1 for p in predictions if p.riskCategory == "Low"),
-                medium_risk=sum(1 for p in predictions if p.riskCategory == "Medium"),
-                high_risk=sum(1 for p in predictions if p.riskCategory == "High")
-            )
-        else:
-            avg_score = 0
-            pass_rate = 0
-            risk_dist = RiskDistribution(low_risk=0, medium_risk=0, high_risk=0)
-        
+        """Get analytics for a teacher's class
+
+        One query over the teacher's students joined to their latest
+        prediction, so the cost grows with the class, not its history.
+        """
+        row = await prisma.query_first(CLASS_ANALYTICS_SQL, teacher_id)
+        total_predictions = row["total_predictions"]
         return ClassAnalytics(
-            total_students=len(students),
+            total_students=row["total_students"],
             total_predictions=total_predictions,
-            average_score=round(avg_score, 2),
-            risk_distribution=risk_dist,
-            pass_rate=round(pass_rate, 2)
+            average_score=round(row["average_score"], 2),
+            risk_distribution=RiskDistribution(
+                low_risk=row["low_risk"],
+                medium_risk=row["medium_risk"],
+                high_risk=row["high_risk"]
+            ),
+            pass_rate=round(row["pass_rate"], 2)
         )
 
-
 from app.services.weekly_tasks import WeeklyTaskService
 
 # ===================== Section Service =====================
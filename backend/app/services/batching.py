@@ -0,0 +1,111 @@
+"""
+Micro-batching dispatcher for concurrent single-row predictions
+"""
+import asyncio
+from typing import Dict, List, Optional, Set
+
+from app.services.inference import InferenceExecutor
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, float("inf"))
+
+
+class PredictionBatcher:
+    """
+    Collects concurrent prediction requests into one batched model call
+
+    The first request to arrive opens a window of `max_wait_ms`. Every
+    request that arrives within that window joins the batch. The batch is
+    flushed when the window closes or when it reaches `max_batch` rows,
+    whichever comes first. It is then scored with one `predict_batch` call on
+    the inference executor, and each waiting request gets its own row back.
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_batch: int = 32, max_wait_ms: float = 2.0):
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_seen = 0
+        self.batch_size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    async def predict(self, features: Dict) -> Dict:
+        """Score one feature dictionary as part of the next batch"""
+        if self.max_batch <= 1:
+            return await self.executor.predict(features)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future, loop.time()))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        result = await future
+        if 'error' in result:
+            raise ValueError(result['error'])
+        return result
+
+    def _flush(self) -> None:
+        """Hand the collected rows to a dispatch task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List) -> None:
+        """Score one batch and resolve each waiting request"""
+        started = asyncio.get_running_loop().time()
+        self._record(len(batch), [started - enqueued for _, _, enqueued in batch])
+
+        try:
+            results = await self.executor.predict_batch([features for features, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, size: int, waits: List[float]) -> None:
+        self.batches += 1
+        self.rows += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        bucket = next(b for b in BATCH_SIZE_BUCKETS if size <= b)
+        self.batch_size_histogram[bucket] += 1
+        self.total_queue_wait += sum(waits)
+        self.max_queue_wait = max(self.max_queue_wait, max(waits))
+
+    def stats(self) -> Dict:
+        """Return batch-size and queue-wait metrics"""
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "rows": self.rows,
+            "pending": len(self._pending),
+            "average_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "batch_size_histogram": {
+                (f"<={b}" if b != float("inf") else f">{BATCH_SIZE_BUCKETS[-2]}"): n
+                for b, n in self.batch_size_histogram.items()
+            },
+            "average_queue_wait_ms": round(self.total_queue_wait / self.rows * 1000, 3) if self.rows else 0.0,
+            "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+        }
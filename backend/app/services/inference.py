@@ -0,0 +1,253 @@
+"""
+Inference executor that keeps CPU-bound model calls off the event loop
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../model'))
+
+# How long a warmed worker waits for the rest of the pool to load the model
+WARM_UP_BARRIER_SECONDS = 300.0
+
+
+class InferenceOverloaded(Exception):
+    """Raised when too many predictions are already queued or running"""
+
+
+class InferenceTimeout(Exception):
+    """Raised when a prediction does not finish within the configured timeout"""
+
+
+# ===================== Process worker state =====================
+
+_worker_engine = None
+_worker_model_dir = None
+_worker_engine_kwargs: Dict = {}
+
+def _init_worker(engine_kwargs: Dict, model_dir: Optional[str]) -> None:
+    """Load the model once per worker process"""
+    global _worker_engine_kwargs
+    if MODEL_DIR not in sys.path:
+        sys.path.insert(0, MODEL_DIR)
+    _worker_engine_kwargs = engine_kwargs
+    _worker_load(model_dir)
+
+def _worker_load(model_dir: Optional[str]):
+    """Return this worker's engine, reloading it if the serving version changed"""
+    global _worker_engine, _worker_model_dir
+    if _worker_engine is None or model_dir != _worker_model_dir:
+        from predict import PredictionEngine, PredictionCache
+
+        kwargs = dict(_worker_engine_kwargs)
+        cache_kwargs = kwargs.pop('cache', None)
+        if _worker_engine is not None and _worker_engine.cache is not None:
+            cache = _worker_engine.cache
+        else:
+            cache = PredictionCache(**cache_kwargs) if cache_kwargs else None
+        _worker_engine = PredictionEngine(cache=cache, model_dir=model_dir, **kwargs)
+        _worker_model_dir = model_dir
+    return _worker_engine
+
+def serving_tier(engine, tier: Optional[str]) -> Optional[str]:
+    """Use `tier` if the engine has it, otherwise the engine's default tier"""
+    return tier if tier is not None and tier in engine.tiers else None
+
+def _worker_warm_up(model_dir: Optional[str], barrier) -> int:
+    """Load and warm `model_dir`, then hold this worker until every worker has"""
+    _worker_load(model_dir).warm_up()
+    # A worker blocked here cannot take another warm-up call, so each call
+    # lands on a different process
+    barrier.wait(WARM_UP_BARRIER_SECONDS)
+    return os.getpid()
+
+def _worker_predict(model_dir: Optional[str], features: Dict, tier: Optional[str] = None,
+                    explain: bool = False) -> Dict:
+    engine = _worker_load(model_dir)
+    return engine.predict(features, serving_tier(engine, tier), explain)
+
+def _worker_predict_batch(model_dir: Optional[str], rows: List[Dict], tier: Optional[str] = None) -> List[Dict]:
+    engine = _worker_load(model_dir)
+    return engine.predict_batch(rows, serving_tier(engine, tier))
+
+
+# ===================== Executor =====================
+
+class InferenceExecutor:
+    """
+    Runs predictions in a thread or process pool
+
+    In "thread" mode the given callables run in a thread pool against the
+    engine already loaded in this process (NumPy releases the GIL for the
+    heavy parts). In "process" mode every worker process loads its own
+    engine from `model_dir` and the callables are ignored. `warm_up` moves
+    every worker to a new model directory and waits until each one confirms
+    it before the directory starts serving. A pool broken by a dead worker
+    is dropped and rebuilt on the next call.
+
+    At most `max_queue` calls may be queued or running at once; further
+    calls fail fast with InferenceOverloaded. A call that takes longer than
+    `timeout` seconds raises InferenceTimeout. The worker finishes the call
+    in the background, but the request no longer waits for it; the call
+    keeps its queue slot until the worker is done with it.
+
+    If `fallback_tier` is set, calls submitted while `fallback_queue_depth`
+    or more are already pending are scored with that cheaper distilled tier
+    instead of the engine's default. Engines without that tier ignore it.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 2,
+        max_queue: int = 64,
+        timeout: float = 5.0,
+        predict_fn: Optional[Callable[[Dict, Optional[str], bool], Dict]] = None,
+        predict_batch_fn: Optional[Callable[[List[Dict], Optional[str]], List[Dict]]] = None,
+        engine_kwargs: Optional[Dict] = None,
+        fallback_tier: Optional[str] = None,
+        fallback_queue_depth: int = 32,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"mode must be 'thread' or 'process', got {mode!r}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.engine_kwargs = engine_kwargs or {}
+        self.fallback_tier = fallback_tier or None
+        self.fallback_queue_depth = fallback_queue_depth
+        self.fallbacks = 0
+        self._predict_fn = predict_fn
+        self._predict_batch_fn = predict_batch_fn
+        self.model_dir: Optional[str] = None
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of calls currently queued or running"""
+        return self._pending
+
+    def start(self, model_dir: Optional[str] = None) -> None:
+        """Create the worker pool (called lazily on first use) with workers loading `model_dir`"""
+        if self._pool is not None:
+            return
+        if self.mode == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(dict(self.engine_kwargs), model_dir or self.model_dir)
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="inference"
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool without waiting for abandoned calls"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _discard(self, pool: Executor) -> None:
+        """Drop a pool broken by a dead worker so the next call starts a fresh one"""
+        if self._pool is pool:
+            self.shutdown()
+
+    async def warm_up(self, model_dir: Optional[str] = None) -> None:
+        """Load and warm `model_dir` in the worker processes (no-op in thread mode)"""
+        if self.mode != "process":
+            return
+        self.start(model_dir)
+        pool = self._pool
+        loop = asyncio.get_running_loop()
+        manager = await asyncio.to_thread(multiprocessing.Manager)
+        try:
+            barrier = manager.Barrier(self.max_workers)
+            pids = await asyncio.gather(*[
+                loop.run_in_executor(pool, _worker_warm_up, model_dir, barrier)
+                for _ in range(self.max_workers)
+            ])
+        except BrokenProcessPool:
+            self._discard(pool)
+            raise
+        finally:
+            manager.shutdown()
+        if len(set(pids)) != self.max_workers:
+            raise RuntimeError(f"Only {len(set(pids))} of {self.max_workers} inference workers warmed up")
+        self.model_dir = model_dir
+
+    async def predict(self, features: Dict, explain: bool = False) -> Dict:
+        """Score one feature dictionary, optionally with per-feature contributions"""
+        tier = self._choose_tier()
+        if self.mode == "process":
+            return await self._submit(_worker_predict, self.model_dir, features, tier, explain)
+        return await self._submit(self._predict_fn, features, tier, explain)
+
+    async def predict_batch(self, rows: List[Dict]) -> List[Dict]:
+        """Score many feature dictionaries in one model pass"""
+        tier = self._choose_tier()
+        if self.mode == "process":
+            return await self._submit(_worker_predict_batch, self.model_dir, rows, tier)
+        return await self._submit(self._predict_batch_fn, rows, tier)
+
+    def _choose_tier(self) -> Optional[str]:
+        """Switch to the fallback tier while the queue is saturated"""
+        if self.fallback_tier and self.fallback_queue_depth <= self._pending < self.max_queue:
+            self.fallbacks += 1
+            return self.fallback_tier
+        return None
+
+    async def _submit(self, fn: Callable, *args):
+        if self._pending >= self.max_queue:
+            raise InferenceOverloaded(
+                f"Inference queue is full ({self.max_queue} pending predictions)"
+            )
+        self.start()
+        pool = self._pool
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            work = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release()
+            self._discard(pool)
+            raise
+        except BaseException:
+            self._release()
+            raise
+        # The slot is freed when the worker finishes, not when the caller
+        # gives up, so timed-out calls still count against max_queue
+        work.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(work), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise InferenceTimeout(f"Prediction timed out after {self.timeout}s")
+        except BrokenProcessPool:
+            self._discard(pool)
+            raise
+
+    def _release(self, _work=None) -> None:
+        """Give back a queue slot (may run on a pool thread)"""
+        with self._pending_lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict:
+        """Return pool configuration and current load"""
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout,
+            "pending": self._pending,
+            "fallback_tier": self.fallback_tier,
+            "fallback_queue_depth": self.fallback_queue_depth,
+            "fallbacks": self.fallbacks,
+        }
@@ -0,0 +1,240 @@
+"""
+Background model loading, readiness tracking and hot reload
+"""
+import asyncio
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.services.inference import MODEL_DIR
+
+if MODEL_DIR not in sys.path:
+    sys.path.insert(0, MODEL_DIR)
+
+import registry
+
+
+class ModelNotReady(Exception):
+    """Raised when a prediction is requested before the model is usable"""
+
+
+class ModelManager:
+    """
+    Owns the serving PredictionEngine
+
+    `start()` loads the engine and warms it up in a background thread, so the
+    app starts accepting requests right away. Until loading finishes,
+    `require_engine()` raises ModelNotReady. A failed load keeps raising
+    until the app is restarted. Callers must turn this into an explicit 503.
+    They must never substitute a made-up result.
+
+    The engine comes from the active version in the model registry. If
+    nothing has been published yet, it falls back to the model/ directory.
+    While running, the registry is polled every `poll_interval` seconds.
+    When a new version is activated, it is loaded and warmed in the
+    background and then swapped in with a single reference assignment.
+    Requests hold a lease on the engine they started with, and the old
+    engine is released only after those leases drain.
+
+    `on_ready(model_dir)` is awaited after a version is loaded and before it
+    serves traffic. The inference executor uses it to warm its worker
+    processes.
+    """
+
+    def __init__(
+        self,
+        registry_dir: str = registry.REGISTRY_DIR,
+        default_dir: str = MODEL_DIR,
+        poll_interval: float = 10.0,
+        drain_timeout: float = 30.0,
+        engine_kwargs: Optional[Dict] = None,
+        cache_kwargs: Optional[Dict] = None,
+    ):
+        self.registry_dir = registry_dir
+        self.default_dir = default_dir
+        self.poll_interval = poll_interval
+        self.drain_timeout = drain_timeout
+        self.engine_kwargs = engine_kwargs or {}
+        self.cache_kwargs = cache_kwargs
+        self.engine = None
+        self.cache = None
+        self.active_version: Optional[str] = None
+        self.model_dir: Optional[str] = None
+        self.status = "not_loaded"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.reloads = 0
+        self.on_ready: Optional[Callable[[str], Awaitable[None]]] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._failed_version: Optional[str] = None
+        self._leases: Dict[int, int] = {}
+        self._lease_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def start(self) -> asyncio.Task:
+        """Begin loading in the background (call from the running event loop)"""
+        if self._task is None:
+            self._ready = asyncio.Event()
+            self._task = asyncio.create_task(self._load())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop watching the registry"""
+        for task in (self._watch_task, self._task):
+            if task is not None and not task.done():
+                task.cancel()
+
+    async def _load(self) -> None:
+        self.status = "loading"
+        started = time.perf_counter()
+        version = registry.active_version(self.registry_dir)
+        try:
+            await self._activate(version)
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            self._failed_version = version
+            print(f"Error: Could not load ML model: {e}")
+        else:
+            self.status = "ready"
+            print(f"✓ ML model {self.engine.model_version} loaded and warmed up ({self.engine.load_source})")
+        finally:
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            self._ready.set()
+
+        if self.poll_interval > 0:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def _watch(self) -> None:
+        """Poll the registry and hot-swap newly activated versions"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            version = registry.active_version(self.registry_dir)
+            if version is None or version in (self.active_version, self._failed_version):
+                continue
+            try:
+                await self._activate(version)
+            except Exception as e:
+                # Keep serving the current model; a later publish can still replace it
+                self._failed_version = version
+                print(f"Error: Could not load model version {version}: {e}")
+            else:
+                self.reloads += 1
+                self.status, self.error = "ready", None
+                print(f"✓ Switched to ML model {self.engine.model_version}")
+
+    async def _activate(self, version: Optional[str]) -> None:
+        """Load, warm and swap in a version, then drain the previous engine"""
+        model_dir = registry.version_dir(version, self.registry_dir) if version else self.default_dir
+        engine = await asyncio.to_thread(self._build_engine, model_dir)
+        if self.on_ready is not None:
+            await self.on_ready(model_dir)
+
+        previous = self.engine
+        self.engine, self.active_version, self.model_dir = engine, version, model_dir
+        if previous is not None:
+            await self._drain(previous)
+
+    def _build_engine(self, model_dir: str):
+        """Import, load and warm up an engine (runs in a worker thread)"""
+        from predict import PredictionEngine, PredictionCache
+
+        # One cache is shared by all versions; entries are keyed by model version
+        if self.cache is None and self.cache_kwargs:
+            self.cache = PredictionCache(**self.cache_kwargs)
+        engine = PredictionEngine(cache=self.cache, model_dir=model_dir, **self.engine_kwargs)
+        engine.warm_up()
+        return engine
+
+    async def _drain(self, engine) -> None:
+        """Wait until no request is still using a replaced engine"""
+        deadline = time.monotonic() + self.drain_timeout
+        while self._leases.get(id(engine), 0) > 0 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        with self._lease_lock:
+            self._leases.pop(id(engine), None)
+
+    @contextmanager
+    def lease(self):
+        """Use the current engine for one call, keeping it alive across a swap"""
+        with self._lease_lock:
+            engine = self.require_engine()
+            self._leases[id(engine)] = self._leases.get(id(engine), 0) + 1
+        try:
+            yield engine
+        finally:
+            with self._lease_lock:
+                if id(engine) in self._leases:
+                    self._leases[id(engine)] -= 1
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for loading to finish; returns readiness"""
+        if self.ready or self._ready is None or timeout <= 0:
+            return self.ready
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.ready
+
+    def require_engine(self):
+        """Return the loaded engine or raise ModelNotReady"""
+        if not self.ready:
+            if self.status == "failed":
+                raise ModelNotReady(f"ML model failed to load: {self.error}")
+            raise ModelNotReady("ML model is still loading, retry shortly")
+        return self.engine
+
+    def model_info(self) -> Optional[Dict]:
+        """Metadata of the serving version, from memory"""
+        if self.engine is None:
+            return None
+        return {
+            **self.engine.model_info,
+            "model_version": self.engine.model_version,
+            "registry_version": self.active_version,
+        }
+
+    def stats(self) -> Dict:
+        """Return loading state for the readiness endpoint"""
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "model_version": self.engine.model_version if self.engine else None,
+            "training_hash": self.engine.model_info.get("training_hash") if self.engine else None,
+            "registry_version": self.active_version,
+            "load_source": getattr(self.engine, "load_source", None),
+            "load_seconds": self.load_seconds,
+            "reloads": self.reloads,
+            "error": self.error,
+        }
+
+
+# Shared by the prediction and info routes; started by the app lifespan
+model_manager = ModelManager(
+    registry_dir=settings.MODEL_REGISTRY_DIR or registry.REGISTRY_DIR,
+    poll_interval=settings.MODEL_REGISTRY_POLL_SECONDS,
+    engine_kwargs={
+        "backend": settings.MODEL_BACKEND,
+        "sklearn_min_rows": settings.MODEL_SKLEARN_MIN_ROWS,
+        "tier": settings.MODEL_TIER,
+        "early_exit": settings.MODEL_EARLY_EXIT or None,
+        "early_exit_confidence": settings.MODEL_EARLY_EXIT_CONFIDENCE,
+        "interval_coverage": settings.PREDICTION_INTERVAL_COVERAGE,
+        "parallel_min_rows": settings.INFERENCE_PARALLEL_MIN_ROWS,
+        "max_threads": settings.INFERENCE_THREADS_PER_WORKER,
+    },
+    cache_kwargs={
+        "max_size": settings.PREDICTION_CACHE_SIZE,
+        "ttl_seconds": settings.PREDICTION_CACHE_TTL_SECONDS,
+        "precision": settings.PREDICTION_CACHE_PRECISION,
+    } if settings.PREDICTION_CACHE_SIZE > 0 else None,
+)
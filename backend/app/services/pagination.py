@@ -0,0 +1,79 @@
+"""
+Keyset (cursor) pagination on (createdAt, id)
+
+A page is read with a stable (createdAt, id) order and a WHERE clause that
+starts right after the last row of the previous page, so the database seeks
+through an index instead of skipping rows, and deep pages cost as much as the
+first. The position is handed to clients as an opaque cursor token.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """A cursor token that encode_cursor did not produce"""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque token for the position just after a row"""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """(createdAt, id) of the row a token points after; raises InvalidCursor"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
+def keyset_order(descending: bool = False) -> List[Dict[str, str]]:
+    """Stable sort for paging: createdAt, then id to break ties"""
+    direction = "desc" if descending else "asc"
+    return [{"createdAt": direction}, {"id": direction}]
+
+
+def keyset_where(where: Dict[str, Any], cursor: Optional[str], descending: bool = False) -> Dict[str, Any]:
+    """Add the 'after this cursor' condition to a find_many where clause"""
+    if not cursor:
+        return where
+    created_at, row_id = decode_cursor(cursor)
+    beyond = "lt" if descending else "gt"
+    return {
+        "AND": [
+            where,
+            {"OR": [
+                {"createdAt": {beyond: created_at}},
+                {"createdAt": created_at, "id": {beyond: row_id}},
+            ]},
+        ]
+    }
+
+
+async def find_page(
+    delegate, where: Dict[str, Any], limit: int, cursor: Optional[str] = None,
+    descending: bool = False, **find_args
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of a Prisma model delegate (e.g. prisma.student)
+
+    Returns:
+        Up to limit rows and the cursor of the next page (None on the last page)
+    """
+    rows = await delegate.find_many(
+        where=keyset_where(where, cursor, descending),
+        order=keyset_order(descending),
+        take=limit + 1,
+        **find_args
+    )
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].createdAt, rows[-1].id)
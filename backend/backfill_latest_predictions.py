@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+"""Rebuild each student's latest prediction (students.latest_prediction_id).
+
+New predictions keep it up to date. Run this once after applying the schema
+to a database that already has predictions, or after deleting predictions:
+
+cd backend
+python -m prisma migrate deploy   # or: python -m prisma db push
+python backfill_latest_predictions.py
+"""
+import asyncio
+
+from app.database import prisma
+from app.services import PredictionService
+
+
+async def backfill() -> None:
+    await prisma.connect()
+    try:
+        updated = await PredictionService.backfill_latest_predictions(prisma)
+        print(f"✓ Latest prediction updated for {updated} students")
+    finally:
+        await prisma.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""Benchmark class analytics against class size.
+
+Creates a throwaway teacher, grows their class through each size in --sizes
+(each student gets --predictions-per-student predictions), and times
+PredictionService.get_class_analytics, a single query over the students and
+their latest_prediction_id projection, next to the previous per-student loop
+(one find_first per student). Everything it created is deleted at the end.
+
+Needs the database from DATABASE_URL with the schema applied:
+
+cd backend
+python benchmark_analytics.py [--sizes 10 100 1000 10000] [--repeats 5]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from prisma import Prisma
+
+from app.services import PredictionService, REFRESH_LATEST_PREDICTIONS_SQL
+
+INSERT_BATCH = 1000
+
+
+async def legacy_class_analytics(prisma: Prisma, teacher_id: int) -> dict:
+    """The replaced implementation: one round trip per student"""
+    students = await prisma.student.find_many(where={"teacherId": teacher_id})
+    predictions = []
+    for student in students:
+        pred = await prisma.prediction.find_first(
+            where={"studentId": student.id},
+            order={"createdAt": "desc"}
+        )
+        if pred:
+            predictions.append(pred)
+    if not predictions:
+        return {"total_predictions": 0}
+    return {
+        "total_predictions": len(predictions),
+        "average_score": round(sum(p.predictedScore for p in predictions) / len(predictions), 2),
+        "pass_rate": round(100 * sum(p.passFail == "Pass" for p in predictions) / len(predictions), 2)
+    }
+
+
+async def median_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def add_students(prisma: Prisma, teacher_id: int, tag: str, start: int, stop: int,
+                       predictions_per_student: int) -> None:
+    for first in range(start, stop, INSERT_BATCH):
+        await prisma.student.create_many(data=[
+            {
+                "studentId": f"BENCH-{tag}-{i}",
+                "name": f"Benchmark Student {i}",
+                "email": f"bench-{tag}-{i}@example.com",
+                "className": "Benchmark",
+                "teacherId": teacher_id
+            }
+            for i in range(first, min(first + INSERT_BATCH, stop))
+        ])
+    students = await prisma.student.find_many(
+        where={"teacherId": teacher_id},
+        order={"id": "asc"},
+        skip=start
+    )
+    rows = []
+    for student in students:
+        for k in range(predictions_per_student):
+            score = 35 + (student.id * 7 + k * 13) % 60
+            rows.append({
+                "userId": teacher_id,
+                "studentId": student.id,
+                "studyHours": 4, "attendance": 85, "assignmentsScore": 75,
+                "pastMarks": 70, "engagementScore": 6,
+                "predictedScore": score,
+                "passFail": "Pass" if score >= 50 else "Fail",
+                "riskCategory": "Low" if score >= 75 else "Medium" if score >= 60 else "High",
+                "confidence": 0.9
+            })
+    # Batched to stay well under PostgreSQL's bind parameter limit
+    for offset in range(0, len(rows), INSERT_BATCH):
+        await prisma.prediction.create_many(data=rows[offset:offset + INSERT_BATCH])
+    await prisma.execute_raw(REFRESH_LATEST_PREDICTIONS_SQL, [student.id for student in students])
+
+
+async def main(sizes, repeats: int, predictions_per_student: int, legacy_max: int) -> None:
+    prisma = Prisma()
+    await prisma.connect()
+    tag = uuid.uuid4().hex[:8]
+    teacher = await prisma.user.create(data={
+        "email": f"bench-teacher-{tag}@example.com",
+        "fullName": "Benchmark Teacher",
+        "hashedPassword": "!",
+        "role": "teacher"
+    })
+    try:
+        print(f"{'students':>9} {'single query ms':>16} {'per-student loop ms':>20}")
+        created = 0
+        for size in sorted(sizes):
+            await add_students(prisma, teacher.id, tag, created, size, predictions_per_student)
+            created = size
+            single = await median_ms(lambda: PredictionService.get_class_analytics(prisma, teacher.id), repeats)
+            if size <= legacy_max:
+                legacy = await median_ms(lambda: legacy_class_analytics(prisma, teacher.id), repeats)
+                legacy_text = f"{legacy:20.1f}"
+            else:
+                legacy_text = f"{'skipped':>20}"
+            print(f"{size:>9,} {single:16.1f} {legacy_text}")
+    finally:
+        # Students and predictions cascade with the teacher
+        await prisma.user.delete(where={"id": teacher.id})
+        await prisma.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark class analytics against class size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--predictions-per-student", type=int, default=3)
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="largest class to time with the per-student loop")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.repeats, args.predictions_per_student, args.legacy_max))
@@ -0,0 +1,23 @@
+-- AlterTable
+ALTER TABLE "predictions" ADD COLUMN     "model_version" TEXT,
+ADD COLUMN     "score_lower" DOUBLE PRECISION,
+ADD COLUMN     "score_std" DOUBLE PRECISION,
+ADD COLUMN     "score_upper" DOUBLE PRECISION;
+
+-- AlterTable
+ALTER TABLE "students" ADD COLUMN     "latest_prediction_id" INTEGER;
+
+-- CreateIndex
+CREATE UNIQUE INDEX "students_latest_prediction_id_key" ON "students"("latest_prediction_id");
+
+-- CreateIndex
+CREATE INDEX "students_teacher_id_created_at_id_idx" ON "students"("teacher_id", "created_at", "id");
+
+-- CreateIndex
+CREATE INDEX "predictions_student_id_created_at_id_idx" ON "predictions"("student_id", "created_at" DESC, "id" DESC);
+
+-- CreateIndex
+CREATE INDEX "predictions_user_id_created_at_id_idx" ON "predictions"("user_id", "created_at" DESC, "id" DESC);
+
+-- AddForeignKey
+ALTER TABLE "students" ADD CONSTRAINT "students_latest_prediction_id_fkey" FOREIGN KEY ("latest_prediction_id") REFERENCES "predictions"("id") ON DELETE SET NULL ON UPDATE CASCADE;
@@ -0,0 +1,91 @@
+"""
+PredictionBatcher coalesces concurrent requests into one model call and fans results back out
+"""
+import asyncio
+
+from app.services.batching import PredictionBatcher
+
+
+class FakeExecutor:
+    """Records each predict_batch call and echoes every row's study hours back"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    async def predict_batch(self, rows):
+        self.calls.append(list(rows))
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return [
+            {"error": "invalid row"} if row["study_hours"] < 0 else {"predicted_score": row["study_hours"]}
+            for row in rows
+        ]
+
+
+def submit(batcher, hours):
+    async def run():
+        return await asyncio.gather(
+            *(batcher.predict({"study_hours": h}) for h in hours), return_exceptions=True
+        )
+    return asyncio.run(run())
+
+
+def test_concurrent_requests_share_one_call():
+    executor = FakeExecutor()
+    batcher = PredictionBatcher(executor, max_batch=32, max_wait_ms=50)
+
+    results = submit(batcher, [1.0, 2.0, 3.0, 4.0])
+
+    assert len(executor.calls) == 1
+    assert [row["study_hours"] for row in executor.calls[0]] == [1.0, 2.0, 3.0, 4.0]
+    assert results == [{"predicted_score": h} for h in (1.0, 2.0, 3.0, 4.0)]
+    assert batcher.stats()["batches"] == 1
+    assert batcher.stats()["max_batch_size"] == 4
+
+
+def test_full_batches_flush_without_waiting():
+    executor = FakeExecutor()
+    batcher = PredictionBatcher(executor, max_batch=2, max_wait_ms=10_000)
+
+    results = submit(batcher, [1.0, 2.0, 3.0, 4.0])
+
+    assert [len(rows) for rows in executor.calls] == [2, 2]
+    assert results == [{"predicted_score": h} for h in (1.0, 2.0, 3.0, 4.0)]
+
+
+def test_a_failed_call_reaches_every_waiter():
+    error = RuntimeError("worker died")
+    executor = FakeExecutor(error=error)
+    batcher = PredictionBatcher(executor, max_batch=32, max_wait_ms=50)
+
+    results = submit(batcher, [1.0, 2.0, 3.0])
+
+    assert len(executor.calls) == 1
+    assert results == [error, error, error]
+
+
+def test_a_row_error_only_fails_its_own_request():
+    executor = FakeExecutor()
+    batcher = PredictionBatcher(executor, max_batch=32, max_wait_ms=50)
+
+    first, bad, last = submit(batcher, [1.0, -1.0, 3.0])
+
+    assert len(executor.calls) == 1
+    assert first == {"predicted_score": 1.0}
+    assert isinstance(bad, ValueError) and str(bad) == "invalid row"
+    assert last == {"predicted_score": 3.0}
+
+
+def test_batching_disabled_calls_predict_per_request():
+    class SingleRowExecutor(FakeExecutor):
+        async def predict(self, features):
+            self.calls.append([features])
+            return {"predicted_score": features["study_hours"]}
+
+    executor = SingleRowExecutor()
+    results = submit(PredictionBatcher(executor, max_batch=1), [1.0, 2.0])
+
+    assert len(executor.calls) == 2
+    assert results == [{"predicted_score": 1.0}, {"predicted_score": 2.0}]
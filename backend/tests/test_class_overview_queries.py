@@ -0,0 +1,84 @@
+"""
+The class students-overview must cost a fixed number of queries, not one per student
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import PredictionService
+
+TEACHER_ID = 7
+STARTED = datetime(2025, 1, 1)
+
+
+class CountingDelegate:
+    """A Prisma model delegate that answers find_many and records every call"""
+
+    def __init__(self, name, calls, rows):
+        self._name = name
+        self._calls = calls
+        self._rows = rows
+
+    def __getattr__(self, method):
+        async def call(*args, **kwargs):
+            self._calls.append(f"{self._name}.{method}")
+            if method != "find_many":
+                raise AssertionError(f"unexpected query {self._name}.{method}")
+            return self._rows[:kwargs.get("take", len(self._rows))]
+        return call
+
+
+class FakePrisma:
+    """Just enough of the Prisma client for the overview, counting round trips"""
+
+    def __init__(self, n_students):
+        self.calls = []
+        self.students = [
+            SimpleNamespace(id=i, teacherId=TEACHER_ID, createdAt=STARTED + timedelta(minutes=i))
+            for i in range(1, n_students + 1)
+        ]
+        self.student = CountingDelegate("student", self.calls, self.students)
+        self.prediction = CountingDelegate("prediction", self.calls, [])
+
+    async def query_raw(self, query, student_ids):
+        self.calls.append("query_raw")
+        # Every other student has a prediction
+        return [
+            {"student_id": i, "id": 1000 + i, "predicted_score": 70.0}
+            for i in student_ids if i % 2
+        ]
+
+
+def overview(n_students):
+    prisma = FakePrisma(n_students)
+    pairs, next_cursor = asyncio.run(
+        PredictionService.get_students_with_latest_prediction(prisma, TEACHER_ID, limit=500)
+    )
+    return prisma, pairs, next_cursor
+
+
+@pytest.mark.parametrize("n_students", [1, 10, 250])
+def test_overview_query_count_is_constant(n_students):
+    prisma, pairs, next_cursor = overview(n_students)
+
+    assert prisma.calls == ["student.find_many", "query_raw"]
+    assert len(pairs) == n_students
+    assert next_cursor is None
+
+
+def test_overview_pairs_students_with_their_latest_prediction():
+    _, pairs, _ = overview(4)
+
+    assert [(student.id, prediction and prediction["id"]) for student, prediction in pairs] == [
+        (1, 1001), (2, None), (3, 1003), (4, None)
+    ]
+    assert "student_id" not in pairs[0][1]
+
+
+def test_overview_without_students_skips_the_prediction_query():
+    prisma, pairs, _ = overview(0)
+
+    assert prisma.calls == ["student.find_many"]
+    assert pairs == []
@@ -0,0 +1,127 @@
+"""
+Keyset cursors round-trip, reject tokens they did not produce and page through ties
+"""
+import asyncio
+import base64
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, find_page, keyset_order, keyset_where
+)
+
+STARTED = datetime(2025, 1, 1, 8, 30, 15, 250000)
+
+
+def token(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def matches(row, where):
+    """Evaluate the subset of Prisma where clauses keyset_where produces"""
+    for field, condition in where.items():
+        if field == "AND":
+            if not all(matches(row, clause) for clause in condition):
+                return False
+        elif field == "OR":
+            if not any(matches(row, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = getattr(row, field)
+            for op, operand in condition.items():
+                if not {"gt": value > operand, "lt": value < operand}[op]:
+                    return False
+        elif getattr(row, field) != condition:
+            return False
+    return True
+
+
+class FakeDelegate:
+    """find_many over in-memory rows, honouring where, order and take"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def find_many(self, where, order, take):
+        rows = [row for row in self.rows if matches(row, where)]
+        descending = order[0]["createdAt"] == "desc"
+        rows.sort(key=lambda row: (row.createdAt, row.id), reverse=descending)
+        return rows[:take]
+
+
+def rows_with_ties():
+    # Pairs of rows share a createdAt, and ids do not follow creation order
+    return [
+        SimpleNamespace(id=row_id, teacherId=1, createdAt=STARTED + timedelta(seconds=minute))
+        for row_id, minute in [(5, 0), (2, 0), (9, 1), (3, 1), (7, 2), (1, 3), (8, 3)]
+    ]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(STARTED, 42)) == (STARTED, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    "x",
+    token(b"\xff\xfe"),
+    token(b'{"created_at": "2025-01-01"}'),
+    token(b'["2025-01-01T00:00:00", 1, 2]'),
+    token(b'["yesterday", 1]'),
+    token(b'["2025-01-01T00:00:00", "one"]'),
+    token(b'[null, 1]'),
+])
+def test_invalid_cursors_raise(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+    with pytest.raises(InvalidCursor):
+        keyset_where({"teacherId": 1}, cursor)
+
+
+def test_tampered_cursor_raises():
+    cursor = encode_cursor(STARTED, 42)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor[:-3])
+
+
+def test_first_page_keeps_the_where_clause():
+    assert keyset_where({"teacherId": 1}, None) == {"teacherId": 1}
+
+
+@pytest.mark.parametrize("descending, beyond", [(False, "gt"), (True, "lt")])
+def test_keyset_where_breaks_created_at_ties_by_id(descending, beyond):
+    where = keyset_where({"teacherId": 1}, encode_cursor(STARTED, 42), descending)
+
+    assert where == {"AND": [
+        {"teacherId": 1},
+        {"OR": [
+            {"createdAt": {beyond: STARTED}},
+            {"createdAt": STARTED, "id": {beyond: 42}},
+        ]},
+    ]}
+    assert keyset_order(descending) == [{"createdAt": "desc" if descending else "asc"},
+                                        {"id": "desc" if descending else "asc"}]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_row_once_across_ties(descending):
+    rows = rows_with_ties()
+    delegate = FakeDelegate(rows)
+    seen, cursor = [], None
+    while True:
+        page, cursor = asyncio.run(find_page(delegate, {"teacherId": 1}, 2, cursor, descending))
+        seen.extend(row.id for row in page)
+        if cursor is None:
+            break
+
+    expected = sorted(rows, key=lambda row: (row.createdAt, row.id), reverse=descending)
+    assert seen == [row.id for row in expected]
+
+
+def test_last_page_has_no_cursor():
+    page, cursor = asyncio.run(find_page(FakeDelegate(rows_with_ties()), {"teacherId": 1}, 7))
+
+    assert len(page) == 7
+    assert cursor is None
@@ -0,0 +1,55 @@
+"""
+PredictionCache evicts least recently used entries, expires them and keeps model versions apart
+"""
+import predict
+from predict import PredictionCache
+
+RESULT = {"predicted_score": 70.0}
+
+
+def test_full_cache_evicts_the_least_recently_used_entry():
+    cache = PredictionCache(max_size=2)
+    cache.put("v1", (1.0,), {"predicted_score": 1.0})
+    cache.put("v1", (2.0,), {"predicted_score": 2.0})
+    # Reading (1.0,) makes (2.0,) the least recently used
+    assert cache.get("v1", (1.0,)) == {"predicted_score": 1.0}
+
+    cache.put("v1", (3.0,), {"predicted_score": 3.0})
+
+    assert cache.get("v1", (2.0,)) is None
+    assert cache.get("v1", (1.0,)) == {"predicted_score": 1.0}
+    assert cache.get("v1", (3.0,)) == {"predicted_score": 3.0}
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(predict.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(ttl_seconds=60)
+    cache.put("v1", (1.0,), RESULT)
+
+    now[0] += 60
+    assert cache.get("v1", (1.0,)) == RESULT
+    now[0] += 0.001
+    assert cache.get("v1", (1.0,)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_results_are_not_shared_between_model_versions():
+    cache = PredictionCache()
+    cache.put("v1", (1.0,), RESULT)
+
+    assert cache.get("v2", (1.0,)) is None
+    cache.put("v2", (1.0,), {"predicted_score": 55.0})
+    assert cache.get("v1", (1.0,)) == RESULT
+    assert cache.get("v2", (1.0,)) == {"predicted_score": 55.0}
+    assert cache.stats()["model_version"] == "v2"
+
+
+def test_results_are_copies():
+    cache = PredictionCache()
+    cache.put("v1", (1.0,), RESULT)
+
+    cache.get("v1", (1.0,))["predicted_score"] = 0.0
+
+    assert cache.get("v1", (1.0,)) == RESULT
@@ -0,0 +1,60 @@
+"""
+Roster imports report what create_many actually inserted
+"""
+import asyncio
+from types import SimpleNamespace
+
+from app.services import StudentService
+
+TEACHER_ID = 7
+
+
+class FakePrisma:
+    """Sections, existing students and a create_many that loses some rows to a concurrent import"""
+
+    def __init__(self, existing=(), taken_during_import=()):
+        self.created = []
+        self.section = SimpleNamespace(find_many=self._no_rows)
+        self.student = SimpleNamespace(find_many=self._existing, create_many=self._create_many)
+        self._existing_rows = list(existing)
+        self._taken = set(taken_during_import)
+
+    async def _no_rows(self, **kwargs):
+        return []
+
+    async def _existing(self, **kwargs):
+        return self._existing_rows
+
+    async def _create_many(self, data, skip_duplicates):
+        assert skip_duplicates
+        inserted = [row for row in data if row["studentId"] not in self._taken]
+        self.created.extend(inserted)
+        return len(inserted)
+
+
+def roster(*student_ids):
+    return [
+        {"student_id": s, "name": s, "email": f"{s.lower()}@school.com",
+         "class_name": "Grade 10-A", "year": 2, "section": "A"}
+        for s in student_ids
+    ]
+
+
+def test_rows_lost_to_a_concurrent_import_are_skipped_not_created():
+    prisma = FakePrisma(taken_during_import={"STU002"})
+
+    result = asyncio.run(StudentService.import_students(prisma, TEACHER_ID, roster("STU001", "STU002", "STU003")))
+
+    assert [row["studentId"] for row in prisma.created] == ["STU001", "STU003"]
+    assert (result.created, result.skipped, result.updated) == (2, 1, 0)
+    assert result.errors == []
+
+
+def test_counts_add_up_across_chunks():
+    prisma = FakePrisma(taken_during_import={"STU001", "STU004"})
+
+    result = asyncio.run(StudentService.import_students(
+        prisma, TEACHER_ID, roster("STU001", "STU002", "STU003", "STU004", "STU005"), chunk_size=2
+    ))
+
+    assert (result.created, result.skipped) == (3, 2)
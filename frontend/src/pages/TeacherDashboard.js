@@ -14,6 +14,8 @@ const Badge = ({ children, tone = 'green' }) => {
 };
 export const TeacherDashboard = () => {
     const [students, setStudents] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [analytics, setAnalytics] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
@@ -38,10 +40,12 @@ export const TeacherDashboard = () => {
         try {
             setLoading(true);
             setError('');
-            const [studentsData, analyticsData] = await Promise.all([
+            setNextCursor(null);
+            const [firstPage, analyticsData] = await Promise.all([
                 predictionService.getClassStudentsOverview(),
                 predictionService.getClassAnalytics(),
             ]);
+            const studentsData = firstPage.items;
             // If backend returns nothing, fallback to demo dataset
             if ((!studentsData || studentsData.length === 0) && !analyticsData) {
                 const demoStudents = [
@@ -130,6 +134,7 @@ export const TeacherDashboard = () => {
             }
             else {
                 setStudents(studentsData || []);
+                setNextCursor(firstPage.next_cursor);
                 setAnalytics(analyticsData || null);
             }
         }
@@ -223,6 +228,22 @@ export const TeacherDashboard = () => {
             setLoading(false);
         }
     };
+    const loadMore = async () => {
+        if (!nextCursor)
+            return;
+        try {
+            setLoadingMore(true);
+            const page = await predictionService.getClassStudentsOverview(nextCursor);
+            setStudents((prev) => [...prev, ...page.items]);
+            setNextCursor(page.next_cursor);
+        }
+        catch (err) {
+            setError('Unable to load more students');
+        }
+        finally {
+            setLoadingMore(false);
+        }
+    };
     const addSection = () => {
         const s = newSectionName.trim().toUpperCase();
         if (!s)
@@ -293,5 +314,5 @@ export const TeacherDashboard = () => {
                 return 'text-gray-700 bg-gray-50';
         }
     };
-    return (_jsx("div", { className: "min-h-screen bg-gray-50 py-12 px-4", children: _jsxs("div", { className: "max-w-7xl mx-auto", children: [_jsx("h1", { className: "text-4xl font-bold text-gray-900 mb-2", children: "\uD83D\uDC68\u200D\uD83C\uDFEB Class Dashboard" }), _jsx("p", { className: "text-gray-600 mb-8", children: "Manage students and track class performance" }), error && (_jsx("div", { className: "bg-red-50 border border-red-200 text-red-700 px-4 py-3 rounded mb-6", children: error })), analytics && (_jsxs("div", { className: "grid md:grid-cols-4 gap-4 mb-8", children: [_jsx(StatCard, { title: "Total Students", value: analytics.total_students, subtitle: "Active in selected class", gradient: "bg-gradient-to-r from-indigo-500 to-purple-600", icon: _jsxs("svg", { xmlns: "http://www.w3.org/2000/svg", className: "w-6 h-6 text-white", fill: "none", viewBox: "0 0 24 24", stroke: "currentColor", children: [_jsx("path", { strokeLinecap: "round", strokeLinejoin: "round", strokeWidth: 2, d: "M16 11V7a4 4 0 10-8 0v4" }), _jsx("path", { strokeLinecap: "round", strokeLinejoin: "round", strokeWidth: 2, d: "M12 14v7" })] }) }), _jsx(StatCard, { title: "Average Score", value: analytics.average_score.toFixed(1), subtitle: "Class progress (0-100)", gradient: "bg-gradient-to-r from-green-400 to-blue-500", icon: _jsx("svg", { xmlns: "http://www.w3.org/2000/svg", className: "w-6 h-6 text-white", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", children: _jsx("path", { strokeLinecap: "round", strokeLinejoin: "round", strokeWidth: 2, d: "M11 17a4 4 0 100-8 4 4 0 000 8z" }) }) }), _jsxs("div", { className: "md:col-span-2 bg-white rounded-2xl p-5 shadow-lg", children: [_jsxs("div", { className: "flex items-center justify-between mb-3", children: [_jsxs("div", { children: [_jsx("p", { className: "text-sm text-gray-500", children: "Class Momentum" }), _jsxs("p", { className: "text-lg font-bold text-gray-900", children: [analytics.average_score.toFixed(1), " / 100"] })] }), _jsx("div", { className: "text-right", children: _jsxs(Badge, { tone: "green", children: ["Pass ", Math.round(analytics.pass_rate), "%"] }) })] }), _jsx("div", { className: "mb-4", children: _jsx(ProgressBar, { value: analytics.average_score, label: "Average Score" }) }), _jsxs("div", { className: "flex gap-3 items-center", children: [_jsxs("div", { className: "flex-1", children: [_jsx("p", { className: "text-xs text-gray-500", children: "Predictions" }), _jsx("p", { className: "text-sm font-semibold text-gray-800", children: analytics.total_predictions })] }), _jsx("div", { className: "w-28 h-16 flex items-center justify-center bg-gradient-to-r from-yellow-200 to-pink-200 rounded-lg", children: _jsxs("svg", { viewBox: "0 0 64 64", className: "w-12 h-12", xmlns: "http://www.w3.org/2000/svg", children: [_jsx("circle", { cx: "32", cy: "32", r: "30", fill: "#fff", opacity: "0.2" }), _jsx("path", { d: "M32 12 L39 28 L56 28 L42 36 L48 52 L32 42 L16 52 L22 36 L8 28 L25 28 Z", fill: "#fff", opacity: "0.9" })] }) })] })] })] })), analytics && (_jsxs("div", { className: "bg-white rounded-lg shadow-lg p-6 mb-8", children: [_jsx("h2", { className: "text-2xl font-bold text-gray-900 mb-4", children: "Risk Distribution" }), _jsxs("div", { className: "grid md:grid-cols-3 gap-4", children: [_jsxs("div", { className: "p-4 rounded-lg bg-gradient-to-r from-green-50 to-green-100 border border-green-200 flex items-center gap-4", children: [_jsx("div", { className: "p-3 bg-white rounded-lg shadow-sm", children: _jsx("svg", { className: "w-8 h-8 text-green-600", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", strokeWidth: 1.5, children: _jsx("path", { d: "M12 2l3 7h7l-5.5 4 2 7L12 16l-6.5 4 2-7L2 9h7l3-7z" }) }) }), _jsxs("div", { children: [_jsx("p", { className: "text-sm text-gray-700", children: "Low Risk" }), _jsxs("div", { className: "mt-1 flex items-center gap-2", children: [_jsx("p", { className: "text-2xl font-bold text-green-700", children: analytics.risk_distribution.low_risk }), _jsx(Badge, { tone: "green", children: "Good" })] }), _jsx("p", { className: "text-xs text-gray-500 mt-1", children: "Students likely to pass \u2014 keep the momentum up" })] })] }), _jsxs("div", { className: "p-4 rounded-lg bg-gradient-to-r from-yellow-50 to-yellow-100 border border-yellow-200 flex items-center gap-4", children: [_jsx("div", { className: "p-3 bg-white rounded-lg shadow-sm", children: _jsx("svg", { className: "w-8 h-8 text-yellow-600", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", strokeWidth: 1.5, children: _jsx("circle", { cx: "12", cy: "12", r: "10" }) }) }), _jsxs("div", { children: [_jsx("p", { className: "text-sm text-gray-700", children: "Medium Risk" }), _jsxs("div", { className: "mt-1 flex items-center gap-2", children: [_jsx("p", { className: "text-2xl font-bold text-yellow-700", children: analytics.risk_distribution.medium_risk }), _jsx(Badge, { tone: "yellow", children: "Monitor" })] }), _jsx("p", { className: "text-xs text-gray-500 mt-1", children: "Targeted interventions can improve outcomes" })] })] }), _jsxs("div", { className: "p-4 rounded-lg bg-gradient-to-r from-red-50 to-red-100 border border-red-200 flex items-center gap-4", children: [_jsx("div", { className: "p-3 bg-white rounded-lg shadow-sm", children: _jsxs("svg", { className: "w-8 h-8 text-red-600", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", strokeWidth: 1.5, children: [_jsx("path", { d: "M12 9v4" }), _jsx("path", { d: "M12 17h.01" })] }) }), _jsxs("div", { children: [_jsx("p", { className: "text-sm text-gray-700", children: "High Risk" }), _jsxs("div", { className: "mt-1 flex items-center gap-2", children: [_jsx("p", { className: "text-2xl font-bold text-red-700", children: analytics.risk_distribution.high_risk }), _jsx(Badge, { tone: "red", children: "Action" })] }), _jsx("p", { className: "text-xs text-gray-500 mt-1", children: "Consider mentoring and extra practice sessions" })] })] })] })] })), _jsxs("div", { className: "bg-white rounded-lg shadow-lg p-8", children: [_jsxs("div", { className: "flex justify-between items-center mb-6", children: [_jsx("h2", { className: "text-2xl font-bold text-gray-900", children: "Students" }), _jsxs("div", { className: "flex gap-4 items-center", children: [_jsxs("div", { className: "flex items-center gap-2", children: [_jsx("label", { className: "text-sm text-gray-700", children: "Year" }), _jsxs("select", { value: year, onChange: (e) => setYear(Number(e.target.value)), className: "px-3 py-2 border rounded", children: [_jsx("option", { value: 1, children: "1st Year" }), _jsx("option", { value: 2, children: "2nd Year" }), _jsx("option", { value: 3, children: "3rd Year" }), _jsx("option", { value: 4, children: "4th Year" })] })] }), _jsxs("div", { className: "flex items-center gap-2", children: [_jsx("label", { className: "text-sm text-gray-700", children: "Section" }), _jsx("select", { value: selectedSection, onChange: (e) => setSelectedSection(e.target.value), className: "px-3 py-2 border rounded", children: sections.map(s => _jsx("option", { value: s, children: s }, s)) }), _jsx("button", { onClick: () => removeSection(selectedSection), className: "px-3 py-2 bg-red-100 text-red-700 rounded", children: "Remove" }), _jsx("input", { placeholder: "New Section (A)", value: newSectionName, onChange: (e) => setNewSectionName(e.target.value), className: "px-3 py-2 border rounded" }), _jsx("button", { onClick: addSection, className: "px-3 py-2 bg-gray-100 rounded", children: "Add Section" })] }), _jsx("button", { onClick: () => setShowAddStudent(!showAddStudent), className: "bg-primary-600 hover:bg-primary-700 text-white px-4 py-2 rounded-lg", children: showAddStudent ? 'Cancel' : '+ Add Student' })] })] }), showAddStudent && (_jsxs("div", { className: "mb-6 p-4 bg-gray-50 rounded-lg border border-gray-200", children: [_jsxs("div", { className: "grid md:grid-cols-2 gap-4 mb-4", children: [_jsx("input", { type: "text", placeholder: "Student ID", value: newStudent.student_id, onChange: (e) => setNewStudent({ ...newStudent, student_id: e.target.value }), className: "px-4 py-2 border border-gray-300 rounded-lg" }), _jsx("input", { type: "text", placeholder: "Full Name", value: newStudent.name, onChange: (e) => setNewStudent({ ...newStudent, name: e.target.value }), className: "px-4 py-2 border border-gray-300 rounded-lg" }), _jsx("input", { type: "email", placeholder: "Email", value: newStudent.email, onChange: (e) => setNewStudent({ ...newStudent, email: e.target.value }), className: "px-4 py-2 border border-gray-300 rounded-lg" }), _jsx("input", { type: "text", placeholder: "Class Name", value: newStudent.class_name, onChange: (e) => setNewStudent({ ...newStudent, class_name: e.target.value }), className: "px-4 py-2 border border-gray-300 rounded-lg" }), _jsxs("div", { className: "flex items-center gap-2", children: [_jsx("label", { className: "text-sm", children: "Section" }), _jsx("select", { value: newStudent.section, onChange: (e) => setNewStudent({ ...newStudent, section: e.target.value }), className: "px-3 py-2 border rounded", children: sections.map(s => _jsx("option", { value: s, children: s }, s)) })] })] }), _jsx("button", { onClick: handleAddStudent, className: "bg-primary-600 hover:bg-primary-700 text-white px-4 py-2 rounded-lg", children: "Add Student" })] })), _jsxs("div", { className: "mb-6 flex gap-2", children: [_jsx("button", { onClick: () => setFilterRisk('all'), className: `px-4 py-2 rounded-lg ${filterRisk === 'all' ? 'bg-primary-600 text-white' : 'bg-gray-100 text-gray-700'}`, children: "All" }), _jsx("button", { onClick: () => setFilterRisk('Low'), className: `px-4 py-2 rounded-lg ${filterRisk === 'Low' ? 'bg-green-600 text-white' : 'bg-gray-100 text-gray-700'}`, children: "Low Risk" }), _jsx("button", { onClick: () => setFilterRisk('Medium'), className: `px-4 py-2 rounded-lg ${filterRisk === 'Medium' ? 'bg-yellow-600 text-white' : 'bg-gray-100 text-gray-700'}`, children: "Medium Risk" }), _jsx("button", { onClick: () => setFilterRisk('High'), className: `px-4 py-2 rounded-lg ${filterRisk === 'High' ? 'bg-red-600 text-white' : 'bg-gray-100 text-gray-700'}`, children: "High Risk" })] }), _jsx("div", { className: "overflow-x-auto", children: _jsxs("table", { className: "w-full", children: [_jsx("thead", { className: "bg-gray-50 border-b-2 border-gray-200", children: _jsxs("tr", { children: [_jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "ID" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Name" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Email" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Class" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Year" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Section" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Latest Score" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Risk" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Status" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Action" })] }) }), _jsx("tbody", { className: "divide-y divide-gray-200", children: filteredStudents.map((student) => (_jsxs("tr", { className: "hover:bg-gray-50", children: [_jsx("td", { className: "px-4 py-3 text-sm text-gray-900", children: student.student_id }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-900 font-medium", children: student.name }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-600", children: student.email }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-600", children: student.class_name }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-600", children: student.year }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-600", children: student.section }), _jsx("td", { className: "px-4 py-3 text-sm", children: student.latest_prediction ? (_jsx("span", { className: "font-bold text-primary-600", children: student.latest_prediction.predicted_score })) : (_jsx("span", { className: "text-gray-500", children: "-" })) }), _jsx("td", { className: "px-4 py-3 text-sm", children: student.latest_prediction ? (_jsx("span", { className: `px-3 py-1 rounded-full text-xs font-semibold ${getRiskColor(student.latest_prediction.risk_category)}`, children: student.latest_prediction.risk_category })) : (_jsx("span", { className: "text-gray-500", children: "-" })) }), _jsx("td", { className: "px-4 py-3 text-sm", children: student.latest_prediction && (_jsx("span", { className: `px-3 py-1 rounded-full text-xs font-semibold ${student.latest_prediction.pass_fail === 'Pass' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}`, children: student.latest_prediction.pass_fail })) }), _jsx("td", { className: "px-4 py-3 text-sm", children: _jsx("button", { onClick: () => handleDeleteStudent(student.id), className: "text-red-600 hover:text-red-900", children: "Delete" }) })] }, student.id))) })] }) }), filteredStudents.length === 0 && (_jsx("div", { className: "text-center py-8 text-gray-500", children: "No students found" }))] }), loading && _jsx("div", { className: "text-center text-gray-600", children: "Loading..." })] }) }));
+    return (_jsx("div", { className: "min-h-screen bg-gray-50 py-12 px-4", children: _jsxs("div", { className: "max-w-7xl mx-auto", children: [_jsx("h1", { className: "text-4xl font-bold text-gray-900 mb-2", children: "\uD83D\uDC68\u200D\uD83C\uDFEB Class Dashboard" }), _jsx("p", { className: "text-gray-600 mb-8", children: "Manage students and track class performance" }), error && (_jsx("div", { className: "bg-red-50 border border-red-200 text-red-700 px-4 py-3 rounded mb-6", children: error })), analytics && (_jsxs("div", { className: "grid md:grid-cols-4 gap-4 mb-8", children: [_jsx(StatCard, { title: "Total Students", value: analytics.total_students, subtitle: "Active in selected class", gradient: "bg-gradient-to-r from-indigo-500 to-purple-600", icon: _jsxs("svg", { xmlns: "http://www.w3.org/2000/svg", className: "w-6 h-6 text-white", fill: "none", viewBox: "0 0 24 24", stroke: "currentColor", children: [_jsx("path", { strokeLinecap: "round", strokeLinejoin: "round", strokeWidth: 2, d: "M16 11V7a4 4 0 10-8 0v4" }), _jsx("path", { strokeLinecap: "round", strokeLinejoin: "round", strokeWidth: 2, d: "M12 14v7" })] }) }), _jsx(StatCard, { title: "Average Score", value: analytics.average_score.toFixed(1), subtitle: "Class progress (0-100)", gradient: "bg-gradient-to-r from-green-400 to-blue-500", icon: _jsx("svg", { xmlns: "http://www.w3.org/2000/svg", className: "w-6 h-6 text-white", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", children: _jsx("path", { strokeLinecap: "round", strokeLinejoin: "round", strokeWidth: 2, d: "M11 17a4 4 0 100-8 4 4 0 000 8z" }) }) }), _jsxs("div", { className: "md:col-span-2 bg-white rounded-2xl p-5 shadow-lg", children: [_jsxs("div", { className: "flex items-center justify-between mb-3", children: [_jsxs("div", { children: [_jsx("p", { className: "text-sm text-gray-500", children: "Class Momentum" }), _jsxs("p", { className: "text-lg font-bold text-gray-900", children: [analytics.average_score.toFixed(1), " / 100"] })] }), _jsx("div", { className: "text-right", children: _jsxs(Badge, { tone: "green", children: ["Pass ", Math.round(analytics.pass_rate), "%"] }) })] }), _jsx("div", { className: "mb-4", children: _jsx(ProgressBar, { value: analytics.average_score, label: "Average Score" }) }), _jsxs("div", { className: "flex gap-3 items-center", children: [_jsxs("div", { className: "flex-1", children: [_jsx("p", { className: "text-xs text-gray-500", children: "Predictions" }), _jsx("p", { className: "text-sm font-semibold text-gray-800", children: analytics.total_predictions })] }), _jsx("div", { className: "w-28 h-16 flex items-center justify-center bg-gradient-to-r from-yellow-200 to-pink-200 rounded-lg", children: _jsxs("svg", { viewBox: "0 0 64 64", className: "w-12 h-12", xmlns: "http://www.w3.org/2000/svg", children: [_jsx("circle", { cx: "32", cy: "32", r: "30", fill: "#fff", opacity: "0.2" }), _jsx("path", { d: "M32 12 L39 28 L56 28 L42 36 L48 52 L32 42 L16 52 L22 36 L8 28 L25 28 Z", fill: "#fff", opacity: "0.9" })] }) })] })] })] })), analytics && (_jsxs("div", { className: "bg-white rounded-lg shadow-lg p-6 mb-8", children: [_jsx("h2", { className: "text-2xl font-bold text-gray-900 mb-4", children: "Risk Distribution" }), _jsxs("div", { className: "grid md:grid-cols-3 gap-4", children: [_jsxs("div", { className: "p-4 rounded-lg bg-gradient-to-r from-green-50 to-green-100 border border-green-200 flex items-center gap-4", children: [_jsx("div", { className: "p-3 bg-white rounded-lg shadow-sm", children: _jsx("svg", { className: "w-8 h-8 text-green-600", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", strokeWidth: 1.5, children: _jsx("path", { d: "M12 2l3 7h7l-5.5 4 2 7L12 16l-6.5 4 2-7L2 9h7l3-7z" }) }) }), _jsxs("div", { children: [_jsx("p", { className: "text-sm text-gray-700", children: "Low Risk" }), _jsxs("div", { className: "mt-1 flex items-center gap-2", children: [_jsx("p", { className: "text-2xl font-bold text-green-700", children: analytics.risk_distribution.low_risk }), _jsx(Badge, { tone: "green", children: "Good" })] }), _jsx("p", { className: "text-xs text-gray-500 mt-1", children: "Students likely to pass \u2014 keep the momentum up" })] })] }), _jsxs("div", { className: "p-4 rounded-lg bg-gradient-to-r from-yellow-50 to-yellow-100 border border-yellow-200 flex items-center gap-4", children: [_jsx("div", { className: "p-3 bg-white rounded-lg shadow-sm", children: _jsx("svg", { className: "w-8 h-8 text-yellow-600", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", strokeWidth: 1.5, children: _jsx("circle", { cx: "12", cy: "12", r: "10" }) }) }), _jsxs("div", { children: [_jsx("p", { className: "text-sm text-gray-700", children: "Medium Risk" }), _jsxs("div", { className: "mt-1 flex items-center gap-2", children: [_jsx("p", { className: "text-2xl font-bold text-yellow-700", children: analytics.risk_distribution.medium_risk }), _jsx(Badge, { tone: "yellow", children: "Monitor" })] }), _jsx("p", { className: "text-xs text-gray-500 mt-1", children: "Targeted interventions can improve outcomes" })] })] }), _jsxs("div", { className: "p-4 rounded-lg bg-gradient-to-r from-red-50 to-red-100 border border-red-200 flex items-center gap-4", children: [_jsx("div", { className: "p-3 bg-white rounded-lg shadow-sm", children: _jsxs("svg", { className: "w-8 h-8 text-red-600", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", strokeWidth: 1.5, children: [_jsx("path", { d: "M12 9v4" }), _jsx("path", { d: "M12 17h.01" })] }) }), _jsxs("div", { children: [_jsx("p", { className: "text-sm text-gray-700", children: "High Risk" }), _jsxs("div", { className: "mt-1 flex items-center gap-2", children: [_jsx("p", { className: "text-2xl font-bold text-red-700", children: analytics.risk_distribution.high_risk }), _jsx(Badge, { tone: "red", children: "Action" })] }), _jsx("p", { className: "text-xs text-gray-500 mt-1", children: "Consider mentoring and extra practice sessions" })] })] })] })] })), _jsxs("div", { className: "bg-white rounded-lg shadow-lg p-8", children: [_jsxs("div", { className: "flex justify-between items-center mb-6", children: [_jsx("h2", { className: "text-2xl font-bold text-gray-900", children: "Students" }), _jsxs("div", { className: "flex gap-4 items-center", children: [_jsxs("div", { className: "flex items-center gap-2", children: [_jsx("label", { className: "text-sm text-gray-700", children: "Year" }), _jsxs("select", { value: year, onChange: (e) => setYear(Number(e.target.value)), className: "px-3 py-2 border rounded", children: [_jsx("option", { value: 1, children: "1st Year" }), _jsx("option", { value: 2, children: "2nd Year" }), _jsx("option", { value: 3, children: "3rd Year" }), _jsx("option", { value: 4, children: "4th Year" })] })] }), _jsxs("div", { className: "flex items-center gap-2", children: [_jsx("label", { className: "text-sm text-gray-700", children: "Section" }), _jsx("select", { value: selectedSection, onChange: (e) => setSelectedSection(e.target.value), className: "px-3 py-2 border rounded", children: sections.map(s => _jsx("option", { value: s, children: s }, s)) }), _jsx("button", { onClick: () => removeSection(selectedSection), className: "px-3 py-2 bg-red-100 text-red-700 rounded", children: "Remove" }), _jsx("input", { placeholder: "New Section (A)", value: newSectionName, onChange: (e) => setNewSectionName(e.target.value), className: "px-3 py-2 border rounded" }), _jsx("button", { onClick: addSection, className: "px-3 py-2 bg-gray-100 rounded", children: "Add Section" })] }), _jsx("button", { onClick: () => setShowAddStudent(!showAddStudent), className: "bg-primary-600 hover:bg-primary-700 text-white px-4 py-2 rounded-lg", children: showAddStudent ? 'Cancel' : '+ Add Student' })] })] }), showAddStudent && (_jsxs("div", { className: "mb-6 p-4 bg-gray-50 rounded-lg border border-gray-200", children: [_jsxs("div", { className: "grid md:grid-cols-2 gap-4 mb-4", children: [_jsx("input", { type: "text", placeholder: "Student ID", value: newStudent.student_id, onChange: (e) => setNewStudent({ ...newStudent, student_id: e.target.value }), className: "px-4 py-2 border border-gray-300 rounded-lg" }), _jsx("input", { type: "text", placeholder: "Full Name", value: newStudent.name, onChange: (e) => setNewStudent({ ...newStudent, name: e.target.value }), className: "px-4 py-2 border border-gray-300 rounded-lg" }), _jsx("input", { type: "email", placeholder: "Email", value: newStudent.email, onChange: (e) => setNewStudent({ ...newStudent, email: e.target.value }), className: "px-4 py-2 border border-gray-300 rounded-lg" }), _jsx("input", { type: "text", placeholder: "Class Name", value: newStudent.class_name, onChange: (e) => setNewStudent({ ...newStudent, class_name: e.target.value }), className: "px-4 py-2 border border-gray-300 rounded-lg" }), _jsxs("div", { className: "flex items-center gap-2", children: [_jsx("label", { className: "text-sm", children: "Section" }), _jsx("select", { value: newStudent.section, onChange: (e) => setNewStudent({ ...newStudent, section: e.target.value }), className: "px-3 py-2 border rounded", children: sections.map(s => _jsx("option", { value: s, children: s }, s)) })] })] }), _jsx("button", { onClick: handleAddStudent, className: "bg-primary-600 hover:bg-primary-700 text-white px-4 py-2 rounded-lg", children: "Add Student" })] })), _jsxs("div", { className: "mb-6 flex gap-2", children: [_jsx("button", { onClick: () => setFilterRisk('all'), className: `px-4 py-2 rounded-lg ${filterRisk === 'all' ? 'bg-primary-600 text-white' : 'bg-gray-100 text-gray-700'}`, children: "All" }), _jsx("button", { onClick: () => setFilterRisk('Low'), className: `px-4 py-2 rounded-lg ${filterRisk === 'Low' ? 'bg-green-600 text-white' : 'bg-gray-100 text-gray-700'}`, children: "Low Risk" }), _jsx("button", { onClick: () => setFilterRisk('Medium'), className: `px-4 py-2 rounded-lg ${filterRisk === 'Medium' ? 'bg-yellow-600 text-white' : 'bg-gray-100 text-gray-700'}`, children: "Medium Risk" }), _jsx("button", { onClick: () => setFilterRisk('High'), className: `px-4 py-2 rounded-lg ${filterRisk === 'High' ? 'bg-red-600 text-white' : 'bg-gray-100 text-gray-700'}`, children: "High Risk" })] }), _jsx("div", { className: "overflow-x-auto", children: _jsxs("table", { className: "w-full", children: [_jsx("thead", { className: "bg-gray-50 border-b-2 border-gray-200", children: _jsxs("tr", { children: [_jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "ID" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Name" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Email" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Class" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Year" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Section" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Latest Score" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Risk" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Status" }), _jsx("th", { className: "px-4 py-3 text-left text-sm font-semibold text-gray-900", children: "Action" })] }) }), _jsx("tbody", { className: "divide-y divide-gray-200", children: filteredStudents.map((student) => (_jsxs("tr", { className: "hover:bg-gray-50", children: [_jsx("td", { className: "px-4 py-3 text-sm text-gray-900", children: student.student_id }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-900 font-medium", children: student.name }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-600", children: student.email }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-600", children: student.class_name }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-600", children: student.year }), _jsx("td", { className: "px-4 py-3 text-sm text-gray-600", children: student.section }), _jsx("td", { className: "px-4 py-3 text-sm", children: student.latest_prediction ? (_jsx("span", { className: "font-bold text-primary-600", children: student.latest_prediction.predicted_score })) : (_jsx("span", { className: "text-gray-500", children: "-" })) }), _jsx("td", { className: "px-4 py-3 text-sm", children: student.latest_prediction ? (_jsx("span", { className: `px-3 py-1 rounded-full text-xs font-semibold ${getRiskColor(student.latest_prediction.risk_category)}`, children: student.latest_prediction.risk_category })) : (_jsx("span", { className: "text-gray-500", children: "-" })) }), _jsx("td", { className: "px-4 py-3 text-sm", children: student.latest_prediction && (_jsx("span", { className: `px-3 py-1 rounded-full text-xs font-semibold ${student.latest_prediction.pass_fail === 'Pass' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}`, children: student.latest_prediction.pass_fail })) }), _jsx("td", { className: "px-4 py-3 text-sm", children: _jsx("button", { onClick: () => handleDeleteStudent(student.id), className: "text-red-600 hover:text-red-900", children: "Delete" }) })] }, student.id))) })] }) }), filteredStudents.length === 0 && (_jsx("div", { className: "text-center py-8 text-gray-500", children: "No students found" })), nextCursor && (_jsx("div", { className: "mt-6 text-center", children: _jsx("button", { onClick: loadMore, disabled: loadingMore, className: "px-4 py-2 bg-gray-100 rounded-lg text-gray-700", children: loadingMore ? 'Loading...' : 'Load more students' }) }))] }), loading && _jsx("div", { className: "text-center text-gray-600", children: "Loading..." })] }) }));
 };
@@ -31,6 +31,8 @@ export const TeacherDashboard: React.FC = () => {
   };
 
   const [students, setStudents] = useState<StudentWithLatestPrediction[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [analytics, setAnalytics] = useState<ClassAnalytics | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
@@ -53,10 +55,12 @@ export const TeacherDashboard: React.FC = () => {
     try {
       setLoading(true);
       setError('');
-      const [studentRows, analyticsData] = await Promise.all([
+      setNextCursor(null);
+      const [firstPage, analyticsData] = await Promise.all([
         predictionService.getClassStudentsOverview(),
         predictionService.getClassAnalytics(),
       ]);
+      const studentRows = firstPage.items;
       if ((!studentRows || studentRows.length === 0) && !analyticsData) {
         const demoStudents: StudentWithLatestPrediction[] = [
           {
@@ -143,6 +147,7 @@ export const TeacherDashboard: React.FC = () => {
         setAnalytics(demoAnalytics);
       } else {
         setStudents(studentRows || []);
+        setNextCursor(firstPage.next_cursor);
         setAnalytics(analyticsData || null);
       }
     } catch (err) {
@@ -152,6 +157,20 @@ export const TeacherDashboard: React.FC = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await predictionService.getClassStudentsOverview(nextCursor);
+      setStudents((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      setError('Unable to load more students');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const addSection = () => {
     const label = newSectionName.trim().toUpperCase();
     if (!label) return;
@@ -272,7 +291,7 @@ export const TeacherDashboard: React.FC = () => {
                     <span className="text-white">{analytics.total_predictions}</span> predictions
                   </div>
                   <div>
-                    <span className="text-white">{students.length}</span> learners
+                    <span className="text-white">{analytics.total_students}</span> learners
                   </div>
                 </div>
               </div>
@@ -485,6 +504,18 @@ export const TeacherDashboard: React.FC = () => {
             {!filteredStudents.length && (
               <div className="py-10 text-center text-slate-500">No students match the selected filters.</div>
             )}
+
+            {nextCursor && (
+              <div className="mt-6 text-center">
+                <button
+                  className="rounded-full border border-white/20 px-6 py-2 text-sm font-semibold text-slate-300 hover:text-white"
+                  disabled={loadingMore}
+                  onClick={() => void loadMore()}
+                >
+                  {loadingMore ? 'Loading…' : 'Load more students'}
+                </button>
+              </div>
+            )}
           </section>
 
           {loading && <div className="text-center text-slate-400">Loading latest predictions…</div>}
@@ -11,6 +11,11 @@ api.interceptors.request.use((config) => {
     }
     return config;
 });
+// One page of a paginated list endpoint; pass next_cursor back to get the page after it
+const fetchPage = async (url, cursor, limit) => {
+    const response = await api.get(url, { params: { cursor, limit } });
+    return { items: response.data, next_cursor: response.headers['x-next-cursor'] ?? null };
+};
 // Auth endpoints
 export const authService = {
     register: async (email, password, fullName, role) => {
@@ -36,10 +41,7 @@ export const studentService = {
         const response = await api.post('/api/students', student);
         return response.data;
     },
-    getAll: async () => {
-        const response = await api.get('/api/students');
-        return response.data;
-    },
+    getPage: async (cursor, limit) => fetchPage('/api/students', cursor, limit),
     getOne: async (studentId) => {
         const response = await api.get(`/api/students/${studentId}`);
         return response.data;
@@ -74,10 +76,7 @@ export const predictionService = {
         const response = await api.get('/api/predictions/class/analytics');
         return response.data;
     },
-    getClassStudentsOverview: async () => {
-        const response = await api.get('/api/predictions/class/students-overview');
-        return response.data;
-    },
+    getClassStudentsOverview: async (cursor, limit) => fetchPage('/api/predictions/class/students-overview', cursor, limit),
 };
 // Info endpoints
 export const infoService = {
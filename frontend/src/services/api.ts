@@ -5,6 +5,7 @@ import {
   Student,
   ClassAnalytics,
   StudentWithLatestPrediction,
+  Page,
   ModelInfo,
   WeeklyTaskEntry,
   WeeklyTaskResponse,
@@ -26,6 +27,12 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// One page of a paginated list endpoint; pass next_cursor back to get the page after it
+const fetchPage = async <T>(url: string, cursor?: string, limit?: number): Promise<Page<T>> => {
+  const response = await api.get(url, { params: { cursor, limit } });
+  return { items: response.data, next_cursor: response.headers['x-next-cursor'] ?? null };
+};
+
 // Auth endpoints
 export const authService = {
   register: async (email: string, password: string, fullName: string, role: 'student' | 'teacher'): Promise<AuthResponse> => {
@@ -54,10 +61,8 @@ export const studentService = {
     return response.data;
   },
 
-  getAll: async (): Promise<Student[]> => {
-    const response = await api.get('/api/students');
-    return response.data;
-  },
+  getPage: async (cursor?: string, limit?: number): Promise<Page<Student>> =>
+    fetchPage<Student>('/api/students', cursor, limit),
 
   getOne: async (studentId: number): Promise<Student> => {
     const response = await api.get(`/api/students/${studentId}`);
@@ -108,10 +113,8 @@ export const predictionService = {
     return response.data;
   },
 
-  getClassStudentsOverview: async (): Promise<StudentWithLatestPrediction[]> => {
-    const response = await api.get('/api/predictions/class/students-overview');
-    return response.data;
-  },
+  getClassStudentsOverview: async (cursor?: string, limit?: number): Promise<Page<StudentWithLatestPrediction>> =>
+    fetchPage<StudentWithLatestPrediction>('/api/predictions/class/students-overview', cursor, limit),
 };
 
 // Info endpoints
@@ -55,6 +55,11 @@ export interface StudentWithLatestPrediction extends Student {
   latest_prediction: Prediction | null;
 }
 
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
 export interface ModelInfo {
   algorithm: string;
   features: string[];
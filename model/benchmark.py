@@ -0,0 +1,272 @@
+"""
+Inference benchmarks for PredictionEngine
+
+Usage:
+    python benchmark.py [--seconds 3] [--clients 1 8 64] [--only threading batch memory early_exit]
+
+Run after train.py. Prints the results and writes them to benchmark_report.json.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from predict import FEATURE_RANGES, SKLEARN_MIN_ROWS, CompactPlan, PredictionEngine
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(MODEL_DIR, '..', 'dataset', 'student_data.csv')
+
+def sample_rows(features, n_rows, seed=0):
+    """Random in-range feature dictionaries"""
+    rng = np.random.default_rng(seed)
+    return [
+        {f: float(rng.uniform(*FEATURE_RANGES[f])) for f in features}
+        for _ in range(n_rows)
+    ]
+
+def run_clients(engine, rows, clients, seconds):
+    """Score single rows from `clients` threads for `seconds`; returns throughput and latency"""
+    deadline = time.perf_counter() + seconds
+
+    def client(offset):
+        latencies = []
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            engine.predict(rows[i % len(rows)])
+            latencies.append(time.perf_counter() - start)
+            i += clients
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = np.concatenate([np.array(l) for l in pool.map(client, range(clients))])
+    elapsed = time.perf_counter() - started
+    return {
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 3),
+    }
+
+def unpin(engine):
+    """Restore the n_jobs=-1 the forests were pickled with (the old behaviour)"""
+    for estimator in filter(None, (engine.regressor, engine.classifier)):
+        estimator.set_params(n_jobs=-1)
+    return engine
+
+def benchmark_threading(client_counts, seconds):
+    """Concurrent single-row throughput with and without the threading policy"""
+    cpus = os.cpu_count() or 1
+    configs = {
+        'sklearn, pickled n_jobs=-1': lambda: unpin(PredictionEngine(backend='sklearn')),
+        'sklearn, threading policy': lambda: PredictionEngine(backend='sklearn'),
+        'fused, threading policy': lambda: PredictionEngine(backend='fused'),
+    }
+    results = {}
+    for name, build in configs.items():
+        engine = build()
+        rows = sample_rows(engine.features, 512)
+        engine.warm_up()
+        results[name] = {
+            f'{clients}_clients': run_clients(engine, rows, clients, seconds)
+            for clients in client_counts
+        }
+        print(f"{name}: " + ", ".join(
+            f"{clients} clients {r['requests_per_second']:,.0f} req/s (p99 {r['p99_ms']:.2f} ms)"
+            for clients, r in zip(client_counts, results[name].values())
+        ))
+
+    # One large batch, sequential vs split across threads
+    batch = np.array([[row[f] for f in engine.features] for row in sample_rows(engine.features, 50000)])
+    for threads in sorted({1, cpus}):
+        engine = PredictionEngine(backend='fused', max_threads=threads)
+        engine.warm_up()
+        start = time.perf_counter()
+        engine.predict_batch(batch)
+        seconds_taken = time.perf_counter() - start
+        results[f'fused, 50000-row batch, {threads} thread(s)'] = {'seconds': round(seconds_taken, 3)}
+        print(f"fused, 50000-row batch, {threads} thread(s): {seconds_taken:.3f}s")
+    return {'cpus': cpus, 'results': results}
+
+def benchmark_batch_sizes(sizes=(1, 100, 1000, 10000), repeats=5):
+    """predict_batch time per backend and batch size, to place SKLEARN_MIN_ROWS"""
+    configs = {
+        'sklearn': lambda: PredictionEngine(backend='sklearn'),
+        'flat (NumPy only)': lambda: PredictionEngine(backend='flat', sklearn_min_rows=0),
+        'fused (NumPy only)': lambda: PredictionEngine(backend='fused', sklearn_min_rows=0),
+        f'fused, sklearn from {SKLEARN_MIN_ROWS} rows': lambda: PredictionEngine(backend='fused'),
+    }
+    features = PredictionEngine().features
+    batches = {
+        n: np.array([[row[f] for f in features] for row in sample_rows(features, n)])
+        for n in sizes
+    }
+    results = {}
+    for name, build in configs.items():
+        engine = build()
+        engine.warm_up()
+        results[name] = {}
+        for n, batch in batches.items():
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                engine.predict_batch(batch)
+                timings.append(time.perf_counter() - start)
+            results[name][f'{n}_rows_ms'] = round(min(timings) * 1000, 2)
+        print(f"{name}: " + ", ".join(
+            f"{n:,} rows {results[name][f'{n}_rows_ms']:,.2f} ms" for n in sizes
+        ))
+    return {'sklearn_min_rows': SKLEARN_MIN_ROWS, 'results': results}
+
+def _rss_bytes():
+    """Resident set size of this process (Linux), or peak RSS elsewhere"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _engine_rss(backend):
+    """Process RSS and the part added by the model data for one engine (fresh process)"""
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    # Import sklearn up front so the delta is model data rather than library code
+    import sklearn.ensemble, sklearn.linear_model, sklearn.multioutput, sklearn.pipeline  # noqa: F401
+    before = _rss_bytes()
+    engine = PredictionEngine(backend=backend)
+    engine.warm_up()
+    after = _rss_bytes()
+    return {'process_rss_bytes': after, 'model_rss_bytes': after - before}
+
+def sklearn_tree_bytes(forest):
+    """Bytes of the node and value arrays inside a fitted sklearn forest"""
+    total = 0
+    for estimator in forest.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
+
+def benchmark_memory():
+    """Bytes per tree for every representation, and resident memory per backend"""
+    with open(os.path.join(MODEL_DIR, 'model_pipeline.pkl'), 'rb') as f:
+        pipeline = pickle.load(f)
+    # A combined pipeline has no classifier forest
+    forests = [pipeline[name] for name in ('regressor', 'classifier') if pipeline.get(name) is not None]
+    n_trees = sum(len(forest.estimators_) for forest in forests)
+    engine = PredictionEngine(backend='fused', use_artifacts=False)
+
+    sizes = {
+        'sklearn (float64 thresholds/values, int64 children)': sum(sklearn_tree_bytes(forest) for forest in forests),
+        'flat': sum(getattr(engine, name).nbytes for name in ('flat_regressor', 'flat_classifier') if hasattr(engine, name)),
+        'fused': engine.fused_plan.nbytes,
+    }
+    deviation = {}
+    for threshold_dtype in (('float32', 'int16') if engine.mode == 'separate' else ()):
+        plan = CompactPlan.build(engine.fused_plan, engine.features, threshold_dtype)
+        name = f'compact ({threshold_dtype} thresholds)'
+        sizes[name] = plan.nbytes
+        rng = np.random.default_rng(0)
+        lower = [FEATURE_RANGES[f][0] for f in engine.features]
+        upper = [FEATURE_RANGES[f][1] for f in engine.features]
+        deviation[name] = plan.max_deviation(
+            engine.fused_plan, rng.uniform(lower, upper, size=(50000, len(lower)))
+        )
+
+    results = {}
+    for name, nbytes in sizes.items():
+        results[name] = {'total_bytes': int(nbytes), 'bytes_per_tree': round(nbytes / n_trees, 1)}
+        if name in deviation:
+            results[name]['max_deviation'] = deviation[name]
+        print(f"{name}: {nbytes:,} bytes, {nbytes / n_trees:,.0f} bytes/tree"
+              + (f", max deviation {deviation[name]}" if name in deviation else ""))
+
+    # Each backend is loaded in a fresh process so earlier imports do not count
+    context = multiprocessing.get_context('spawn')
+    resident = {}
+    for backend in ('sklearn', 'fused', 'compact'):
+        with context.Pool(1) as pool:
+            resident[backend] = pool.apply(_engine_rss, (backend,))
+        print(f"{backend} engine: model data {resident[backend]['model_rss_bytes'] / 2**20:,.2f} MiB resident, "
+              f"process {resident[backend]['process_rss_bytes'] / 2**20:,.1f} MiB")
+    return {'n_trees': n_trees, 'representations': results, 'resident': resident}
+
+def benchmark_early_exit(repeats=500):
+    """Average classifier trees per prediction on the training data, per early-exit mode"""
+    reference = PredictionEngine()
+    X = pd.read_csv(DATASET_PATH)[reference.features].to_numpy(dtype=float)
+    expected = reference.predict_batch(X)
+
+    results = {}
+    for mode, confidence in ((None, None), ('exact', None), ('bound', 0.95), ('bound', 0.99)):
+        engine = PredictionEngine(early_exit=mode, early_exit_confidence=confidence or 0.95)
+        engine.warm_up()
+        start = time.perf_counter()
+        predictions = engine.predict_batch(X)
+        batch_seconds = time.perf_counter() - start
+        trees = engine.early_exit_stats()['average_trees_evaluated']
+
+        start = time.perf_counter()
+        for i in range(repeats):
+            engine._score(X[i % len(X)].reshape(1, -1))
+        single_us = (time.perf_counter() - start) / repeats * 1e6
+
+        name = 'off' if mode is None else (mode if confidence is None else f'{mode} ({confidence})')
+        results[name] = {
+            'average_trees_evaluated': trees,
+            'label_agreement': float(np.mean([
+                p['pass_fail'] == e['pass_fail'] for p, e in zip(predictions, expected)
+            ])),
+            'max_confidence_difference': round(max(
+                abs(p['confidence'] - e['confidence']) for p, e in zip(predictions, expected)
+            ), 2),
+            'single_row_us': round(single_us, 1),
+            'batch_us_per_row': round(batch_seconds / len(X) * 1e6, 2),
+        }
+        print(f"{name}: {trees} trees/prediction of {engine.n_classifier_trees}, "
+              f"agreement {results[name]['label_agreement']:.2%}, "
+              f"single row {single_us:,.0f} us, batch {results[name]['batch_us_per_row']} us/row")
+    return {'rows': int(len(X)), 'results': results}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0, help='duration of each client run')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--only', nargs='+', choices=['threading', 'batch', 'memory', 'early_exit'],
+                        default=['threading', 'batch', 'memory', 'early_exit'], help='benchmarks to run')
+    args = parser.parse_args()
+    # The sklearn backend passes plain arrays to a scaler fitted on a DataFrame
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+    report = {}
+    if 'threading' in args.only:
+        print("="*50)
+        print("Threading policy: concurrent single-row predictions")
+        print("="*50)
+        report['threading'] = benchmark_threading(args.clients, args.seconds)
+    if 'batch' in args.only:
+        print("\n" + "="*50)
+        print("Batch size: NumPy backends against sklearn")
+        print("="*50)
+        report['batch'] = benchmark_batch_sizes()
+    if 'memory' in args.only:
+        print("\n" + "="*50)
+        print("Model memory: bytes per tree and resident size")
+        print("="*50)
+        report['memory'] = benchmark_memory()
+    if 'early_exit' in args.only:
+        print("\n" + "="*50)
+        print("Early-exit pass/fail voting on the training data")
+        print("="*50)
+        report['early_exit'] = benchmark_early_exit()
+
+    report_path = os.path.join(os.path.dirname(__file__), 'benchmark_report.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Benchmark report saved to {report_path}")
@@ -0,0 +1,142 @@
+"""
+Synthetic dataset generator for load and scale testing
+
+Usage:
+    python generate_data.py PATH --rows 10000000 [--format csv|npy|parquet] [--shards]
+                            [--chunk-rows 1000000] [--seed 42] [--correlation 0.5]
+                            [--pass-rate 0.8]
+
+Rows are generated and written one chunk at a time, so memory stays bounded
+by --chunk-rows whatever --rows is. Without --shards, PATH is a single file:
+a CSV that train.py can read, one .npy float32 matrix, or one Parquet file
+with a row group per chunk. With --shards, PATH is a directory holding one
+part-NNNNN file per chunk plus manifest.json. The .npy outputs hold only the
+numeric training columns, in the order listed by NPY_COLUMNS. Parquet needs
+pyarrow.
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from train import FEATURES, PASS_COLUMN, SCORE_COLUMN, synthetic_chunks
+
+FORMATS = ('csv', 'npy', 'parquet')
+NPY_COLUMNS = FEATURES + [SCORE_COLUMN, PASS_COLUMN]
+
+def _parquet_module():
+    """pyarrow's parquet module, which only Parquet output needs"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+def _npy_matrix(chunk) -> np.ndarray:
+    return chunk[NPY_COLUMNS].to_numpy(np.float32)
+
+def write_synthetic_dataset(path: str, n_rows: int, file_format: str = 'csv', shards: bool = False,
+                            chunk_rows: int = 1_000_000, seed: int = 42, correlation: float = 0.0,
+                            pass_rate: Optional[float] = None) -> Dict:
+    """
+    Generate n_rows synthetic students and write them to path chunk by chunk
+
+    Returns:
+        Summary of the output: files, rows, columns and generator settings
+        (also written to manifest.json when sharding)
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"file_format must be one of {FORMATS}, got {file_format!r}")
+    if file_format == 'parquet':
+        pa, pq = _parquet_module()
+    chunks = synthetic_chunks(n_rows, chunk_rows, seed, correlation, pass_rate)
+    files: List[str] = []
+    columns = NPY_COLUMNS if file_format == 'npy' else None
+    passed = 0
+
+    if shards:
+        os.makedirs(path, exist_ok=True)
+        for k, chunk in enumerate(chunks):
+            shard = os.path.join(path, f'part-{k:05d}.{file_format}')
+            if file_format == 'csv':
+                chunk.to_csv(shard, index=False)
+            elif file_format == 'npy':
+                np.save(shard, _npy_matrix(chunk))
+            else:
+                pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False), shard)
+            columns = columns or list(chunk.columns)
+            passed += int(chunk[PASS_COLUMN].sum())
+            files.append(shard)
+    else:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        files.append(path)
+        writer = None
+        try:
+            for k, chunk in enumerate(chunks):
+                if file_format == 'csv':
+                    chunk.to_csv(path, index=False, mode='w' if k == 0 else 'a', header=k == 0)
+                elif file_format == 'npy':
+                    if writer is None:
+                        # The header fixes the final shape; the rows are appended after it
+                        writer = open(path, 'wb')
+                        np.lib.format.write_array_header_1_0(writer, {
+                            'descr': np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+                            'fortran_order': False,
+                            'shape': (n_rows, len(NPY_COLUMNS))
+                        })
+                    writer.write(_npy_matrix(chunk).tobytes())
+                else:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(path, table.schema)
+                    writer.write_table(table)
+                columns = columns or list(chunk.columns)
+                passed += int(chunk[PASS_COLUMN].sum())
+        finally:
+            if writer is not None:
+                writer.close()
+
+    summary = {
+        'format': file_format,
+        'rows': n_rows,
+        'columns': columns,
+        'files': [os.path.basename(f) for f in files] if shards else files,
+        'chunk_rows': chunk_rows,
+        'seed': seed,
+        'correlation': correlation,
+        'pass_rate': pass_rate,
+        'observed_pass_rate': passed / n_rows if n_rows else None
+    }
+    if shards:
+        with open(os.path.join(path, 'manifest.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', help='output file, or directory with --shards')
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--shards', action='store_true', help='write one file per chunk into the path directory')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help='rows generated (and held) at a time')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--correlation', type=float, default=0.0,
+                        help="share of each feature's variance from a common ability factor, in [0, 1)")
+    parser.add_argument('--pass-rate', type=float, default=None,
+                        help='shift scores so this share of students passes, in (0, 1)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = write_synthetic_dataset(
+        args.path, args.rows, args.format, args.shards, args.chunk_rows,
+        args.seed, args.correlation, args.pass_rate
+    )
+    elapsed = time.perf_counter() - started
+    print(f"✓ Wrote {summary['rows']:,} rows to {args.path} in {len(summary['files'])} file(s) "
+          f"in {elapsed:,.1f} s ({summary['rows'] / max(elapsed, 1e-9):,.0f} rows/s), "
+          f"pass rate {summary['observed_pass_rate']:.3f}")
@@ -1,72 +1,1316 @@
 import pickle
 import json
 import os
+import threading
+import time
 import numpy as np
-from typing import Dict, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-class PredictionEngine:
-    """ML model wrapper for making predictions"""
+# Valid input range for each feature (inclusive)
+FEATURE_RANGES = {
+    'study_hours': (0, 24),
+    'attendance': (0, 100),
+    'assignments_score': (0, 100),
+    'past_marks': (0, 100),
+    'engagement_score': (0, 10)
+}
+
+# Inference backends understood by PredictionEngine
+BACKENDS = ('fused', 'flat', 'compact', 'sklearn')
+
+# Memory-mappable artifact layout written by export_artifacts
+ARTIFACT_DIR = 'artifacts'
+ARTIFACT_FORMAT_VERSION = 1
+FOREST_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+COMPACT_ARRAYS = ('feature', 'threshold', 'left', 'right', 'roots', 'leaf',
+                  'regressor_table', 'classifier_table', 'lower', 'step')
+
+# Batches of at least this many rows are scored by the sklearn forests, which
+# beat the NumPy traversal from a few hundred rows on (benchmark.py --only batch)
+SKLEARN_MIN_ROWS = 512
+
+# Opt-in early exit for the pass/fail vote: stop once the outcome is certain ('exact')
+# or once a Hoeffding bound says it is settled with the given confidence ('bound')
+EARLY_EXIT_MODES = ('exact', 'bound')
+
+# Largest allowed difference between compact and full-precision predictions
+COMPACT_TOLERANCE = {'score': 0.5, 'probability': 0.02}
+
+# Distilled student models live in model_dir/tiers/<name>.pkl; 'full' is the forests
+TIER_DIR = 'tiers'
+FULL_TIER = 'full'
+
+# Full model layouts: a regressor plus a classifier forest, or one forest whose
+# leaves hold [score, pass fraction] with an isotonic map to a pass probability
+MODEL_MODES = ('separate', 'combined')
+
+class FlatForest:
+    """
+    Random forest exported into contiguous NumPy node arrays
+    
+    The nodes of all trees are concatenated into shared feature, threshold,
+    left, right and value arrays, with child indices pointing into the
+    combined arrays. Leaves point back at themselves, so every tree can be
+    advanced one level at a time with plain array indexing and rows that
+    reach a leaf early simply stay there.
+    
+    Outputs are bit-identical to sequential sklearn evaluation: inputs are
+    compared as float32 like sklearn's tree code, and per-tree outputs are
+    summed in tree order before dividing by the number of trees.
+
+    This beats sklearn only for small inputs. On the default model a single
+    row takes 0.16 ms against sklearn's 8 ms, but 1,000 rows take 26 ms
+    against 20 ms and 10,000 rows 316 ms against 119 ms, because each level
+    is a NumPy gather over every (tree, row) pair. PredictionEngine hands
+    batches of ``sklearn_min_rows`` or more to sklearn for that reason.
+    """
+    
+    def __init__(self, feature, threshold, left, right, value, roots, depth,
+                 input_dtype=np.float32):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.input_dtype = input_dtype
+        self.n_trees = len(roots)
+    
+    @classmethod
+    def from_sklearn(cls, forest) -> 'FlatForest':
+        """Export a fitted RandomForestRegressor/RandomForestClassifier"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.intp) + offset
+            is_leaf = tree.children_left == -1
+            
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            values.append(cls._node_values(forest, tree.value))
+            roots.append(offset)
+            offset += tree.node_count
+        
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.array(roots, dtype=np.intp),
+            depth=max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        )
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the node arrays"""
+        return sum(getattr(self, name).nbytes for name in FOREST_ARRAYS if getattr(self, name) is not None)
+    
+    def save(self, directory: str, prefix: str) -> Dict:
+        """Write the node arrays as ``<prefix>_<name>.npy``; returns manifest metadata"""
+        for name in FOREST_ARRAYS:
+            array = getattr(self, name)
+            if array is not None:
+                np.save(os.path.join(directory, f'{prefix}_{name}.npy'), array)
+        return {
+            'prefix': prefix,
+            'depth': int(self.depth),
+            'n_trees': int(self.n_trees),
+            'input_dtype': np.dtype(self.input_dtype).name,
+            'arrays': [name for name in FOREST_ARRAYS if getattr(self, name) is not None]
+        }
+    
+    @classmethod
+    def load(cls, directory: str, meta: Dict, mmap_mode: Optional[str] = 'r') -> 'FlatForest':
+        """Load arrays written by ``save``, memory-mapped read-only by default"""
+        arrays = {name: None for name in FOREST_ARRAYS}
+        for name in meta['arrays']:
+            path = os.path.join(directory, f"{meta['prefix']}_{name}.npy")
+            # asarray drops the np.memmap subclass but keeps the shared mapping
+            arrays[name] = np.asarray(np.load(path, mmap_mode=mmap_mode))
+        return cls(**arrays, depth=meta['depth'], input_dtype=np.dtype(meta['input_dtype']))
+    
+    @staticmethod
+    def _node_values(forest, tree_value: np.ndarray) -> np.ndarray:
+        """Per-node outputs: the mean for regressors, class probabilities for classifiers"""
+        if not hasattr(forest, 'classes_'):
+            return tree_value[:, :, 0].astype(np.float64)
+        
+        proba = tree_value[:, 0, :].astype(np.float64)
+        # Older sklearn stores class counts and normalises in predict_proba;
+        # newer versions already store fractions, which must be left untouched
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[np.isclose(normalizer, 1.0, rtol=0, atol=1e-9)] = 1.0
+        normalizer[normalizer == 0.0] = 1.0
+        return proba / normalizer
+    
+    def apply(self, feature_matrix: np.ndarray, trees: slice = slice(None)) -> np.ndarray:
+        """Return the leaf index reached in each selected tree, shape (n_trees, n_rows)"""
+        # sklearn evaluates splits on float32 inputs
+        X = np.asarray(feature_matrix, dtype=self.input_dtype)
+        rows = np.arange(X.shape[0])[np.newaxis, :]
+        # A single row (the online path) is gathered 1-D, without a row index
+        row = X[0] if X.shape[0] == 1 else None
+        nodes = np.repeat(self.roots[trees, np.newaxis], X.shape[0], axis=1)
+        for _ in range(self.depth):
+            features = self.feature[nodes]
+            go_left = (X[rows, features] if row is None else row[features]) <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+    
+    def predict_trees(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Per-tree outputs, shape (n_trees, n_rows, n_outputs)"""
+        return self.value[self.apply(feature_matrix)]
+    
+    def predict(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Average the leaf values over all trees, shape (n_rows, n_outputs)"""
+        # cumsum adds trees strictly in order, matching sklearn's accumulation
+        return np.cumsum(self.predict_trees(feature_matrix), axis=0)[-1] / self.n_trees
+    
+    def path_contributions(self, n_features: int) -> np.ndarray:
+        """
+        Saabas decomposition of every node's output, shape (n_nodes, n_features)
+        
+        Row i holds how far the splits on each feature moved the output on the
+        path from the root to node i, so ``value[i] == value[root] + row.sum()``.
+        Averaging the rows of the leaves a sample reaches gives its per-feature
+        contributions with a single gather.
+        """
+        values = self.value[:, 0]
+        table = np.zeros((len(values), n_features))
+        parents = self.roots
+        for _ in range(self.depth):
+            parents = parents[self.left[parents] != parents]
+            split = self.feature[parents]
+            for children in (self.left[parents], self.right[parents]):
+                table[children] = table[parents]
+                table[children, split] += values[children] - values[parents]
+            parents = np.concatenate([self.left[parents], self.right[parents]])
+        return table
+
+def combined_proba(tree_pass: np.ndarray) -> np.ndarray:
+    """[fail, pass] probabilities from a combined forest's per-tree pass fractions, shape (n_trees, n_rows)"""
+    pass_fraction = tree_pass.cumsum(axis=0)[-1] / len(tree_pass)
+    return np.column_stack([1.0 - pass_fraction, pass_fraction])
+
+class FusedPlan:
+    """
+    Scaler, regressor and classifier merged into a single traversal
+    
+    Each split threshold is rewritten into raw-feature space, so the
+    StandardScaler step disappears. Both forests share one set of node
+    arrays and are walked together; the regressor trees come first, then the
+    classifier trees, each with its own leaf value table. A combined model
+    has no classifier trees; its class probabilities come from the second
+    regressor output, uncalibrated.
+    
+    The rewritten threshold is the largest raw float64 value that the
+    original scale-then-float32 comparison would send left. This keeps
+    decisions identical to the unfused path for every input.
+    """
+    
+    def __init__(self, trees: FlatForest, regressor_value: np.ndarray,
+                 classifier_value: Optional[np.ndarray], n_regressor_trees: int,
+                 classifier_offset: int):
+        self.trees = trees
+        self.regressor_value = regressor_value
+        self.classifier_value = classifier_value
+        self.n_regressor_trees = n_regressor_trees
+        self.n_classifier_trees = trees.n_trees - n_regressor_trees
+        self.classifier_offset = classifier_offset
+    
+    @classmethod
+    def build(cls, scaler, regressor: FlatForest, classifier: Optional[FlatForest] = None) -> 'FusedPlan':
+        """Fold a fitted StandardScaler into two flattened forests, or into one combined forest"""
+        offset = len(regressor.feature)
+        forests = [(regressor, 0)] if classifier is None else [(regressor, 0), (classifier, offset)]
+        thresholds = [
+            cls._unscale_thresholds(forest, scaler.mean_, scaler.scale_)
+            for forest, _ in forests
+        ]
+        trees = FlatForest(
+            feature=np.concatenate([forest.feature for forest, _ in forests]),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate([forest.left + start for forest, start in forests]),
+            right=np.concatenate([forest.right + start for forest, start in forests]),
+            value=None,
+            roots=np.concatenate([forest.roots + start for forest, start in forests]),
+            depth=max(forest.depth for forest, _ in forests),
+            input_dtype=np.float64
+        )
+        return cls(trees, regressor.value, None if classifier is None else classifier.value,
+                   regressor.n_trees, offset)
+    
+    @staticmethod
+    def _unscale_thresholds(forest: FlatForest, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        """
+        Largest raw x per split with float32((x - mean) / scale) <= threshold
+        
+        That comparison is monotonic in x, so the raw-space boundary is found
+        by widening a bracket around ``threshold * scale + mean`` and bisecting
+        it down to two adjacent doubles.
+        """
+        raw = forest.threshold.copy()
+        split = np.isfinite(raw)
+        threshold = raw[split]
+        feature_mean = mean[forest.feature[split]]
+        feature_scale = scale[forest.feature[split]]
+        
+        def goes_left(x):
+            return ((x - feature_mean) / feature_scale).astype(np.float32) <= threshold
+        
+        guess = threshold * feature_scale + feature_mean
+        step = np.maximum(np.abs(guess), 1.0) * 1e-6
+        lo, hi = guess - step, guess + step
+        for _ in range(2048):
+            bad_lo, bad_hi = ~goes_left(lo), goes_left(hi)
+            if not (bad_lo.any() or bad_hi.any()):
+                break
+            step = np.where(bad_lo | bad_hi, step * 2, step)
+            lo = np.where(bad_lo, guess - step, lo)
+            hi = np.where(bad_hi, guess + step, hi)
+        else:
+            raise RuntimeError("Could not bracket split thresholds in raw feature space")
+        
+        while True:
+            mid = lo + (hi - lo) / 2
+            active = (mid > lo) & (mid < hi)
+            if not active.any():
+                break
+            left = goes_left(mid)
+            lo = np.where(active & left, mid, lo)
+            hi = np.where(active & ~left, mid, hi)
+        
+        raw[split] = lo
+        return raw
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the node arrays and both leaf value tables"""
+        classifier_bytes = 0 if self.classifier_value is None else self.classifier_value.nbytes
+        return self.trees.nbytes + self.regressor_value.nbytes + classifier_bytes
+    
+    def save(self, directory: str, prefix: str = 'fused') -> Dict:
+        """Write the merged node arrays; leaf values are shared with the flat forests"""
+        meta = self.trees.save(directory, prefix)
+        meta.update(
+            n_regressor_trees=int(self.n_regressor_trees),
+            classifier_offset=int(self.classifier_offset)
+        )
+        return meta
     
-    def __init__(self):
-        model_dir = os.path.dirname(__file__)
+    @classmethod
+    def load(cls, directory: str, meta: Dict, regressor_value: np.ndarray,
+             classifier_value: Optional[np.ndarray], mmap_mode: Optional[str] = 'r') -> 'FusedPlan':
+        """Load a plan written by ``save``"""
+        trees = FlatForest.load(directory, meta, mmap_mode=mmap_mode)
+        return cls(trees, regressor_value, classifier_value,
+                   meta['n_regressor_trees'], meta['classifier_offset'])
+    
+    def predict_trees(self, feature_matrix: np.ndarray, return_leaves: bool = False) -> Tuple[np.ndarray, ...]:
+        """
+        Per-tree raw scores, shape (n_trees, n_rows), and class probabilities from one traversal
         
-        # Load models and scaler
-        with open(os.path.join(model_dir, 'model_pipeline.pkl'), 'rb') as f:
-            self.pipeline = pickle.load(f)
+        With ``return_leaves`` the regressor leaf indices are returned as a third element.
+        """
+        leaves = self.trees.apply(feature_matrix)
+        regressor_leaves = leaves[:self.n_regressor_trees]
+        tree_scores = self.regressor_value[regressor_leaves, 0]
+        if self.classifier_value is None:
+            proba = combined_proba(self.regressor_value[regressor_leaves, 1])
+        else:
+            classifier_leaves = leaves[self.n_regressor_trees:] - self.classifier_offset
+            proba = self.classifier_value[classifier_leaves].cumsum(axis=0)[-1] / self.n_classifier_trees
+        if return_leaves:
+            return tree_scores, proba, regressor_leaves
+        return tree_scores, proba
+    
+    def predict(self, feature_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return raw (unclipped) scores and class probabilities from one traversal"""
+        tree_scores, proba = self.predict_trees(feature_matrix)
+        return np.cumsum(tree_scores, axis=0)[-1] / self.n_regressor_trees, proba
+    
+    def predict_prefix(self, feature_matrix: np.ndarray, n_classifier: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-tree raw scores plus the votes of the first n_classifier classifier trees, in one traversal"""
+        leaves = self.trees.apply(feature_matrix, slice(0, self.n_regressor_trees + n_classifier))
+        tree_scores = self.regressor_value[leaves[:self.n_regressor_trees], 0]
+        votes = self.classifier_value[leaves[self.n_regressor_trees:] - self.classifier_offset]
+        return tree_scores, votes
+    
+    def classifier_votes(self, feature_matrix: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Class probabilities of classifier trees start..stop, shape (n_trees, n_rows, n_classes)"""
+        offset = self.n_regressor_trees
+        leaves = self.trees.apply(feature_matrix, slice(offset + start, offset + stop))
+        return self.classifier_value[leaves - self.classifier_offset]
+
+class CompactPlan:
+    """
+    Fused plan stored with the smallest dtypes that still fit
+    
+    In the default 'float32' mode, each threshold is the largest float32 not
+    above the exact one. In 'int16' mode, every feature is mapped onto a grid
+    of 65534 cells spanning its validated FEATURE_RANGES range, thresholds
+    are grid codes and inputs are quantized once per batch. Split features
+    are uint8. Child indices are uint16 offsets from the tree root,
+    or uint32 if a tree has more than 65535 nodes. Each leaf points into a
+    table of the distinct leaf outputs instead of carrying its own copy.
+    
+    A split can only change direction for an input that lies between the
+    float32 and float64 thresholds. In int16 mode it can also change for an
+    input in the same grid cell as its threshold, which is 0.0015 attendance
+    points wide. Leaf tables keep full precision. export_artifacts only ships
+    a plan whose predictions stay within COMPACT_TOLERANCE of the fused plan.
+    """
+    
+    GRID = 65534
+    CODE_OFFSET = 32767
+    
+    def __init__(self, feature, threshold, left, right, roots, leaf, regressor_table,
+                 classifier_table, lower, step, depth, n_regressor_trees):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.roots = roots
+        self.leaf = leaf
+        self.regressor_table = regressor_table
+        self.classifier_table = classifier_table
+        self.lower = lower
+        self.step = step
+        self.depth = depth
+        self.n_regressor_trees = n_regressor_trees
+        self.n_trees = len(roots)
+        self.n_classifier_trees = self.n_trees - n_regressor_trees
+    
+    @staticmethod
+    def _index_dtype(max_value: int):
+        return np.uint16 if max_value <= np.iinfo(np.uint16).max else np.uint32
+    
+    @classmethod
+    def build(cls, plan: FusedPlan, features: List[str], threshold_dtype: str = 'float32') -> 'CompactPlan':
+        """Compress a fused plan; thresholds are already in raw feature space"""
+        if threshold_dtype not in ('int16', 'float32'):
+            raise ValueError(f"threshold_dtype must be 'int16' or 'float32', got {threshold_dtype!r}")
+        trees = plan.trees
+        n_nodes = len(trees.feature)
+        sizes = np.diff(np.append(trees.roots, n_nodes))
+        tree_of_node = np.repeat(np.arange(trees.n_trees), sizes)
+        index_dtype = cls._index_dtype(int(sizes.max()) - 1)
+        left = (trees.left - trees.roots[tree_of_node]).astype(index_dtype)
+        right = (trees.right - trees.roots[tree_of_node]).astype(index_dtype)
+        
+        lower = np.array([FEATURE_RANGES[f][0] for f in features], dtype=np.float64)
+        upper = np.array([FEATURE_RANGES[f][1] for f in features], dtype=np.float64)
+        step = (upper - lower) / cls.GRID
+        is_leaf = ~np.isfinite(trees.threshold)
+        split = ~is_leaf
+        if threshold_dtype == 'int16':
+            threshold = np.full(n_nodes, cls.CODE_OFFSET, dtype=np.int16)
+            raw = trees.threshold[split]
+            f = trees.feature[split]
+            code = np.floor((raw - lower[f]) / step[f])
+            # Below the range nothing goes left; at or above it everything does
+            code = np.where(raw < lower[f], -1, np.minimum(code, cls.GRID))
+            threshold[split] = (code - cls.CODE_OFFSET).astype(np.int16)
+        else:
+            threshold = trees.threshold.astype(np.float32)
+            over = threshold.astype(np.float64) > trees.threshold
+            threshold[over] = np.nextafter(threshold[over], np.float32(-np.inf))
         
-        with open(os.path.join(model_dir, 'scaler.pkl'), 'rb') as f:
-            self.scaler = pickle.load(f)
+        # Leaf outputs deduplicated into shared tables; internal nodes point at entry 0
+        regressor_leaf = is_leaf[:plan.classifier_offset]
+        classifier_leaf = is_leaf[plan.classifier_offset:]
+        regressor_table, regressor_index = np.unique(
+            plan.regressor_value[regressor_leaf, 0], return_inverse=True
+        )
+        classifier_table, classifier_index = np.unique(
+            plan.classifier_value[classifier_leaf], axis=0, return_inverse=True
+        )
+        leaf = np.zeros(n_nodes, dtype=cls._index_dtype(max(len(regressor_table), len(classifier_table)) - 1))
+        leaf[:plan.classifier_offset][regressor_leaf] = regressor_index.ravel()
+        leaf[plan.classifier_offset:][classifier_leaf] = classifier_index.ravel()
+        
+        return cls(
+            feature=trees.feature.astype(np.uint8),
+            threshold=threshold,
+            left=left,
+            right=right,
+            roots=trees.roots.astype(np.uint32),
+            leaf=leaf,
+            regressor_table=regressor_table,
+            classifier_table=np.ascontiguousarray(classifier_table),
+            lower=lower,
+            step=step,
+            depth=trees.depth,
+            n_regressor_trees=plan.n_regressor_trees
+        )
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by all arrays of the plan"""
+        return sum(getattr(self, name).nbytes for name in COMPACT_ARRAYS)
+    
+    def save(self, directory: str, prefix: str = 'compact') -> Dict:
+        """Write the compact arrays as ``<prefix>_<name>.npy``; returns manifest metadata"""
+        for name in COMPACT_ARRAYS:
+            np.save(os.path.join(directory, f'{prefix}_{name}.npy'), getattr(self, name))
+        return {
+            'prefix': prefix,
+            'depth': int(self.depth),
+            'n_regressor_trees': int(self.n_regressor_trees),
+            'threshold_dtype': self.threshold.dtype.name,
+            'nbytes': int(self.nbytes)
+        }
+    
+    @classmethod
+    def load(cls, directory: str, meta: Dict, mmap_mode: Optional[str] = 'r') -> 'CompactPlan':
+        """Load a plan written by ``save``, memory-mapped read-only by default"""
+        arrays = {
+            name: np.asarray(np.load(os.path.join(directory, f"{meta['prefix']}_{name}.npy"), mmap_mode=mmap_mode))
+            for name in COMPACT_ARRAYS
+        }
+        return cls(**arrays, depth=meta['depth'], n_regressor_trees=meta['n_regressor_trees'])
+    
+    def apply(self, feature_matrix: np.ndarray, trees: slice = slice(None)) -> np.ndarray:
+        """Return the leaf table index reached in each selected tree, shape (n_trees, n_rows)"""
+        X = np.asarray(feature_matrix, dtype=np.float64)
+        if self.threshold.dtype == np.int16:
+            X = (np.clip(np.floor((X - self.lower) / self.step), 0, self.GRID) - self.CODE_OFFSET).astype(np.int16)
+        rows = np.arange(X.shape[0])[np.newaxis, :]
+        row = X[0] if X.shape[0] == 1 else None
+        base = self.roots[trees].astype(np.intp)[:, np.newaxis]
+        nodes = np.repeat(base, X.shape[0], axis=1)
+        for _ in range(self.depth):
+            features = self.feature[nodes]
+            go_left = (X[rows, features] if row is None else row[features]) <= self.threshold[nodes]
+            nodes = base + np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.leaf[nodes]
+    
+    def predict_trees(self, feature_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-tree raw scores, shape (n_trees, n_rows), and class probabilities from one traversal"""
+        leaves = self.apply(feature_matrix)
+        tree_scores = self.regressor_table[leaves[:self.n_regressor_trees]]
+        proba = self.classifier_table[leaves[self.n_regressor_trees:]].cumsum(axis=0)[-1]
+        return tree_scores, proba / self.n_classifier_trees
+    
+    def predict(self, feature_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return raw (unclipped) scores and class probabilities from one traversal"""
+        tree_scores, proba = self.predict_trees(feature_matrix)
+        return np.cumsum(tree_scores, axis=0)[-1] / self.n_regressor_trees, proba
+    
+    def predict_prefix(self, feature_matrix: np.ndarray, n_classifier: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-tree raw scores plus the votes of the first n_classifier classifier trees, in one traversal"""
+        leaves = self.apply(feature_matrix, slice(0, self.n_regressor_trees + n_classifier))
+        tree_scores = self.regressor_table[leaves[:self.n_regressor_trees]]
+        votes = self.classifier_table[leaves[self.n_regressor_trees:]]
+        return tree_scores, votes
+    
+    def classifier_votes(self, feature_matrix: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Class probabilities of classifier trees start..stop, shape (n_trees, n_rows, n_classes)"""
+        offset = self.n_regressor_trees
+        return self.classifier_table[self.apply(feature_matrix, slice(offset + start, offset + stop))]
+    
+    def max_deviation(self, plan: FusedPlan, feature_matrix: np.ndarray) -> Dict[str, float]:
+        """Largest score and probability difference from the fused plan on some rows"""
+        scores, proba = self.predict(feature_matrix)
+        exact_scores, exact_proba = plan.predict(feature_matrix)
+        return {
+            'score': float(np.abs(scores - exact_scores).max()),
+            'probability': float(np.abs(proba - exact_proba).max())
+        }
+
+def compact_deviation(compact: CompactPlan, plan: FusedPlan, features: List[str],
+                      n_rows: int = 20000) -> Dict[str, float]:
+    """Max deviation of a compact plan from its fused plan on seeded in-range rows"""
+    rng = np.random.default_rng(0)
+    lower = [FEATURE_RANGES[f][0] for f in features]
+    upper = [FEATURE_RANGES[f][1] for f in features]
+    return compact.max_deviation(plan, rng.uniform(lower, upper, size=(n_rows, len(features))))
+
+def within_compact_tolerance(deviation: Dict[str, float]) -> bool:
+    return all(deviation[k] <= COMPACT_TOLERANCE[k] for k in COMPACT_TOLERANCE)
+
+class ScoredRows(NamedTuple):
+    """
+    Per-row model outputs for a batch
+    
+    Spread fields are NaN for distilled tiers. contributions has shape
+    (n_rows, n_features) when requested and available, else (n_rows, 0).
+    """
+    scores: np.ndarray
+    labels: np.ndarray
+    confidences: np.ndarray
+    trees_evaluated: np.ndarray
+    score_lower: np.ndarray
+    score_upper: np.ndarray
+    score_std: np.ndarray
+    contributions: np.ndarray
+
+def summarize_tree_scores(tree_scores: np.ndarray, coverage: float) -> Tuple[np.ndarray, ...]:
+    """
+    Mean, central interval and standard deviation of per-tree regressor outputs
+    
+    The mean is accumulated in tree order exactly like the forest's own
+    prediction. The interval bounds are order statistics of the tree outputs
+    (nearest rank, so no interpolation) taken from one sort of the outputs. Tree
+    outputs are averages of training scores, so the bounds need no clipping.
+    
+    Args:
+        tree_scores: Per-tree outputs, shape (n_trees, n_rows)
+        coverage: Share of trees inside the interval, e.g. 0.8 for 10th-90th percentile
+    """
+    n_trees = tree_scores.shape[0]
+    mean = tree_scores.cumsum(axis=0)[-1] / n_trees
+    low = int((1 - coverage) / 2 * n_trees)
+    high = n_trees - 1 - low
+    # A full vectorised sort beats np.partition with two kth values here
+    ordered = np.sort(tree_scores, axis=0)
+    squared = tree_scores - mean
+    squared *= squared
+    return mean, ordered[low], ordered[high], np.sqrt(squared.sum(axis=0) / n_trees)
+
+class ThreadingPolicy:
+    """
+    Decides how many threads one engine may use to score a batch
+    
+    The pickled forests were trained with n_jobs=-1, so sklearn would start
+    joblib workers on every core even to score a single row. Under concurrent
+    requests that oversubscribes the CPU. The policy pins every loaded
+    estimator to n_jobs=1 and caps native BLAS/OpenMP pools at
+    `max_threads`. Batches smaller than `parallel_min_rows` are scored
+    sequentially on the calling thread. Larger batches are split into
+    row chunks and scored on at most `max_threads` threads. Rows are scored
+    independently, so the results are identical either way.
+    """
+    
+    def __init__(self, parallel_min_rows: int = 1024, max_threads: int = 1):
+        self.parallel_min_rows = max(1, parallel_min_rows)
+        self.max_threads = max(1, max_threads)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def pin_estimator(self, estimator) -> None:
+        """Force n_jobs=1 on an estimator and everything nested inside it"""
+        if not hasattr(estimator, 'get_params'):
+            return
+        params = {name: 1 for name in estimator.get_params(deep=True) if name.endswith('n_jobs')}
+        if params:
+            estimator.set_params(**params)
+    
+    def limit_native_threads(self) -> None:
+        """Cap BLAS/OpenMP thread pools in this process (needs threadpoolctl)"""
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            return
+        threadpool_limits(limits=self.max_threads)
+    
+    def n_chunks(self, n_rows: int) -> int:
+        """Number of chunks to split a batch into (1 means sequential)"""
+        if self.max_threads == 1 or n_rows < self.parallel_min_rows:
+            return 1
+        return min(self.max_threads, n_rows // max(1, self.parallel_min_rows // 2))
+    
+    def map_rows(self, fn, matrix: np.ndarray) -> List:
+        """Apply fn to row chunks of matrix, in parallel only when it pays off"""
+        n_chunks = self.n_chunks(len(matrix))
+        if n_chunks == 1:
+            return [fn(matrix)]
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix='predict'
+                )
+        return list(self._pool.map(fn, np.array_split(matrix, n_chunks)))
+    
+    def stats(self) -> Dict:
+        return {'parallel_min_rows': self.parallel_min_rows, 'max_threads': self.max_threads}
+
+class PredictionCache:
+    """
+    Bounded LRU cache of prediction results
+    
+    Keys are feature tuples rounded to ``precision`` decimals, so repeated or
+    near-identical submissions share one result. Entries expire after
+    ``ttl_seconds`` and the least recently used entry is evicted once
+    ``max_size`` is reached. Every lookup carries the model version, which
+    is part of the stored key, so results from one model are never served
+    for another. Engines of different versions can share one cache while a
+    reload drains; the old version's entries then age out of the LRU.
+    """
+    
+    def __init__(self, max_size: int = 4096, ttl_seconds: float = 300.0, precision: int = 2):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def make_key(self, feature_values) -> Tuple:
+        """Quantize a feature vector into a hashable cache key"""
+        return tuple(round(float(v), self.precision) for v in feature_values)
+    
+    def get(self, version, key: Tuple) -> Optional[Dict]:
+        """Return a cached result or None, counting the hit or miss"""
+        key = (version,) + key
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+    
+    def put(self, version, key: Tuple, result: Dict) -> None:
+        """Store a result, evicting the least recently used entries if full"""
+        if self.max_size <= 0:
+            return
+        key = (version,) + key
+        with self._lock:
+            self.version = version
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'precision': self.precision,
+                'model_version': self.version
+            }
+
+class PredictionEngine:
+    """
+    ML model wrapper for making predictions
+    
+    The NumPy backends (fused, flat) win for single rows and small batches,
+    but sklearn's compiled traversal is faster past a few hundred rows.
+    Batches of ``sklearn_min_rows`` or more are therefore scored by the
+    pickled sklearn forests, loaded on first use when the engine was read
+    from artifacts. Both paths give identical results; 0 disables the switch.
+    """
+    
+    def __init__(self, backend: str = 'fused', cache: Optional[PredictionCache] = None,
+                 model_dir: Optional[str] = None, use_artifacts: bool = True,
+                 tier: str = FULL_TIER, parallel_min_rows: int = 1024, max_threads: int = 1,
+                 early_exit: Optional[str] = None, early_exit_confidence: float = 0.95,
+                 early_exit_block: int = 8, interval_coverage: float = 0.8,
+                 sklearn_min_rows: int = SKLEARN_MIN_ROWS):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        if early_exit is not None and early_exit not in EARLY_EXIT_MODES:
+            raise ValueError(f"early_exit must be one of {EARLY_EXIT_MODES} or None, got {early_exit!r}")
+        self.backend = backend
+        self.early_exit = early_exit
+        self.early_exit_confidence = early_exit_confidence
+        self.early_exit_block = max(1, early_exit_block)
+        if not 0 < interval_coverage <= 1:
+            raise ValueError(f"interval_coverage must be in (0, 1], got {interval_coverage}")
+        self.interval_coverage = interval_coverage
+        self.sklearn_min_rows = sklearn_min_rows
+        self._sklearn_lock = threading.Lock()
+        self._sklearn_missing = False
+        self.cache = cache
+        self.model_dir = model_dir or os.path.dirname(__file__)
+        self.threading_policy = ThreadingPolicy(parallel_min_rows, max_threads)
+        self.threading_policy.limit_native_threads()
         
         # Load model info
-        with open(os.path.join(model_dir, 'model_info.json'), 'r') as f:
+        with open(os.path.join(self.model_dir, 'model_info.json'), 'r') as f:
             self.model_info = json.load(f)
         
+        # Retraining keeps the version string, so the training date is part of the identity
+        self.model_version = f"{self.model_info['version']}@{self.model_info.get('training_date', '')}"
+        
+        # Prefer the memory-mapped arrays; the sklearn backend needs the pickles
+        manifest = self._read_manifest() if use_artifacts and backend != 'sklearn' else None
+        if manifest is not None:
+            self._load_artifacts(manifest)
+        else:
+            self._load_pickles()
+        
+        self.tiers = self._load_tiers()
+        for estimator in [getattr(self, 'regressor', None), getattr(self, 'classifier', None)] + [
+            payload['model'] for payload in self.tiers.values()
+        ]:
+            self.threading_policy.pin_estimator(estimator)
+        self.tier = FULL_TIER
+        self.tier = self._check_tier(tier)
+        
+        self.n_classifier_trees = self._count_classifier_trees()
+        self.contribution_table, self.baseline_score = self._build_contributions()
+        self.scored_rows = 0
+        self.trees_evaluated = 0
+        self._stats_lock = threading.Lock()
+    
+    def _read_manifest(self) -> Optional[Dict]:
+        """Return the artifact manifest if it exists and matches model_info.json"""
+        manifest_path = os.path.join(self.model_dir, ARTIFACT_DIR, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+            print(f"Warning: unsupported artifact format in {manifest_path}, using pickles")
+            return None
+        if manifest.get('model_version') != self.model_version:
+            print(f"Warning: {manifest_path} is from a different model version, using pickles")
+            return None
+        return manifest
+    
+    def _load_artifacts(self, manifest: Dict) -> None:
+        """Memory-map the exported arrays so worker processes share one copy"""
+        directory = os.path.join(self.model_dir, ARTIFACT_DIR)
+        self.load_source = 'artifacts'
+        self.features = manifest['features']
+        self.classes = np.array(manifest['classes'])
+        self.scaler_mean = np.load(os.path.join(directory, 'scaler_mean.npy'))
+        self.scaler_scale = np.load(os.path.join(directory, 'scaler_scale.npy'))
+        self._set_mode(manifest.get('mode', 'separate'), manifest.get('calibration'))
+        
+        if self.backend == 'compact' and 'compact' not in manifest:
+            # export_artifacts leaves it out when it is outside COMPACT_TOLERANCE
+            print("Warning: the artifacts have no compact plan, serving the fused plan")
+            self.backend = 'fused'
+        if self.backend == 'compact':
+            # The compact plan is self-contained; the larger arrays stay unmapped
+            self.compact_plan = CompactPlan.load(directory, manifest['compact'])
+            return
+        
+        self.flat_regressor = FlatForest.load(directory, manifest['regressor'])
+        if self.mode == 'separate':
+            self.flat_classifier = FlatForest.load(directory, manifest['classifier'])
+        if self.backend in ('fused', 'compact'):
+            self.fused_plan = FusedPlan.load(
+                directory, manifest['fused'], self.flat_regressor.value,
+                self.flat_classifier.value if self.mode == 'separate' else None
+            )
+    
+    def _read_pickles(self) -> Tuple[Dict, object]:
+        with open(os.path.join(self.model_dir, 'model_pipeline.pkl'), 'rb') as f:
+            pipeline = pickle.load(f)
+        with open(os.path.join(self.model_dir, 'scaler.pkl'), 'rb') as f:
+            scaler = pickle.load(f)
+        return pipeline, scaler
+    
+    def _load_pickles(self) -> None:
+        """Unpickle the sklearn models and flatten them in memory"""
+        self.load_source = 'pickle'
+        self.pipeline, self.scaler = self._read_pickles()
+        
         self.features = self.pipeline['features']
         self.regressor = self.pipeline['regressor']
-        self.classifier = self.pipeline['classifier']
+        self.classifier = self.pipeline.get('classifier')
+        self._set_mode(self.pipeline.get('mode', 'separate'), self.pipeline.get('calibration'))
+        self.classes = self.classifier.classes_ if self.mode == 'separate' else np.array(self.pipeline['classes'])
+        self.scaler_mean = self.scaler.mean_
+        self.scaler_scale = self.scaler.scale_
+        
+        if self.backend in ('fused', 'flat', 'compact'):
+            # Export both forests once so requests skip sklearn's per-call overhead
+            self.flat_regressor = FlatForest.from_sklearn(self.regressor)
+            if self.mode == 'separate':
+                self.flat_classifier = FlatForest.from_sklearn(self.classifier)
+        if self.backend in ('fused', 'compact'):
+            self.fused_plan = FusedPlan.build(
+                self.scaler, self.flat_regressor, getattr(self, 'flat_classifier', None)
+            )
+        if self.backend == 'compact':
+            # Same gate as export_artifacts: never serve a plan outside COMPACT_TOLERANCE
+            compact = CompactPlan.build(self.fused_plan, self.features)
+            deviation = compact_deviation(compact, self.fused_plan, self.features)
+            if within_compact_tolerance(deviation):
+                self.compact_plan = compact
+            else:
+                print(f"Warning: compact plan deviates by {deviation}, beyond {COMPACT_TOLERANCE}; "
+                      f"serving the fused plan")
+                self.backend = 'fused'
+    
+    def _sklearn_batch(self, n_rows: int) -> bool:
+        """Whether a NumPy backend should hand this many rows to the sklearn forests"""
+        if self.backend not in ('fused', 'flat') or not 0 < self.sklearn_min_rows <= n_rows:
+            return False
+        if hasattr(self, 'regressor'):
+            return True
+        with self._sklearn_lock:
+            if not hasattr(self, 'regressor') and not self._sklearn_missing:
+                try:
+                    pipeline, scaler = self._read_pickles()
+                except OSError:
+                    print(f"Warning: no pickled models in {self.model_dir}, "
+                          f"large batches stay on the {self.backend} backend")
+                    self._sklearn_missing = True
+                    return False
+                self.pipeline, self.scaler = pipeline, scaler
+                self.classifier = pipeline.get('classifier')
+                for estimator in (pipeline['regressor'], self.classifier):
+                    self.threading_policy.pin_estimator(estimator)
+                # Set last: other threads take hasattr(self, 'regressor') as "loaded"
+                self.regressor = pipeline['regressor']
+        return hasattr(self, 'regressor')
+    
+    def _set_mode(self, mode: str, calibration: Optional[Dict]) -> None:
+        """Record the full model's layout; a combined model disables classifier-only options"""
+        if mode not in MODEL_MODES:
+            raise ValueError(f"Unknown model mode {mode!r}, expected one of {MODEL_MODES}")
+        self.mode = mode
+        self.calibration = None
+        if mode == 'separate':
+            return
+        self.calibration = (np.asarray(calibration['x']), np.asarray(calibration['y']))
+        if self.backend == 'compact':
+            print("Warning: combined models have no compact plan, serving the fused plan")
+            self.backend = 'fused'
+        if self.early_exit is not None:
+            print("Warning: early exit needs a separate classifier forest, disabled for this model")
+            self.early_exit = None
+    
+    def _load_tiers(self) -> Dict[str, Dict]:
+        """Load the distilled student models written by train.py, if any"""
+        directory = os.path.join(self.model_dir, TIER_DIR)
+        tiers = {}
+        if os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith('.pkl'):
+                    with open(os.path.join(directory, filename), 'rb') as f:
+                        payload = pickle.load(f)
+                    if list(payload['features']) != list(self.features):
+                        print(f"Warning: tier {payload['name']} uses different features, skipping")
+                        continue
+                    tiers[payload['name']] = payload
+        return tiers
+    
+    def _build_contributions(self) -> Tuple[Optional[np.ndarray], Optional[float]]:
+        """Per-node Saabas table of the regressor and its average root output"""
+        if hasattr(self, 'flat_regressor'):
+            regressor = self.flat_regressor
+        elif hasattr(self, 'regressor'):
+            regressor = FlatForest.from_sklearn(self.regressor)
+            self._contribution_roots = regressor.roots[:, np.newaxis]
+        else:
+            # A compact plan loaded on its own keeps only leaf tables
+            return None, None
+        baseline = float(np.mean(regressor.value[regressor.roots, 0]))
+        return regressor.path_contributions(len(self.features)), baseline
     
-    def predict(self, data: Dict[str, float]) -> Dict:
+    def _count_classifier_trees(self) -> int:
+        if self.mode == 'combined':
+            # Every tree of a combined forest votes, in the same traversal as the score
+            return len(self.regressor.estimators_) if hasattr(self, 'regressor') else self.flat_regressor.n_trees
+        if hasattr(self, 'compact_plan'):
+            return self.compact_plan.n_classifier_trees
+        if hasattr(self, 'flat_classifier'):
+            return self.flat_classifier.n_trees
+        return len(self.classifier.estimators_)
+    
+    def _check_tier(self, tier: Optional[str]) -> str:
+        """Resolve a requested tier, defaulting to the engine's own"""
+        tier = tier or self.tier
+        if tier != FULL_TIER and tier not in self.tiers:
+            available = [FULL_TIER] + sorted(self.tiers)
+            raise ValueError(f"Unknown model tier {tier!r}, available: {available}")
+        return tier
+    
+    def warm_up(self, n_rows: int = 64, seed: int = 0) -> None:
+        """
+        Prepare the engine for traffic before it serves real requests
+        
+        Reads every node array once, so memory-mapped pages are resident, then
+        scores synthetic in-range rows as one batch and as single rows. The
+        prediction cache is bypassed, so warm-up rows never show up as hits.
+        """
+        forests = [getattr(self, name, None) for name in ('flat_regressor', 'flat_classifier')]
+        if hasattr(self, 'fused_plan'):
+            forests.append(self.fused_plan.trees)
+        for forest in filter(None, forests):
+            for name in FOREST_ARRAYS:
+                array = getattr(forest, name)
+                if array is not None:
+                    np.sum(array)
+        if hasattr(self, 'compact_plan'):
+            for name in COMPACT_ARRAYS:
+                np.sum(getattr(self.compact_plan, name))
+        
+        rng = np.random.default_rng(seed)
+        lower = [FEATURE_RANGES[f][0] for f in self.features]
+        upper = [FEATURE_RANGES[f][1] for f in self.features]
+        rows = rng.uniform(lower, upper, size=(n_rows, len(self.features)))
+        for tier in [FULL_TIER] + sorted(self.tiers):
+            self._score(rows, tier)
+            for row in rows[:8]:
+                self._score(row.reshape(1, -1), tier)
+        if self._sklearn_batch(self.sklearn_min_rows):
+            # Loads the sklearn forests now rather than on the first large request
+            self._score(np.resize(rows, (self.sklearn_min_rows, rows.shape[1])))
+        # Warm-up rows do not count towards the early-exit statistics
+        self.scored_rows = self.trees_evaluated = 0
+    
+    def predict(self, data: Dict[str, float], tier: Optional[str] = None,
+                explain: bool = False) -> Dict:
         """
         Make a prediction for a student
         
         Args:
             data: Dictionary with keys: study_hours, attendance, assignments_score, 
                   past_marks, engagement_score
+            tier: Model tier to score with; defaults to the engine's tier
+            explain: Also return per-feature contributions to the score
         
         Returns:
-            Dictionary with predicted_score, pass_fail, risk_category, confidence
+            Dictionary with predicted_score, pass_fail, risk_category, confidence,
+            and score_lower/score_upper/score_std from the individual regressor trees.
+            With ``explain``, also feature_contributions and baseline_score (None
+            for distilled tiers and a standalone compact plan).
         """
-        # Extract features in correct order
-        feature_values = np.array([data[f] for f in self.features]).reshape(1, -1)
-        
         # Validate input ranges
         self._validate_inputs(data)
+        tier = self._check_tier(tier)
         
-        # Scale features
-        feature_values_scaled = self.scaler.transform(feature_values)
+        # Extract features in correct order
+        feature_values = np.array([data[f] for f in self.features], dtype=float).reshape(1, -1)
         
-        # Predict score
-        predicted_score = float(self.regressor.predict(feature_values_scaled)[0])
-        predicted_score = max(0, min(100, predicted_score))  # Clip to 0-100
+        if self.cache is not None:
+            cache_key = (tier, explain) + self.cache.make_key(feature_values[0])
+            cached = self.cache.get(self.model_version, cache_key)
+            if cached is not None:
+                return cached
         
-        # Predict pass/fail
-        pass_fail_pred = self.classifier.predict(feature_values_scaled)[0]
-        pass_fail = 'Pass' if pass_fail_pred == 1 else 'Fail'
+        result = self._build_results(self._score(feature_values, tier, explain), tier, explain)[0]
+        if self.cache is not None:
+            self.cache.put(self.model_version, cache_key, result)
+        return result
+    
+    def predict_batch(self, rows, tier: Optional[str] = None, explain: bool = False) -> List[Dict]:
+        """
+        Make predictions for many students in one pass
+        
+        Args:
+            rows: List of feature dictionaries, a 2D array with columns in
+                  ``self.features`` order, or a pandas DataFrame with those columns
+            tier: Model tier to score with; defaults to the engine's tier
+            explain: Also return per-feature contributions for every row
+        
+        Returns:
+            One dictionary per input row, in input order. Valid rows carry the
+            same fields as ``predict``; invalid rows carry only an ``error`` message.
+        """
+        tier = self._check_tier(tier)
+        feature_matrix = self._to_matrix(rows)
+        errors = self._validate_matrix(feature_matrix)
+        valid = np.array([error is None for error in errors], dtype=bool)
         
-        # Get confidence score
-        confidence = float(self.classifier.predict_proba(feature_values_scaled)[0].max())
+        results: List[Dict] = [{'error': error} for error in errors]
+        if self.cache is not None:
+            cache_keys = {}
+            for i in np.flatnonzero(valid):
+                cache_keys[i] = (tier, explain) + self.cache.make_key(feature_matrix[i])
+                cached = self.cache.get(self.model_version, cache_keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    valid[i] = False
+        if not valid.any():
+            return results
         
-        # Determine risk category
-        risk_category = self._get_risk_category(predicted_score)
+        # One scaler pass and one pass per forest for all rows still to score
+        scored = self._score(feature_matrix[valid], tier, explain)
         
+        for i, result in zip(np.flatnonzero(valid), self._build_results(scored, tier, explain)):
+            results[i] = result
+            if self.cache is not None:
+                self.cache.put(self.model_version, cache_keys[i], results[i])
+        return results
+    
+    def _score(self, feature_matrix: np.ndarray, tier: str = FULL_TIER,
+               explain: bool = False) -> ScoredRows:
+        """
+        Run scaler and both forests (or one student tier) on validated rows
+        
+        Returns:
+            Clipped scores and score intervals, pass/fail class labels,
+            confidences, the number of classifier trees evaluated per row
+            (-1 for tiers) and, with ``explain``, per-feature contributions
+        """
+        parts = self.threading_policy.map_rows(
+            lambda chunk: self._score_rows(chunk, tier, explain), feature_matrix
+        )
+        if len(parts) == 1:
+            return parts[0]
+        return ScoredRows(*(np.concatenate(columns) for columns in zip(*parts)))
+    
+    def _score_rows(self, feature_matrix: np.ndarray, tier: str, explain: bool = False) -> ScoredRows:
+        """Score one chunk of rows on the calling thread"""
+        n_rows = len(feature_matrix)
+        no_contributions = np.empty((n_rows, 0))
+        if tier != FULL_TIER:
+            # Students predict [score, pass probability] from scaled features
+            outputs = self.tiers[tier]['model'].predict(
+                (feature_matrix - self.scaler_mean) / self.scaler_scale
+            )
+            pass_probability = np.clip(outputs[:, 1], 0.0, 1.0)
+            proba = np.column_stack([1.0 - pass_probability, pass_probability])
+            labels = np.where(pass_probability > 0.5, 1, 0)
+            no_spread = np.full(n_rows, np.nan)
+            return ScoredRows(np.clip(outputs[:, 0], 0, 100), labels, proba.max(axis=1),
+                              np.full(n_rows, -1), no_spread, no_spread, no_spread, no_contributions)
+        
+        # Regressor leaves, where the scoring traversal yields them, are reused for contributions
+        leaves = None
+        large = self.early_exit is None and self._sklearn_batch(n_rows)
+        if self.early_exit is not None:
+            tree_scores, proba, trees = self._early_exit_score(feature_matrix)
+        elif self.backend == 'fused' and not large:
+            tree_scores, proba, leaves = self.fused_plan.predict_trees(feature_matrix, return_leaves=True)
+        elif self.backend == 'compact':
+            tree_scores, proba = self.compact_plan.predict_trees(feature_matrix)
+        elif self.backend == 'flat' and not large:
+            feature_values_scaled = self._scaled(feature_matrix)
+            leaves = self.flat_regressor.apply(feature_values_scaled)
+            tree_scores = self.flat_regressor.value[leaves, 0]
+            if self.mode == 'combined':
+                proba = combined_proba(self.flat_regressor.value[leaves, 1])
+            else:
+                proba = self.flat_classifier.predict(feature_values_scaled)
+        elif self.mode == 'combined':
+            tree_outputs = self._sklearn_tree_scores(self.scaler.transform(feature_matrix))
+            tree_scores, proba = tree_outputs[:, :, 0], combined_proba(tree_outputs[:, :, 1])
+        else:
+            feature_values_scaled = self.scaler.transform(feature_matrix)
+            tree_scores = self._sklearn_tree_scores(feature_values_scaled)
+            proba = self.classifier.predict_proba(feature_values_scaled)
+        if self.calibration is not None:
+            proba = self._calibrated(proba)
+        if self.early_exit is None:
+            trees = np.full(n_rows, self.n_classifier_trees)
+            trees_total = n_rows * self.n_classifier_trees
+        else:
+            trees_total = int(trees.sum())
+        with self._stats_lock:
+            self.scored_rows += n_rows
+            self.trees_evaluated += trees_total
+        
+        # The spread comes from the same per-tree outputs as the mean
+        scores, lower, upper, std = summarize_tree_scores(tree_scores, self.interval_coverage)
+        # Same decision rule as classifier.predict, without a second forest pass
+        labels = self.classes.take(proba.argmax(axis=1))
+        if explain and self.contribution_table is not None:
+            if leaves is None:
+                leaves = self._regressor_leaves(feature_matrix)
+            contributions = self.contribution_table[leaves].sum(axis=0) / len(leaves)
+        else:
+            contributions = no_contributions
+        # Array methods skip the np.* dispatch wrappers, which matters for single rows
+        return ScoredRows(scores.clip(0, 100), labels, proba.max(axis=1), trees,
+                          lower, upper, std, contributions)
+    
+    def _calibrated(self, proba: np.ndarray) -> np.ndarray:
+        """Map a combined forest's raw pass fraction through its isotonic calibration"""
+        pass_probability = np.interp(proba[:, 1], *self.calibration)
+        return np.column_stack([1.0 - pass_probability, pass_probability])
+    
+    def _regressor_leaves(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Leaf reached in each regressor tree, for backends whose scoring pass does not expose it"""
+        if hasattr(self, 'fused_plan'):
+            return self.fused_plan.trees.apply(feature_matrix, slice(0, self.fused_plan.n_regressor_trees))
+        if hasattr(self, 'flat_regressor'):
+            return self.flat_regressor.apply(self._scaled(feature_matrix))
+        return self.regressor.apply(self.scaler.transform(feature_matrix)).T + self._contribution_roots
+    
+    def _sklearn_tree_scores(self, feature_values_scaled: np.ndarray) -> np.ndarray:
+        """Per-tree regressor outputs (n_trees, n_rows[, n_outputs]); their in-order mean equals regressor.predict"""
+        X = feature_values_scaled.astype(np.float32)
+        return np.stack([tree.predict(X, check_input=False) for tree in self.regressor.estimators_])
+    
+    def _scaled(self, feature_matrix: np.ndarray) -> np.ndarray:
+        if self.backend == 'sklearn':
+            return self.scaler.transform(feature_matrix)
+        # Same arithmetic as StandardScaler.transform without its input checks
+        return (feature_matrix - self.scaler_mean) / self.scaler_scale
+    
+    def _score_prefix(self, feature_matrix: np.ndarray, n_classifier: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-tree raw scores plus the votes of the first n_classifier classifier trees"""
+        if self.backend == 'fused':
+            return self.fused_plan.predict_prefix(feature_matrix, n_classifier)
+        if self.backend == 'compact':
+            return self.compact_plan.predict_prefix(feature_matrix, n_classifier)
+        if self.backend == 'flat':
+            tree_scores = self.flat_regressor.predict_trees(self._scaled(feature_matrix))[:, :, 0]
+        else:
+            tree_scores = self._sklearn_tree_scores(self._scaled(feature_matrix))
+        return tree_scores, self._classifier_votes(feature_matrix, 0, n_classifier)
+    
+    def _classifier_votes(self, feature_matrix: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Class probabilities of classifier trees start..stop, shape (n_trees, n_rows, n_classes)"""
+        if self.backend == 'fused':
+            return self.fused_plan.classifier_votes(feature_matrix, start, stop)
+        if self.backend == 'compact':
+            return self.compact_plan.classifier_votes(feature_matrix, start, stop)
+        scaled = self._scaled(feature_matrix)
+        if self.backend == 'flat':
+            forest = self.flat_classifier
+            return forest.value[forest.apply(scaled, slice(start, stop))]
+        return np.stack([tree.predict_proba(scaled) for tree in self.classifier.estimators_[start:stop]])
+    
+    def _early_exit_score(self, feature_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Soft-vote the classifier trees in blocks, dropping rows once they are decided
+        
+        After k of n trees, a class total can still grow by at most n - k, so
+        in 'exact' mode a row stops when its leading class is ahead of every
+        other class by more than that. The label is then guaranteed to match
+        the full forest. 'bound' mode also stops when the lead over the
+        runner-up exceeds twice the Hoeffding radius for early_exit_confidence.
+        That mode is faster but can rarely disagree with the full vote.
+        Confidence is the mean vote over the trees actually evaluated. Rows
+        that run to the last tree get exactly the full-forest probabilities.
+        
+        Returns:
+            Tuple of per-tree raw scores, class probabilities and trees evaluated per row
+        """
+        n_rows, n_trees = len(feature_matrix), self.n_classifier_trees
+        totals = np.zeros((n_rows, len(self.classes)))
+        trees = np.zeros(n_rows, dtype=int)
+        active = np.arange(n_rows)
+        # No exact decision is possible before a majority of trees has voted;
+        # the first block shares its traversal with the regressor
+        stop = min(n_trees // 2 + 1 if self.early_exit == 'exact' else self.early_exit_block, n_trees)
+        tree_scores, votes = self._score_prefix(feature_matrix, stop)
+        while True:
+            # Continue the running sum tree by tree, as the full evaluation does
+            totals[active] = np.cumsum(np.concatenate([totals[active][np.newaxis], votes]), axis=0)[-1]
+            trees[active] = stop
+            if stop == n_trees:
+                break
+            ranked = np.sort(totals[active], axis=1)
+            lead = ranked[:, -1] - ranked[:, -2]
+            decided = lead > n_trees - stop
+            if self.early_exit == 'bound':
+                radius = np.sqrt(np.log(2 / (1 - self.early_exit_confidence)) / (2 * stop))
+                decided |= lead / stop > 2 * radius
+            active = active[~decided]
+            if not len(active):
+                break
+            start, stop = stop, min(stop + self.early_exit_block, n_trees)
+            votes = self._classifier_votes(feature_matrix[active], start, stop)
+        return tree_scores, totals / trees[:, np.newaxis], trees
+    
+    def early_exit_stats(self) -> Dict:
+        """Average classifier trees evaluated per full-model prediction"""
+        return {
+            'mode': self.early_exit,
+            'confidence': self.early_exit_confidence if self.early_exit == 'bound' else None,
+            'classifier_trees': self.n_classifier_trees,
+            'scored_rows': self.scored_rows,
+            'average_trees_evaluated': round(self.trees_evaluated / self.scored_rows, 2) if self.scored_rows else None
+        }
+    
+    def _build_results(self, scored: ScoredRows, tier: str = FULL_TIER,
+                       explain: bool = False) -> List[Dict]:
+        """Assemble one prediction dictionary per scored row"""
+        # tolist() converts each column to Python scalars in one call, and the
+        # spread is rounded in one vectorised call instead of three per row
+        columns = [column.tolist() for column in scored[:4]]
+        spreads = np.array(scored[4:7]).round(2).T.tolist()
+        results = [
+            self._build_result(*row, *spread, tier=tier)
+            for row, spread in zip(zip(*columns), spreads)
+        ]
+        if explain:
+            self._add_contributions(results, scored.contributions)
+        return results
+    
+    def _add_contributions(self, results: List[Dict], contributions: np.ndarray) -> None:
+        """Attach per-feature contributions; None where the model cannot provide them"""
+        if contributions.shape[1] == 0:
+            for result in results:
+                result.update(feature_contributions=None, baseline_score=None)
+            return
+        baseline = round(self.baseline_score, 2)
+        for result, row in zip(results, contributions.round(2).tolist()):
+            result.update(feature_contributions=dict(zip(self.features, row)), baseline_score=baseline)
+    
+    def _build_result(self, predicted_score: float, label: int, confidence: float,
+                      trees_evaluated: int, score_lower: float, score_upper: float,
+                      score_std: float, tier: str = FULL_TIER) -> Dict:
+        """Assemble the prediction dictionary returned to callers (spread already rounded)"""
+        # Distilled tiers have no per-tree outputs, so their spread is NaN
+        has_spread = score_std == score_std
         return {
             'predicted_score': round(predicted_score, 2),
-            'pass_fail': pass_fail,
-            'risk_category': risk_category,
+            'pass_fail': 'Pass' if label == 1 else 'Fail',
+            'risk_category': self._get_risk_category(predicted_score),
             'confidence': round(confidence, 2),
-            'features_used': self.features
+            'score_lower': score_lower if has_spread else None,
+            'score_upper': score_upper if has_spread else None,
+            'score_std': score_std if has_spread else None,
+            'interval_coverage': self.interval_coverage if has_spread else None,
+            'features_used': self.features,
+            'model_version': self.model_version if tier == FULL_TIER else f"{self.model_version}+{tier}",
+            'tier': tier,
+            'trees_evaluated': trees_evaluated if trees_evaluated >= 0 else None
         }
     
+    def _to_matrix(self, rows) -> np.ndarray:
+        """Convert batch input into a float matrix with columns in feature order"""
+        if hasattr(rows, 'columns'):
+            # pandas DataFrame; missing columns become NaN and fail validation
+            return rows.reindex(columns=self.features).to_numpy(dtype=float)
+        if isinstance(rows, np.ndarray):
+            matrix = np.asarray(rows, dtype=float)
+            if matrix.ndim != 2 or matrix.shape[1] != len(self.features):
+                raise ValueError(
+                    f"Expected an array of shape (n, {len(self.features)}), got {matrix.shape}"
+                )
+            return matrix
+        return np.array(
+            [[row.get(f, np.nan) for f in self.features] for row in rows],
+            dtype=float
+        ).reshape(-1, len(self.features))
+    
+    def _validate_matrix(self, feature_matrix: np.ndarray) -> List:
+        """Validate all rows at once; returns an error message (or None) per row"""
+        lower = np.array([FEATURE_RANGES[f][0] for f in self.features], dtype=float)
+        upper = np.array([FEATURE_RANGES[f][1] for f in self.features], dtype=float)
+        
+        # NaN compares False on both sides, so missing values are flagged too
+        invalid = ~((feature_matrix >= lower) & (feature_matrix <= upper))
+        errors = [None] * len(feature_matrix)
+        for i in np.flatnonzero(invalid.any(axis=1)):
+            j = int(np.argmax(invalid[i]))
+            field, value = self.features[j], feature_matrix[i, j]
+            if np.isnan(value):
+                errors[i] = f"{field} is required"
+            else:
+                min_val, max_val = FEATURE_RANGES[field]
+                errors[i] = f"{field} must be between {min_val} and {max_val}, got {value:g}"
+        return errors
+    
     def _get_risk_category(self, score: float) -> str:
         """Determine risk category from predicted score"""
         if score >= self.model_info['risk_thresholds']['low_risk']:
@@ -78,15 +1322,7 @@ class PredictionEngine:
     
     def _validate_inputs(self, data: Dict[str, float]) -> None:
         """Validate input data ranges"""
-        validations = {
-            'study_hours': (0, 24),
-            'attendance': (0, 100),
-            'assignments_score': (0, 100),
-            'past_marks': (0, 100),
-            'engagement_score': (0, 10)
-        }
-        
-        for field, (min_val, max_val) in validations.items():
+        for field, (min_val, max_val) in FEATURE_RANGES.items():
             if field in data:
                 value = data[field]
                 if not (min_val <= value <= max_val):
@@ -98,6 +1334,68 @@ class PredictionEngine:
         """Return model information and performance metrics"""
         return self.model_info
 
+def export_artifacts(pipeline: Dict, scaler, model_info: Dict, model_dir: str) -> str:
+    """
+    Write the models as flat .npy arrays plus a JSON manifest
+    
+    PredictionEngine memory-maps these files instead of unpickling, so every
+    worker process shares one page-cache copy and starts without importing
+    sklearn. The manifest is written last, so a half-finished export is
+    never picked up.
+    
+    Returns:
+        Path of the written manifest
+    """
+    directory = os.path.join(model_dir, ARTIFACT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    
+    mode = pipeline.get('mode', 'separate')
+    regressor = FlatForest.from_sklearn(pipeline['regressor'])
+    np.save(os.path.join(directory, 'scaler_mean.npy'), scaler.mean_)
+    np.save(os.path.join(directory, 'scaler_scale.npy'), scaler.scale_)
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_version': f"{model_info['version']}@{model_info.get('training_date', '')}",
+        'mode': mode,
+        'features': list(pipeline['features']),
+        'regressor': regressor.save(directory, 'regressor')
+    }
+    
+    if mode == 'combined':
+        # One forest already covers both outputs; there is no classifier to compact
+        manifest.update(
+            classes=list(pipeline['classes']),
+            calibration=pipeline['calibration'],
+            fused=FusedPlan.build(scaler, regressor).save(directory, 'fused')
+        )
+        return _write_manifest(directory, manifest)
+    
+    classifier = FlatForest.from_sklearn(pipeline['classifier'])
+    fused = FusedPlan.build(scaler, regressor, classifier)
+    compact = CompactPlan.build(fused, list(pipeline['features']))
+    manifest.update(
+        classes=pipeline['classifier'].classes_.tolist(),
+        classifier=classifier.save(directory, 'classifier'),
+        fused=fused.save(directory, 'fused')
+    )
+    
+    # Only ship the compact plan if it reproduces the fused plan within tolerance
+    deviation = compact_deviation(compact, fused, list(pipeline['features']))
+    if within_compact_tolerance(deviation):
+        manifest['compact'] = compact.save(directory, 'compact')
+        manifest['compact'].update(max_deviation=deviation, tolerance=COMPACT_TOLERANCE)
+    else:
+        print(f"Warning: compact plan deviates by {deviation}, beyond {COMPACT_TOLERANCE}; not exported")
+    return _write_manifest(directory, manifest)
+
+def _write_manifest(directory: str, manifest: Dict) -> str:
+    """Atomically replace the artifact manifest"""
+    manifest_path = os.path.join(directory, 'manifest.json')
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest_path
+
 # Singleton instance
 _engine = None
 
@@ -112,3 +1410,8 @@ def predict(data: Dict[str, float]) -> Dict:
     """Convenience function for making predictions"""
     engine = get_engine()
     return engine.predict(data)
+
+def predict_batch(rows) -> List[Dict]:
+    """Convenience function for making batch predictions"""
+    engine = get_engine()
+    return engine.predict_batch(rows)
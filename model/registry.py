@@ -0,0 +1,85 @@
+"""
+Versioned model registry
+
+Layout:
+    registry/
+        CURRENT             # name of the active version directory
+        <version>/          # model_info.json, pickles, artifacts/ and tiers/ for one training run
+
+A version directory is complete before it becomes visible: it is copied
+under a temporary name and then renamed. CURRENT is replaced atomically,
+so a watcher never sees a half-published model.
+"""
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+REGISTRY_DIR = os.path.join(os.path.dirname(__file__), 'registry')
+CURRENT_FILE = 'CURRENT'
+MODEL_FILES = ('model_pipeline.pkl', 'scaler.pkl', 'model_info.json')
+TIER_DIR = 'tiers'
+ARTIFACT_DIR = 'artifacts'
+
+def version_name(model_info: Dict) -> str:
+    """Filesystem-safe registry name for a trained model"""
+    stamp = model_info.get('training_date', '').replace(':', '-').replace('.', '-')
+    return f"{model_info['version']}-{stamp}" if stamp else str(model_info['version'])
+
+def publish(model_dir: str, registry_dir: str = REGISTRY_DIR, activate: bool = True) -> str:
+    """
+    Copy the model files in model_dir into a new registry version
+
+    Returns:
+        Name of the published version
+    """
+    with open(os.path.join(model_dir, 'model_info.json'), 'r') as f:
+        name = version_name(json.load(f))
+
+    target = os.path.join(registry_dir, name)
+    if not os.path.exists(target):
+        staging = target + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for filename in MODEL_FILES:
+            shutil.copy2(os.path.join(model_dir, filename), staging)
+        for subdir in (ARTIFACT_DIR, TIER_DIR):
+            if os.path.isdir(os.path.join(model_dir, subdir)):
+                shutil.copytree(os.path.join(model_dir, subdir), os.path.join(staging, subdir))
+        os.replace(staging, target)
+
+    if activate:
+        set_active_version(name, registry_dir)
+    return name
+
+def set_active_version(name: str, registry_dir: str = REGISTRY_DIR) -> None:
+    """Point CURRENT at an existing version (use this to roll back too)"""
+    if not os.path.isdir(os.path.join(registry_dir, name)):
+        raise ValueError(f"Unknown model version: {name}")
+    current = os.path.join(registry_dir, CURRENT_FILE)
+    with open(current + '.tmp', 'w') as f:
+        f.write(name + '\n')
+    os.replace(current + '.tmp', current)
+
+def active_version(registry_dir: str = REGISTRY_DIR) -> Optional[str]:
+    """Name of the active version, or None if nothing has been published"""
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE), 'r') as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return name or None
+
+def version_dir(name: str, registry_dir: str = REGISTRY_DIR) -> str:
+    """Directory holding a version's files"""
+    return os.path.join(registry_dir, name)
+
+def list_versions(registry_dir: str = REGISTRY_DIR) -> List[str]:
+    """All published versions, oldest first"""
+    if not os.path.isdir(registry_dir):
+        return []
+    names = [
+        name for name in os.listdir(registry_dir)
+        if os.path.isdir(os.path.join(registry_dir, name)) and not name.endswith('.tmp')
+    ]
+    return sorted(names, key=lambda name: os.path.getmtime(os.path.join(registry_dir, name)))
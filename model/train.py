@@ -1,204 +1,748 @@
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.pipeline import Pipeline
-from sklearn.metrics import accuracy_score, classification_report, mean_squared_error
-import pickle
+"""
+Train, evaluate and publish the student performance models
+
+Usage:
+    python train.py [--mode separate|combined] [--dataset PATH] [--chunksize 100000]
+                    [--n-estimators 100] [--max-depth 15] [--no-publish] [--no-cache]
+
+Every stage is a function, and ``train()`` runs them all, so the pipeline can
+be imported and driven from other code without retraining on import. Each
+stage prints its wall time and peak resident memory, and the totals are
+written to training_report.json. A run whose inputs (dataset bytes, features,
+parameters, library versions) match an earlier one restores that run's models
+from the training cache instead of refitting.
+"""
+import argparse
+import hashlib
 import json
 import os
+import pickle
+import platform
+import shutil
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy.special import ndtr
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, GradientBoostingRegressor
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import Ridge
+from sklearn.metrics import accuracy_score, brier_score_loss, classification_report, mean_squared_error
+from sklearn.model_selection import train_test_split
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+
+from predict import ARTIFACT_DIR, export_artifacts, FlatForest, FusedPlan, MODEL_MODES, TIER_DIR
+from registry import MODEL_FILES, publish
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(MODEL_DIR, '..', 'dataset', 'student_data.csv')
+TRAINING_CACHE_DIR = os.path.join(MODEL_DIR, 'cache')
+# Bump when a change to this pipeline alters its output for the same inputs
+TRAINING_CACHE_VERSION = 1
+CACHED_REPORTS = ('distillation_report.json', 'training_report.json')
+
+FEATURES = ['study_hours', 'attendance', 'assignments_score', 'past_marks', 'engagement_score']
+SCORE_COLUMN = 'final_score'
+PASS_COLUMN = 'pass_fail'
+PASS_MARK = 50
+
+# Synthetic data: feature ranges and the final_score formula
+SYNTHETIC_RANGES = {
+    'study_hours': (1, 8),
+    'attendance': (60, 100),
+    'assignments_score': (50, 100),
+    'past_marks': (40, 95),
+    'engagement_score': (1, 10)
+}
+SYNTHETIC_SCORE_WEIGHTS = {
+    'study_hours': 0.15 * 10,
+    'attendance': 0.20,
+    'assignments_score': 0.20,
+    'past_marks': 0.25,
+    'engagement_score': 0.20 * 8
+}
+SYNTHETIC_SCORE_NOISE = 3
+
+# Distillation labels the training rows plus jittered copies of them, up to this many rows
+TRANSFER_COPIES = 10
+MAX_TRANSFER_ROWS = 200_000
+
+# Shared by the regressor, the classifier and the combined forest
+FOREST_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 15,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'random_state': 42,
+    'n_jobs': -1
+}
+
+def _banner(title: str) -> None:
+    print("\n" + "=" * 50)
+    print(title)
+    print("=" * 50)
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux), or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _max_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, where the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class StageLog:
+    """
+    Wall time and peak resident memory of each training stage
+
+    While a stage runs, a background thread samples the process RSS every
+    `sample_interval` seconds, so the peak includes native allocations
+    such as sklearn's tree buffers, and tracking does not slow the stage
+    down (latencies measured inside a stage stay representative). Without
+    /proc, the process-wide peak RSS so far is recorded instead.
+    """
 
-# Set random seed for reproducibility
-np.random.seed(42)
-
-# Generate synthetic student data
-def generate_synthetic_data(n_samples=200):
-    """Generate realistic synthetic student performance data"""
-    
-    data = {
-        'student_id': np.arange(1, n_samples + 1),
-        'study_hours': np.random.uniform(1, 8, n_samples),
-        'attendance': np.random.uniform(60, 100, n_samples),
-        'assignments_score': np.random.uniform(50, 100, n_samples),
-        'past_marks': np.random.uniform(40, 95, n_samples),
-        'engagement_score': np.random.uniform(1, 10, n_samples),
+    def __init__(self, track_memory: bool = True, sample_interval: float = 0.005):
+        self.track_memory = track_memory
+        self.sample_interval = sample_interval
+        self.stages: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start_rss = _rss_bytes() if self.track_memory else None
+        peak = [start_rss or 0]
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.sample_interval):
+                peak[0] = max(peak[0], _rss_bytes() or 0)
+
+        sampler = threading.Thread(target=sample, daemon=True) if start_rss is not None else None
+        if sampler is not None:
+            sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            record = {'stage': name, 'seconds': round(seconds, 3), 'peak_rss_mb': None, 'rss_growth_mb': None}
+            if sampler is not None:
+                done.set()
+                sampler.join()
+                peak_rss = max(peak[0], _rss_bytes() or 0)
+                record.update(peak_rss_mb=round(peak_rss / 2**20, 1),
+                              rss_growth_mb=round((peak_rss - start_rss) / 2**20, 1))
+            elif self.track_memory and _max_rss_bytes() is not None:
+                record['peak_rss_mb'] = round(_max_rss_bytes() / 2**20, 1)
+            self.stages.append(record)
+            memory = f", peak RSS {record['peak_rss_mb']:,} MiB" if record['peak_rss_mb'] is not None else ""
+            print(f"[{name}] {seconds:,.2f} s{memory}")
+
+def training_hash(dataset_path: str, mode: str, params: Dict, test_size: float, seed: int) -> str:
+    """
+    Content hash of everything that determines a training run's output
+
+    Covers the dataset bytes, the feature and target columns, the forest and
+    split parameters, the distillation settings and the library versions.
+    n_jobs is left out because it does not change the fitted forests.
+    """
+    digest = hashlib.sha256()
+    with open(dataset_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    inputs = {
+        'cache_version': TRAINING_CACHE_VERSION,
+        'features': FEATURES,
+        'targets': [SCORE_COLUMN, PASS_COLUMN, PASS_MARK],
+        'mode': mode,
+        'forest_params': {name: value for name, value in sorted(params.items()) if name != 'n_jobs'},
+        'test_size': test_size,
+        'seed': seed,
+        'distillation': [TRANSFER_COPIES, MAX_TRANSFER_ROWS],
+        'libraries': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'scikit-learn': sklearn.__version__
+        }
     }
-    
-    df = pd.DataFrame(data)
-    
-    # Generate final_score with realistic correlation to features
+    digest.update(json.dumps(inputs, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def _copy_model_files(source: str, target: str) -> None:
+    """Copy the files of one trained model between a model dir and a cache entry"""
+    os.makedirs(target, exist_ok=True)
+    for filename in MODEL_FILES + CACHED_REPORTS:
+        if os.path.exists(os.path.join(source, filename)):
+            shutil.copy2(os.path.join(source, filename), target)
+    for subdir in (ARTIFACT_DIR, TIER_DIR):
+        if os.path.isdir(os.path.join(source, subdir)):
+            shutil.rmtree(os.path.join(target, subdir), ignore_errors=True)
+            shutil.copytree(os.path.join(source, subdir), os.path.join(target, subdir))
+
+def store_in_cache(model_dir: str, cache_dir: str, key: str) -> str:
+    """Copy a finished model into cache_dir/<key>; the entry appears complete or not at all"""
+    entry = os.path.join(cache_dir, key)
+    if not os.path.exists(entry):
+        staging = entry + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        _copy_model_files(model_dir, staging)
+        os.replace(staging, entry)
+    return entry
+
+def load_from_cache(model_dir: str, cache_dir: str, key: str) -> Optional[Dict]:
+    """
+    Restore the model cached under key into model_dir
+
+    Returns:
+        Its model_info, or None on a cache miss
+    """
+    entry = os.path.join(cache_dir, key)
+    if not os.path.exists(os.path.join(entry, 'model_info.json')):
+        return None
+    if os.path.abspath(entry) != os.path.abspath(model_dir):
+        _copy_model_files(entry, model_dir)
+    with open(os.path.join(entry, 'model_info.json'), 'r') as f:
+        return json.load(f)
+
+def _synthetic_block(first_id: int, n_rows: int, rng: np.random.Generator, correlation: float,
+                     score_offset: float) -> pd.DataFrame:
+    """One chunk of synthetic students; see synthetic_chunks"""
+    # Features share a latent ability factor, then map through the normal CDF
+    # onto uniform marginals (correlation 0 gives independent uniforms)
+    ability = np.sqrt(correlation) * rng.standard_normal(n_rows)
+    data = {'student_id': np.arange(first_id + 1, first_id + n_rows + 1)}
+    for feature in FEATURES:
+        low, high = SYNTHETIC_RANGES[feature]
+        uniform = ndtr(ability + np.sqrt(1 - correlation) * rng.standard_normal(n_rows))
+        data[feature] = (low + (high - low) * uniform).astype(np.float32)
+
     # Higher study hours, attendance, and engagement → higher final score
-    df['final_score'] = (
-        0.15 * df['study_hours'] * 10 +
-        0.20 * df['attendance'] +
-        0.20 * df['assignments_score'] +
-        0.25 * df['past_marks'] +
-        0.20 * df['engagement_score'] * 8 +
-        np.random.normal(0, 3, n_samples)  # Add noise
+    score = rng.normal(score_offset, SYNTHETIC_SCORE_NOISE, n_rows)
+    for feature, weight in SYNTHETIC_SCORE_WEIGHTS.items():
+        score += weight * data[feature]
+    data[SCORE_COLUMN] = np.clip(score, 0, 100).astype(np.float32)
+    data[PASS_COLUMN] = (data[SCORE_COLUMN] >= PASS_MARK).astype(np.int8)
+    data['risk_category'] = pd.Categorical.from_codes(
+        np.searchsorted([60, 75], data[SCORE_COLUMN], side='left'), ['High', 'Medium', 'Low']
     )
-    
-    # Clip scores to 0-100 range
-    df['final_score'] = df['final_score'].clip(0, 100)
-    
-    # Derive pass_fail (passing grade is 50)
-    df['pass_fail'] = (df['final_score'] >= 50).astype(int)
-    
-    # Derive risk_category
-    df['risk_category'] = pd.cut(
-        df['final_score'],
-        bins=[0, 60, 75, 100],
-        labels=['High', 'Medium', 'Low'],
-        include_lowest=True
+    return pd.DataFrame(data)
+
+def _pass_rate_offset(pass_rate: float, correlation: float, seed: int, sample_rows: int = 200_000) -> float:
+    """Score shift that makes the expected share of passing students pass_rate"""
+    sample = _synthetic_block(0, sample_rows, np.random.default_rng(np.random.SeedSequence(seed)), correlation, 0.0)
+    unclipped = sample[SCORE_COLUMN].to_numpy(np.float64)
+    return float(PASS_MARK - np.quantile(unclipped, 1 - pass_rate))
+
+def synthetic_chunks(n_rows: int, chunk_rows: int = 1_000_000, seed: int = 42, correlation: float = 0.0,
+                     pass_rate: Optional[float] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream synthetic student records in chunks of at most chunk_rows
+
+    Chunk k draws from its own generator, spawned from seed, so the output
+    is the same for the same (n_rows, chunk_rows, seed, correlation,
+    pass_rate) and memory stays bounded by one chunk.
+
+    Args:
+        correlation: Share of each feature's variance from a common ability
+                     factor, in [0, 1); 0 leaves the features independent
+        pass_rate: Expected share of final_score >= PASS_MARK, in (0, 1);
+                   None keeps the unshifted score formula
+    """
+    if not 0 <= correlation < 1:
+        raise ValueError(f"correlation must be in [0, 1), got {correlation}")
+    if pass_rate is not None and not 0 < pass_rate < 1:
+        raise ValueError(f"pass_rate must be in (0, 1), got {pass_rate}")
+    if chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be positive, got {chunk_rows}")
+    offset = _pass_rate_offset(pass_rate, correlation, seed) if pass_rate is not None else 0.0
+    for k, first_id in enumerate(range(0, n_rows, chunk_rows)):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(k,)))
+        yield _synthetic_block(first_id, min(chunk_rows, n_rows - first_id), rng, correlation, offset)
+
+def generate_synthetic_data(n_samples: int = 200, seed: int = 42, correlation: float = 0.0,
+                            pass_rate: Optional[float] = None) -> pd.DataFrame:
+    """Generate realistic synthetic student performance data in one frame"""
+    return pd.concat(
+        synthetic_chunks(n_samples, max(n_samples, 1), seed, correlation, pass_rate), ignore_index=True
     )
-    
-    return df
-
-# Load or generate dataset
-dataset_path = os.path.join(os.path.dirname(__file__), '..', 'dataset', 'student_data.csv')
-if os.path.exists(dataset_path):
-    df = pd.read_csv(dataset_path)
-    print(f"Loaded dataset from {dataset_path} with {len(df)} samples")
-else:
+
+def ensure_dataset(path: str) -> None:
+    """Write a synthetic dataset to path if there is none yet"""
+    if os.path.exists(path):
+        return
     print("Dataset not found. Generating synthetic data...")
-    df = generate_synthetic_data(200)
-    os.makedirs(os.path.dirname(dataset_path), exist_ok=True)
-    df.to_csv(dataset_path, index=False)
-    print(f"Generated and saved synthetic dataset to {dataset_path}")
-
-print(f"\nDataset shape: {df.shape}")
-print(f"Columns: {df.columns.tolist()}")
-print(f"\nFirst few rows:")
-print(df.head())
-print(f"\nDataset statistics:")
-print(df.describe())
-
-# Prepare features and target
-features = ['study_hours', 'attendance', 'assignments_score', 'past_marks', 'engagement_score']
-X = df[features]
-y = df['final_score']  # Continuous target for regression
-
-# For classification models (pass/fail)
-y_binary = df['pass_fail']
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-X_train_bin, X_test_bin, y_train_bin, y_test_bin = train_test_split(
-    X, y_binary, test_size=0.2, random_state=42, stratify=y_binary
-)
-
-print(f"\nTraining set size: {len(X_train)}")
-print(f"Test set size: {len(X_test)}")
-
-# Train regression model (for score prediction)
-print("\n" + "="*50)
-print("Training regression model (score prediction)...")
-print("="*50)
-
-scaler = StandardScaler()
-rf_regressor = RandomForestRegressor(
-    n_estimators=100,
-    max_depth=15,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42,
-    n_jobs=-1
-)
-
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-rf_regressor.fit(X_train_scaled, y_train)
-y_pred = rf_regressor.predict(X_test_scaled)
-
-mse = mean_squared_error(y_test, y_pred)
-rmse = np.sqrt(mse)
-r2_score = rf_regressor.score(X_test_scaled, y_test)
-
-print(f"MSE: {mse:.4f}")
-print(f"RMSE: {rmse:.4f}")
-print(f"R² Score: {r2_score:.4f}")
-
-# Train classification model (for pass/fail)
-print("\n" + "="*50)
-print("Training classification model (pass/fail prediction)...")
-print("="*50)
-
-rf_classifier = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=15,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42,
-    n_jobs=-1
-)
-
-rf_classifier.fit(X_train_scaled, y_train_bin)
-y_pred_bin = rf_classifier.predict(X_test_scaled)
-
-accuracy = accuracy_score(y_test_bin, y_pred_bin)
-print(f"Accuracy: {accuracy:.4f}")
-print("\nClassification Report:")
-print(classification_report(y_test_bin, y_pred_bin, target_names=['Fail', 'Pass']))
-
-# Feature importance
-feature_importance = pd.DataFrame({
-    'feature': features,
-    'importance': rf_regressor.feature_importances_
-}).sort_values('importance', ascending=False)
-
-print("\n" + "="*50)
-print("Feature Importance (Regression Model)")
-print("="*50)
-print(feature_importance)
-
-# Save models
-model_dir = os.path.dirname(__file__)
-os.makedirs(model_dir, exist_ok=True)
-
-# Save as pickle files
-with open(os.path.join(model_dir, 'model_pipeline.pkl'), 'wb') as f:
-    pickle.dump({
-        'regressor': rf_regressor,
-        'classifier': rf_classifier,
-        'features': features
-    }, f)
-
-with open(os.path.join(model_dir, 'scaler.pkl'), 'wb') as f:
-    pickle.dump(scaler, f)
-
-print(f"\n✓ Models saved to {model_dir}")
-
-# Save model metadata
-model_info = {
-    'algorithm': 'Random Forest Ensemble',
-    'features': features,
-    'n_estimators': 100,
-    'max_depth': 15,
-    'feature_importance': feature_importance.to_dict(orient='records'),
-    'performance': {
-        'regression': {
-            'rmse': float(rmse),
-            'r2_score': float(r2_score),
-            'mse': float(mse)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    generate_synthetic_data(200).to_csv(path, index=False)
+    print(f"Generated and saved synthetic dataset to {path}")
+
+def load_dataset(path: str, chunksize: int = 100_000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Read the training columns of a CSV in chunks
+
+    Only the five features, final_score and pass_fail are parsed, and they
+    are parsed straight into float32 (pass_fail into int8). Identifier and
+    category columns are never materialised, and no float64 frame of the
+    whole file is built. pass_fail is derived from final_score when the file
+    has no such column.
+
+    Returns:
+        Feature matrix (n_rows, 5) in FEATURES order, scores and pass labels
+    """
+    numeric = FEATURES + [SCORE_COLUMN]
+    wanted = set(numeric + [PASS_COLUMN])
+    dtypes = {**{column: np.float32 for column in numeric}, PASS_COLUMN: np.int8}
+    reader = pd.read_csv(path, usecols=lambda column: column in wanted, dtype=dtypes, chunksize=chunksize)
+
+    features, scores, passes = [], [], []
+    for chunk in reader:
+        missing = [column for column in numeric if column not in chunk]
+        if missing:
+            raise ValueError(f"{path} is missing required columns: {missing}")
+        features.append(chunk[FEATURES].to_numpy())
+        scores.append(chunk[SCORE_COLUMN].to_numpy())
+        if PASS_COLUMN in chunk:
+            passes.append(chunk[PASS_COLUMN].to_numpy())
+        else:
+            passes.append((scores[-1] >= PASS_MARK).astype(np.int8))
+    if not features:
+        raise ValueError(f"{path} has no rows")
+    return np.concatenate(features), np.concatenate(scores), np.concatenate(passes)
+
+def split_dataset(X: np.ndarray, y_score: np.ndarray, y_pass: np.ndarray,
+                  test_size: float = 0.2, seed: int = 42) -> List[np.ndarray]:
+    """
+    One train/test split shared by every target
+
+    Splitting the pass labels separately (stratified) would pair the
+    regression split's features with another split's labels, so both
+    targets come from the same rows.
+
+    Returns:
+        X_train, X_test, y_train, y_test, y_pass_train, y_pass_test
+    """
+    return train_test_split(X, y_score, y_pass, test_size=test_size, random_state=seed)
+
+def train_regressor(X_train_scaled: np.ndarray, y_train: np.ndarray,
+                    forest_params: Dict) -> RandomForestRegressor:
+    """Random forest for the final score"""
+    regressor = RandomForestRegressor(**forest_params)
+    regressor.fit(X_train_scaled, y_train)
+    return regressor
+
+def train_classifier(X_train_scaled: np.ndarray, y_pass_train: np.ndarray,
+                     forest_params: Dict) -> RandomForestClassifier:
+    """Random forest for pass/fail"""
+    classifier = RandomForestClassifier(**forest_params)
+    classifier.fit(X_train_scaled, y_pass_train)
+    return classifier
+
+def train_combined(X_train_scaled: np.ndarray, y_train: np.ndarray, y_pass_train: np.ndarray,
+                   forest_params: Dict) -> Tuple[RandomForestRegressor, Dict]:
+    """
+    One forest whose leaves hold [score, pass fraction], plus its calibration
+
+    Leaf pass fractions are not probabilities yet; the out-of-bag ones are
+    mapped onto the observed pass rate with an isotonic fit.
+
+    Returns:
+        The forest and the isotonic breakpoints as {'x': [...], 'y': [...]}
+    """
+    forest = RandomForestRegressor(**forest_params, oob_score=True)
+    forest.fit(X_train_scaled, np.column_stack([y_train, y_pass_train]))
+    isotonic = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+    isotonic.fit(forest.oob_prediction_[:, 1], y_pass_train)
+    return forest, {'x': isotonic.X_thresholds_.tolist(), 'y': isotonic.y_thresholds_.tolist()}
+
+def full_model_targets(pipeline: Dict, scaler) -> Tuple[Callable, Callable]:
+    """
+    Score and pass probability of a full pipeline, shape (n_rows, 2)
+
+    Returns:
+        A function of scaled rows that uses sklearn, and one of raw rows that
+        uses the fused plan the backend serves
+    """
+    regressor = pipeline['regressor']
+    if pipeline['mode'] == 'combined':
+        x, y = pipeline['calibration']['x'], pipeline['calibration']['y']
+        plan = FusedPlan.build(scaler, FlatForest.from_sklearn(regressor))
+
+        def sklearn_targets(X_scaled):
+            outputs = regressor.predict(X_scaled)
+            return np.column_stack([outputs[:, 0], np.interp(outputs[:, 1], x, y)])
+
+        def fused_targets(X_raw):
+            scores, proba = plan.predict(X_raw)
+            return np.column_stack([scores, np.interp(proba[:, 1], x, y)])
+        return sklearn_targets, fused_targets
+
+    classifier = pipeline['classifier']
+    pass_column = list(classifier.classes_).index(1)
+    plan = FusedPlan.build(scaler, FlatForest.from_sklearn(regressor), FlatForest.from_sklearn(classifier))
+
+    def sklearn_targets(X_scaled):
+        return np.column_stack([regressor.predict(X_scaled), classifier.predict_proba(X_scaled)[:, pass_column]])
+
+    def fused_targets(X_raw):
+        scores, proba = plan.predict(X_raw)
+        return np.column_stack([scores, proba[:, pass_column]])
+    return sklearn_targets, fused_targets
+
+def full_model_bytes(pipeline: Dict) -> int:
+    """Pickled size of the forests in a pipeline"""
+    return len(pickle.dumps({name: pipeline[name] for name in ('regressor', 'classifier') if name in pipeline}))
+
+def latency_us_per_row(predict_fn, X, repeats=200, batch_size=1000):
+    """Median single-row latency and amortised per-row latency of one large batch"""
+    timings = []
+    for i in range(repeats):
+        row = X[i % len(X)].reshape(1, -1)
+        start = time.perf_counter()
+        predict_fn(row)
+        timings.append(time.perf_counter() - start)
+    batch = X[np.arange(batch_size) % len(X)]
+    start = time.perf_counter()
+    predict_fn(batch)
+    batch_seconds = time.perf_counter() - start
+    return float(np.median(timings) * 1e6), float(batch_seconds / batch_size * 1e6)
+
+def evaluate_model(predict_fn, X_eval: np.ndarray, y_test: np.ndarray, y_pass_test: np.ndarray,
+                   size_bytes: int, teacher_test: Optional[np.ndarray] = None) -> Dict:
+    """RMSE/accuracy against the true labels, fidelity to a teacher if given, size and latency"""
+    outputs = predict_fn(X_eval)
+    single_us, batch_us = latency_us_per_row(predict_fn, X_eval)
+    report = {
+        'rmse': float(np.sqrt(mean_squared_error(y_test, outputs[:, 0]))),
+        'accuracy': float(accuracy_score(y_pass_test, (outputs[:, 1] > 0.5).astype(int))),
+        'brier_score': float(brier_score_loss(y_pass_test, np.clip(outputs[:, 1], 0.0, 1.0)))
+    }
+    if teacher_test is not None:
+        report['fidelity_rmse'] = float(np.sqrt(mean_squared_error(teacher_test[:, 0], outputs[:, 0])))
+    report.update(
+        artifact_bytes=size_bytes,
+        latency_us_single_row=round(single_us, 1),
+        latency_us_per_row_batched=round(batch_us, 3)
+    )
+    return report
+
+def build_student_models(seed: int = 42):
+    """Candidate students; each maps scaled features to [score, pass probability]"""
+    return {
+        'gbt': MultiOutputRegressor(GradientBoostingRegressor(
+            n_estimators=60, max_depth=3, learning_rate=0.1, random_state=seed
+        )),
+        'small_forest': RandomForestRegressor(
+            n_estimators=10, max_depth=6, min_samples_leaf=2, random_state=seed, n_jobs=1
+        ),
+        'poly': make_pipeline(PolynomialFeatures(degree=2), Ridge(alpha=1.0)),
+    }
+
+def distill_tiers(pipeline: Dict, scaler, X_train_scaled: np.ndarray, X_test: np.ndarray,
+                  y_test: np.ndarray, y_pass_test: np.ndarray, model_dir: str,
+                  seed: int = 42) -> Dict:
+    """
+    Fit cheaper student models on the full model's outputs and save them to tiers/
+
+    The transfer set is the training rows plus jittered copies, labelled by
+    the full model. On large datasets it is built from a sample of the
+    training rows, capped at MAX_TRANSFER_ROWS, since the students are far
+    too small to need more. Returns the report written to
+    distillation_report.json.
+    """
+    teacher_targets, fused_targets = full_model_targets(pipeline, scaler)
+    rng = np.random.default_rng(seed)
+    base = X_train_scaled
+    if len(base) * (TRANSFER_COPIES + 1) > MAX_TRANSFER_ROWS:
+        base = base[rng.choice(len(base), MAX_TRANSFER_ROWS // (TRANSFER_COPIES + 1), replace=False)]
+    X_transfer = np.vstack([base] + [
+        base + rng.normal(0, 0.15, base.shape) for _ in range(TRANSFER_COPIES)
+    ])
+    y_transfer = teacher_targets(X_transfer)
+    X_test_scaled = scaler.transform(X_test)
+    teacher_test = teacher_targets(X_test_scaled)
+
+    def evaluate(predict_fn, X_eval, size_bytes):
+        return evaluate_model(predict_fn, X_eval, y_test, y_pass_test, size_bytes, teacher_test)
+
+    tier_report = {'full': evaluate(teacher_targets, X_test_scaled, full_model_bytes(pipeline))}
+    # The served full model runs through the fused plan on raw features
+    tier_report['full_fused'] = evaluate(
+        fused_targets, X_test.astype(float), tier_report['full']['artifact_bytes']
+    )
+
+    tier_dir = os.path.join(model_dir, TIER_DIR)
+    os.makedirs(tier_dir, exist_ok=True)
+    for tier_name, student in build_student_models(seed).items():
+        student.fit(X_transfer, y_transfer)
+        payload = {'name': tier_name, 'model': student, 'features': FEATURES,
+                   'outputs': ['score', 'pass_probability']}
+        path = os.path.join(tier_dir, f'{tier_name}.pkl')
+        with open(path, 'wb') as f:
+            pickle.dump(payload, f)
+        tier_report[tier_name] = evaluate(student.predict, X_test_scaled, os.path.getsize(path))
+
+    report_df = pd.DataFrame(tier_report).T
+    print(report_df.to_string(float_format=lambda v: f"{v:,.4f}"))
+    with open(os.path.join(model_dir, 'distillation_report.json'), 'w') as f:
+        json.dump({'transfer_set_size': int(len(X_transfer)), 'tiers': tier_report}, f, indent=2)
+    print(f"\n✓ Tiers saved to {tier_dir}, report saved to distillation_report.json")
+    return tier_report
+
+def compare_layouts(separate: Dict, combined: Dict, scaler, X_test: np.ndarray,
+                    y_test: np.ndarray, y_pass_test: np.ndarray) -> Dict:
+    """Both layouts served through their fused plans, on the same test rows"""
+    comparison = {}
+    for name, pipeline in (('separate', separate), ('combined', combined)):
+        fused_targets = full_model_targets(pipeline, scaler)[1]
+        comparison[name] = evaluate_model(
+            fused_targets, X_test.astype(float), y_test, y_pass_test, full_model_bytes(pipeline)
+        )
+        comparison[name]['trees_per_prediction'] = sum(
+            len(pipeline[forest].estimators_) for forest in ('regressor', 'classifier') if forest in pipeline
+        )
+    print("\nCombined forest vs separate pair (fused plans):")
+    print(pd.DataFrame(comparison).T.to_string())
+    comparison['calibration'] = 'isotonic on out-of-bag pass fractions'
+    return comparison
+
+def train(dataset_path: str = DATASET_PATH, model_dir: str = MODEL_DIR, mode: str = 'separate',
+          chunksize: int = 100_000, forest_params: Optional[Dict] = None, test_size: float = 0.2,
+          seed: int = 42, publish_model: bool = True, track_memory: bool = True,
+          use_cache: bool = True, cache_dir: Optional[str] = None) -> Dict:
+    """
+    Run the whole training pipeline and write every model file to model_dir
+
+    Args:
+        dataset_path: CSV with the five features and final_score (pass_fail optional);
+                      a synthetic one is generated if it does not exist
+        model_dir: Where pickles, artifacts, tiers and reports are written
+        mode: 'separate' (regressor and classifier) or 'combined' (one forest)
+        chunksize: Rows parsed per CSV chunk
+        forest_params: Overrides for FOREST_PARAMS
+        test_size: Share of rows held out for evaluation
+        seed: Seed for the split, the forests and the distillation transfer set
+        publish_model: Publish to the registry and activate the new version
+        track_memory: Sample peak resident memory during each stage
+        use_cache: Restore the models from the training cache when the same
+                   inputs (see training_hash) were trained before, and add
+                   newly trained models to it
+        cache_dir: Training cache location (default: TRAINING_CACHE_DIR)
+
+    Returns:
+        The model_info written to model_info.json
+    """
+    if mode not in MODEL_MODES:
+        raise ValueError(f"mode must be one of {MODEL_MODES}, got {mode!r}")
+    params = {**FOREST_PARAMS, 'random_state': seed, **(forest_params or {})}
+    log = StageLog(track_memory)
+    os.makedirs(model_dir, exist_ok=True)
+    cache_dir = cache_dir or TRAINING_CACHE_DIR
+
+    with log.stage('hash'):
+        ensure_dataset(dataset_path)
+        key = training_hash(dataset_path, mode, params, test_size, seed)
+    print(f"Training hash: {key}")
+    if use_cache:
+        cached_info = load_from_cache(model_dir, cache_dir, key)
+        if cached_info is not None:
+            print(f"✓ Training cache hit: restored the models trained on "
+                  f"{cached_info['training_date']} from {os.path.join(cache_dir, key)}")
+            if publish_model:
+                registry_version = publish(model_dir)
+                print(f"✓ Published and activated registry version {registry_version}")
+            return cached_info
+
+    with log.stage('load'):
+        X, y_score, y_pass = load_dataset(dataset_path, chunksize)
+    print(f"Loaded {len(X):,} rows from {dataset_path} "
+          f"({X.nbytes + y_score.nbytes + y_pass.nbytes:,} bytes of features and targets)")
+
+    with log.stage('split_and_scale'):
+        X_train, X_test, y_train, y_test, y_pass_train, y_pass_test = split_dataset(
+            X, y_score, y_pass, test_size, seed
+        )
+        del X, y_score, y_pass
+        scaler = StandardScaler()
+        # float32 in, float32 out: the forests would copy float64 input to float32 anyway
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+    print(f"\nTraining set size: {len(X_train)}")
+    print(f"Test set size: {len(X_test)}")
+
+    _banner("Training regression model (score prediction)...")
+    with log.stage('train_regressor'):
+        rf_regressor = train_regressor(X_train_scaled, y_train, params)
+    mse = mean_squared_error(y_test, rf_regressor.predict(X_test_scaled))
+    rmse = np.sqrt(mse)
+    r2_score = rf_regressor.score(X_test_scaled, y_test)
+    print(f"MSE: {mse:.4f}")
+    print(f"RMSE: {rmse:.4f}")
+    print(f"R² Score: {r2_score:.4f}")
+
+    _banner("Training classification model (pass/fail prediction)...")
+    with log.stage('train_classifier'):
+        rf_classifier = train_classifier(X_train_scaled, y_pass_train, params)
+    y_pred_pass = rf_classifier.predict(X_test_scaled)
+    accuracy = accuracy_score(y_pass_test, y_pred_pass)
+    print(f"Accuracy: {accuracy:.4f}")
+    print("\nClassification Report:")
+    print(classification_report(y_pass_test, y_pred_pass, labels=[0, 1], target_names=['Fail', 'Pass'],
+                                zero_division=0))
+
+    separate = {'mode': 'separate', 'regressor': rf_regressor, 'classifier': rf_classifier, 'features': FEATURES}
+    pipeline = separate
+    if mode == 'combined':
+        _banner("Training combined forest (score and pass/fail in one traversal)...")
+        with log.stage('train_combined'):
+            rf_combined, calibration = train_combined(X_train_scaled, y_train, y_pass_train, params)
+        pipeline = {'mode': 'combined', 'regressor': rf_combined, 'classes': [0, 1],
+                    'calibration': calibration, 'features': FEATURES}
+        outputs = full_model_targets(pipeline, scaler)[0](X_test_scaled)
+        mse = mean_squared_error(y_test, outputs[:, 0])
+        rmse = np.sqrt(mse)
+        r2_score = 1 - mse / np.var(y_test)
+        accuracy = accuracy_score(y_pass_test, (outputs[:, 1] > 0.5).astype(int))
+        print(f"RMSE: {rmse:.4f}")
+        print(f"R² Score: {r2_score:.4f}")
+        print(f"Accuracy: {accuracy:.4f}")
+
+    # Feature importance
+    feature_importance = pd.DataFrame({
+        'feature': FEATURES,
+        'importance': pipeline['regressor'].feature_importances_
+    }).sort_values('importance', ascending=False)
+    _banner("Feature Importance (Regression Model)")
+    print(feature_importance)
+
+    with log.stage('save_models'):
+        with open(os.path.join(model_dir, 'model_pipeline.pkl'), 'wb') as f:
+            pickle.dump(pipeline, f)
+        with open(os.path.join(model_dir, 'scaler.pkl'), 'wb') as f:
+            pickle.dump(scaler, f)
+    print(f"\n✓ Models saved to {model_dir}")
+
+    _banner("Distilling lightweight model tiers...")
+    with log.stage('distill_tiers'):
+        tier_report = distill_tiers(
+            pipeline, scaler, X_train_scaled, X_test, y_test, y_pass_test, model_dir, seed
+        )
+
+    # Save model metadata
+    model_info = {
+        'algorithm': 'Random Forest Ensemble' if mode == 'separate' else 'Combined Multi-output Random Forest',
+        'features': FEATURES,
+        'n_estimators': params['n_estimators'],
+        'max_depth': params['max_depth'],
+        'feature_importance': feature_importance.to_dict(orient='records'),
+        'performance': {
+            'regression': {
+                'rmse': float(rmse),
+                'r2_score': float(r2_score),
+                'mse': float(mse)
+            },
+            'classification': {
+                'accuracy': float(accuracy)
+            }
         },
-        'classification': {
-            'accuracy': float(accuracy)
-        }
-    },
-    'risk_thresholds': {
-        'low_risk': 75,  # score >= 75
-        'medium_risk': 60,  # 60 <= score < 75
-        'high_risk': 0  # score < 60
-    },
-    'version': '1.0',
-    'training_date': pd.Timestamp.now().isoformat()
-}
+        'risk_thresholds': {
+            'low_risk': 75,  # score >= 75
+            'medium_risk': 60,  # 60 <= score < 75
+            'high_risk': 0  # score < 60
+        },
+        'tiers': tier_report,
+        'model_mode': mode,
+        'training_hash': key,
+        'version': '1.0',
+        'training_date': pd.Timestamp.now().isoformat()
+    }
+    if mode == 'combined':
+        with log.stage('compare_layouts'):
+            model_info['combined_comparison'] = compare_layouts(
+                separate, pipeline, scaler, X_test, y_test, y_pass_test
+            )
+
+    with open(os.path.join(model_dir, 'model_info.json'), 'w') as f:
+        json.dump(model_info, f, indent=2)
+    print(f"✓ Model metadata saved to {os.path.join(model_dir, 'model_info.json')}")
 
-with open(os.path.join(model_dir, 'model_info.json'), 'w') as f:
-    json.dump(model_info, f, indent=2)
+    # Export flat arrays for memory-mapped loading (pickles remain the fallback)
+    with log.stage('export_artifacts'):
+        manifest_path = export_artifacts(pipeline, scaler, model_info, model_dir)
+    print(f"✓ Memory-mappable model arrays saved to {os.path.dirname(manifest_path)}")
+    with open(manifest_path, 'r') as f:
+        compact_meta = json.load(f).get('compact')
+    if compact_meta:
+        print(f"  Compact plan: {compact_meta['nbytes']:,} bytes, "
+              f"max deviation {compact_meta['max_deviation']} (tolerance {compact_meta['tolerance']})")
+
+    if publish_model:
+        # Publish to the registry; running backends hot-swap to it
+        with log.stage('publish'):
+            registry_version = publish(model_dir)
+        print(f"✓ Published and activated registry version {registry_version}")
+
+    _banner("Training stages")
+    print(pd.DataFrame(log.stages).set_index('stage').to_string())
+    with open(os.path.join(model_dir, 'training_report.json'), 'w') as f:
+        json.dump({'rows': int(len(X_train) + len(X_test)), 'mode': mode, 'training_hash': key,
+                   'stages': log.stages}, f, indent=2)
+    if use_cache:
+        print(f"✓ Cached under {store_in_cache(model_dir, cache_dir, key)}")
+    return model_info
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default=DATASET_PATH, help='training CSV')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='where model files are written')
+    parser.add_argument(
+        '--mode', choices=MODEL_MODES, default='separate',
+        help="separate: a regressor and a classifier forest; "
+             "combined: one forest predicting score and pass/fail in a single traversal"
+    )
+    parser.add_argument('--chunksize', type=int, default=100_000, help='CSV rows parsed per chunk')
+    parser.add_argument('--n-estimators', type=int, default=FOREST_PARAMS['n_estimators'])
+    parser.add_argument('--max-depth', type=int, default=FOREST_PARAMS['max_depth'])
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-publish', action='store_true', help='do not publish to the model registry')
+    parser.add_argument('--no-memory-tracking', action='store_true',
+                        help='do not sample resident memory during each stage')
+    parser.add_argument('--cache-dir', default=TRAINING_CACHE_DIR, help='training cache location')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always retrain, and do not add the result to the training cache')
+    args = parser.parse_args(argv)
+
+    model_info = train(
+        dataset_path=args.dataset,
+        model_dir=args.model_dir,
+        mode=args.mode,
+        chunksize=args.chunksize,
+        forest_params={'n_estimators': args.n_estimators, 'max_depth': args.max_depth},
+        test_size=args.test_size,
+        seed=args.seed,
+        publish_model=not args.no_publish,
+        track_memory=not args.no_memory_tracking,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir
+    )
+    print("\nTraining complete! ✨")
+    return model_info
 
-print(f"✓ Model metadata saved to {os.path.join(model_dir, 'model_info.json')}")
-print("\nTraining complete! ✨")
+if __name__ == '__main__':
+    main()
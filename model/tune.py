@@ -0,0 +1,307 @@
+"""
+Hyperparameter search for the forests
+
+Usage:
+    python tune.py [--search grid|random] [--n-iter 20] [--folds 3] [--workers 4]
+                   [--latency-budget-us 150] [--latency-metric single|batched]
+                   [--objective rmse|accuracy|brier_score] [--train]
+
+Every configuration is cross-validated on the training split (the test rows
+stay held out) in a process pool. The fold splits and their scaled matrices
+are computed once and written as .npy files. Workers memory-map them, so
+the data is shared through the page cache instead of being pickled to each
+process. Prediction latency is timed afterwards in this process, one
+configuration at a time, through the fused plan the backend serves. That way
+the timings are not skewed by other workers competing for the CPU.
+
+The results table goes to tuning_results.csv, and the selected configuration
+to tuning_results.json. The selection is the best objective among
+configurations within the latency budget. With --train, the models are
+retrained with that configuration and published.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, brier_score_loss, mean_squared_error
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+from sklearn.preprocessing import StandardScaler
+
+from predict import FlatForest, FusedPlan, MODEL_MODES
+from train import (DATASET_PATH, FOREST_PARAMS, MODEL_DIR, latency_us_per_row, load_dataset,
+                   split_dataset, train, train_classifier, train_combined, train_regressor)
+
+# Searched around the defaults; max_depth None grows trees until leaves are pure
+PARAM_GRID = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [6, 10, 15, None],
+    'min_samples_leaf': [1, 2, 5],
+}
+FOLD_ARRAYS = ('X_train', 'y_train', 'y_pass_train', 'X_val', 'X_val_raw', 'y_val', 'y_pass_val')
+LATENCY_METRICS = {'single': 'latency_us_single_row', 'batched': 'latency_us_per_row_batched'}
+# Lower is better for every objective except accuracy
+OBJECTIVES = {'rmse': True, 'brier_score': True, 'accuracy': False}
+
+def candidate_configs(search: str = 'grid', n_iter: int = 20, seed: int = 42) -> List[Dict]:
+    """Every PARAM_GRID combination, or n_iter of them sampled without replacement"""
+    if search == 'grid':
+        return list(ParameterGrid(PARAM_GRID))
+    if search == 'random':
+        return list(ParameterSampler(PARAM_GRID, n_iter=n_iter, random_state=seed))
+    raise ValueError(f"search must be 'grid' or 'random', got {search!r}")
+
+def prepare_folds(X: np.ndarray, y_score: np.ndarray, y_pass: np.ndarray, n_folds: int,
+                  seed: int, cache_dir: str, fingerprint: Dict) -> List[Dict]:
+    """
+    Write each fold's scaled train/validation matrices to cache_dir as .npy files
+
+    A cache_dir whose folds.json has the same fingerprint (dataset, folds,
+    seed) is reused as is, so repeated searches skip this step.
+
+    Returns:
+        One entry per fold with its array paths and fitted scaler statistics
+    """
+    manifest_path = os.path.join(cache_dir, 'folds.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest['fingerprint'] == fingerprint:
+            print(f"Reusing cached folds in {cache_dir}")
+            return manifest['folds']
+
+    os.makedirs(cache_dir, exist_ok=True)
+    folds = []
+    for k, (train_rows, val_rows) in enumerate(KFold(n_folds, shuffle=True, random_state=seed).split(X)):
+        scaler = StandardScaler().fit(X[train_rows])
+        arrays = {
+            'X_train': scaler.transform(X[train_rows]),
+            'y_train': y_score[train_rows],
+            'y_pass_train': y_pass[train_rows],
+            'X_val': scaler.transform(X[val_rows]),
+            'X_val_raw': X[val_rows].astype(np.float64),
+            'y_val': y_score[val_rows],
+            'y_pass_val': y_pass[val_rows],
+        }
+        paths = {}
+        for name in FOLD_ARRAYS:
+            paths[name] = os.path.join(cache_dir, f'fold{k}_{name}.npy')
+            np.save(paths[name], arrays[name])
+        folds.append({'index': k, 'arrays': paths,
+                      'scaler_mean': scaler.mean_.tolist(), 'scaler_scale': scaler.scale_.tolist()})
+
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump({'fingerprint': fingerprint, 'folds': folds}, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return folds
+
+def _fold_scaler(fold: Dict) -> StandardScaler:
+    """Rebuild a fold's fitted scaler from its statistics"""
+    scaler = StandardScaler()
+    scaler.mean_ = np.array(fold['scaler_mean'])
+    scaler.scale_ = np.array(fold['scaler_scale'])
+    return scaler
+
+def evaluate_fold(mode: str, params: Dict, fold: Dict, keep_plan: bool = False) -> Dict:
+    """
+    Fit one configuration on one fold and score its validation rows (runs in a worker)
+
+    With keep_plan the fused plan is returned too, for latency timing in the parent.
+    """
+    data = {name: np.load(path, mmap_mode='r') for name, path in fold['arrays'].items()}
+    started = time.perf_counter()
+    if mode == 'combined':
+        forest, calibration = train_combined(data['X_train'], data['y_train'], data['y_pass_train'], params)
+        fit_seconds = time.perf_counter() - started
+        outputs = forest.predict(data['X_val'])
+        scores = outputs[:, 0]
+        pass_probability = np.interp(outputs[:, 1], calibration['x'], calibration['y'])
+        forests, trees = (forest,), len(forest.estimators_)
+    else:
+        regressor = train_regressor(data['X_train'], data['y_train'], params)
+        classifier = train_classifier(data['X_train'], data['y_pass_train'], params)
+        fit_seconds = time.perf_counter() - started
+        scores = regressor.predict(data['X_val'])
+        pass_probability = classifier.predict_proba(data['X_val'])[:, list(classifier.classes_).index(1)]
+        forests, trees = (regressor, classifier), len(regressor.estimators_) + len(classifier.estimators_)
+
+    result = {
+        'fold': fold['index'],
+        'rmse': float(np.sqrt(mean_squared_error(data['y_val'], scores))),
+        'accuracy': float(accuracy_score(data['y_pass_val'], (pass_probability > 0.5).astype(int))),
+        'brier_score': float(brier_score_loss(data['y_pass_val'], pass_probability)),
+        'fit_seconds': fit_seconds,
+        'trees': trees,
+        'plan': None
+    }
+    if keep_plan:
+        result['plan'] = FusedPlan.build(_fold_scaler(fold), *(FlatForest.from_sklearn(f) for f in forests))
+        result['plan_bytes'] = int(result['plan'].nbytes)
+    return result
+
+def run_search(configs: List[Dict], folds: List[Dict], mode: str = 'separate', workers: int = 1,
+               seed: int = 42, latency_rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Cross-validate every configuration in a process pool, then time each one here
+
+    Each (configuration, fold) pair is one task, and the forests are pinned
+    to n_jobs=1 so the pool owns the cores. Latency is the median single-row
+    and amortised batched time of the fold-0 fused plan on latency_rows.
+
+    Returns:
+        One row per configuration with its parameters and fold-averaged metrics
+    """
+    tasks = [
+        (i, {**FOREST_PARAMS, **config, 'random_state': seed, 'n_jobs': 1}, fold)
+        for i, config in enumerate(configs) for fold in folds
+    ]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(evaluate_fold, mode, params, fold, fold['index'] == 0) for _, params, fold in tasks]
+        fold_results = [(i, future.result()) for (i, _, _), future in zip(tasks, futures)]
+    print(f"Cross-validated {len(configs)} configurations x {len(folds)} folds "
+          f"in {time.perf_counter() - started:,.1f} s with {workers} workers")
+
+    rows = []
+    for i, config in enumerate(configs):
+        results = [result for j, result in fold_results if j == i]
+        plan = next(result['plan'] for result in results if result['plan'] is not None)
+        single_us, batch_us = latency_us_per_row(plan.predict, latency_rows)
+        rows.append({
+            **config,
+            'rmse': float(np.mean([r['rmse'] for r in results])),
+            'rmse_std': float(np.std([r['rmse'] for r in results])),
+            'accuracy': float(np.mean([r['accuracy'] for r in results])),
+            'brier_score': float(np.mean([r['brier_score'] for r in results])),
+            'fit_seconds': float(np.mean([r['fit_seconds'] for r in results])),
+            'trees': results[0]['trees'],
+            'plan_bytes': next(r['plan_bytes'] for r in results if r['plan'] is not None),
+            'latency_us_single_row': round(single_us, 1),
+            'latency_us_per_row_batched': round(batch_us, 3),
+        })
+    return pd.DataFrame(rows)
+
+def select_config(results: pd.DataFrame, objective: str = 'rmse', latency_budget_us: Optional[float] = None,
+                  latency_metric: str = 'single') -> pd.Series:
+    """Best configuration on the objective among those within the latency budget"""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {list(OBJECTIVES)}, got {objective!r}")
+    candidates = results
+    if latency_budget_us is not None:
+        candidates = results[results[LATENCY_METRICS[latency_metric]] <= latency_budget_us]
+        if candidates.empty:
+            fastest = results[LATENCY_METRICS[latency_metric]].min()
+            raise ValueError(
+                f"No configuration meets a {latency_metric} latency budget of {latency_budget_us} us "
+                f"(fastest: {fastest} us)"
+            )
+    ranked = candidates.sort_values([objective, LATENCY_METRICS[latency_metric]],
+                                     ascending=[OBJECTIVES[objective], True])
+    return ranked.iloc[0]
+
+def forest_params_of(selected: pd.Series) -> Dict:
+    """The PARAM_GRID entries of a results row, as forest keyword arguments"""
+    params = {}
+    for name in PARAM_GRID:
+        value = selected[name]
+        params[name] = None if pd.isna(value) else int(value)
+    return params
+
+def tune(dataset_path: str = DATASET_PATH, model_dir: str = MODEL_DIR, mode: str = 'separate',
+         search: str = 'grid', n_iter: int = 20, n_folds: int = 3, workers: Optional[int] = None,
+         objective: str = 'rmse', latency_budget_us: Optional[float] = None, latency_metric: str = 'single',
+         test_size: float = 0.2, seed: int = 42, cache_dir: Optional[str] = None,
+         chunksize: int = 100_000) -> Dict:
+    """
+    Run the search and write tuning_results.csv and tuning_results.json to model_dir
+
+    Args:
+        cache_dir: Keep the fold arrays here and reuse them on the next run;
+                   by default they go to a temporary directory that is removed
+
+    Returns:
+        The selected forest parameters and their metrics
+    """
+    if mode not in MODEL_MODES:
+        raise ValueError(f"mode must be one of {MODEL_MODES}, got {mode!r}")
+    if latency_metric not in LATENCY_METRICS:
+        raise ValueError(f"latency_metric must be one of {list(LATENCY_METRICS)}, got {latency_metric!r}")
+    workers = workers or os.cpu_count() or 1
+    X, y_score, y_pass = load_dataset(dataset_path, chunksize)
+    # Tune on the training split only; the test rows are for the final model
+    X_train, _, y_train, _, y_pass_train, _ = split_dataset(X, y_score, y_pass, test_size, seed)
+    del X, y_score, y_pass
+    stat = os.stat(dataset_path)
+    fingerprint = {
+        'dataset': os.path.abspath(dataset_path), 'size': stat.st_size, 'mtime': stat.st_mtime,
+        'test_size': test_size, 'n_folds': n_folds, 'seed': seed
+    }
+
+    keep_cache = cache_dir is not None
+    cache_dir = cache_dir or tempfile.mkdtemp(prefix='tune-folds-')
+    try:
+        folds = prepare_folds(X_train, y_train, y_pass_train, n_folds, seed, cache_dir, fingerprint)
+        latency_rows = np.load(folds[0]['arrays']['X_val_raw'])
+        configs = candidate_configs(search, n_iter, seed)
+        results = run_search(configs, folds, mode, workers, seed, latency_rows)
+    finally:
+        if not keep_cache:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    results = results.sort_values(objective, ascending=OBJECTIVES[objective]).reset_index(drop=True)
+    print(results.to_string(float_format=lambda v: f"{v:,.4f}"))
+    results.to_csv(os.path.join(model_dir, 'tuning_results.csv'), index=False)
+
+    selected = select_config(results, objective, latency_budget_us, latency_metric)
+    best = {
+        'forest_params': forest_params_of(selected),
+        'metrics': {name: float(selected[name]) for name in results.columns if name not in PARAM_GRID},
+        'objective': objective,
+        'latency_budget_us': latency_budget_us,
+        'latency_metric': LATENCY_METRICS[latency_metric],
+        'mode': mode,
+        'search': search,
+        'n_folds': n_folds,
+        'configurations': len(results)
+    }
+    with open(os.path.join(model_dir, 'tuning_results.json'), 'w') as f:
+        json.dump(best, f, indent=2)
+    print(f"\n✓ Selected {best['forest_params']} "
+          f"({objective} {selected[objective]:.4f}, {LATENCY_METRICS[latency_metric]} "
+          f"{selected[LATENCY_METRICS[latency_metric]]} us); results saved to tuning_results.csv")
+    return best
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default=DATASET_PATH, help='training CSV')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='where results (and models, with --train) go')
+    parser.add_argument('--mode', choices=MODEL_MODES, default='separate')
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--n-iter', type=int, default=20, help='configurations sampled by --search random')
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--objective', choices=list(OBJECTIVES), default='rmse')
+    parser.add_argument('--latency-budget-us', type=float, default=None,
+                        help='only select configurations at or below this per-row latency')
+    parser.add_argument('--latency-metric', choices=list(LATENCY_METRICS), default='single',
+                        help='single-row latency or amortised per-row latency of a batch')
+    parser.add_argument('--cache-dir', default=None, help='keep and reuse the fold arrays here')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--train', action='store_true', help='retrain and publish with the selected configuration')
+    args = parser.parse_args()
+
+    best = tune(
+        dataset_path=args.dataset, model_dir=args.model_dir, mode=args.mode, search=args.search,
+        n_iter=args.n_iter, n_folds=args.folds, workers=args.workers, objective=args.objective,
+        latency_budget_us=args.latency_budget_us, latency_metric=args.latency_metric,
+        seed=args.seed, cache_dir=args.cache_dir
+    )
+    if args.train:
+        train(dataset_path=args.dataset, model_dir=args.model_dir, mode=args.mode,
+              forest_params=best['forest_params'], seed=args.seed)